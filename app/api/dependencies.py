@@ -1,12 +1,47 @@
+from typing import AsyncIterator, Optional
+import hashlib
+from fastapi import Header
 from app.database import get_db_session
 from app.services.job_manager import JobManager
 from app.services.image_processor import ImageProcessor
+from app.services.job_events import JobEventBus, job_event_bus
+from app.services.result_cache import ResultCache, result_cache
+from app.services.admission import AdmissionController, admission_controller
 
-async def get_job_manager() -> JobManager:
-    """Get JobManager instance with database session."""
+async def get_job_manager() -> AsyncIterator[JobManager]:
+    """Get JobManager instance with a database session that is closed after the request."""
     async for session in get_db_session():
-        return JobManager(session)
+        yield JobManager(session)
 
 def get_image_processor() -> ImageProcessor:
     """Get ImageProcessor instance."""
-    return ImageProcessor() 
\ No newline at end of file
+    return ImageProcessor()
+
+def get_job_event_bus() -> JobEventBus:
+    """Get the process-wide JobEventBus instance."""
+    return job_event_bus
+
+def get_result_cache() -> ResultCache:
+    """Get the process-wide ResultCache instance."""
+    return result_cache
+
+def get_admission_controller() -> AdmissionController:
+    """Get the process-wide AdmissionController instance."""
+    return admission_controller
+
+def get_tenant_id(
+    x_tenant_id: Optional[str] = Header(None, max_length=100),
+    x_api_key: Optional[str] = Header(None)
+) -> str:
+    """
+    Get the identity of the tenant making the request.
+    
+    The X-Tenant-ID header names the tenant directly. Otherwise requests with
+    the same X-API-Key belong to one tenant, identified by a digest of the key
+    so the key itself is never stored. Requests with neither are anonymous.
+    """
+    if x_tenant_id:
+        return x_tenant_id
+    if x_api_key:
+        return f"key-{hashlib.sha256(x_api_key.encode()).hexdigest()[:16]}"
+    return "anonymous"
@@ -1,53 +1,272 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from app.api.dependencies import get_job_manager, get_image_processor
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Optional, Tuple
+import asyncio
+import base64
+import binascii
+import json
+import logging
+from celery import group
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from fastapi.responses import StreamingResponse
+from app.api.dependencies import (
+    get_job_manager,
+    get_image_processor,
+    get_job_event_bus,
+    get_result_cache,
+    get_admission_controller,
+    get_tenant_id
+)
 from app.services.job_manager import JobManager
-from app.services.image_processor import ImageProcessor
-from app.validators import JobSubmitResponse, JobStatusResponse, JobResultResponse
-from app.enums import JobStatus
-from app.tasks import process_image_task
+from app.services.admission import AdmissionController
+from app.services.image_processor import ImageProcessor, StagedUpload
+from app.services.job_events import JobEventBus
+from app.services.result_cache import CachedResult, ResultCache
+from app.validators import (
+    JobSubmitResponse,
+    BatchSubmitResponse,
+    JobStatusResponse,
+    JobResultResponse,
+    BulkJobRequest,
+    BulkJobStatus,
+    BulkStatusResponse,
+    BulkJobResult,
+    BulkResultResponse,
+    JobListItem,
+    JobListResponse,
+    JobSummaryResponse,
+    DeadLetterItem,
+    DeadLetterListResponse,
+    DeadLetterReplayResponse,
+    ResultCacheStatsResponse,
+    JobTimings
+)
+from app.enums import JobStatus, JobPriority, TERMINAL_STATUSES
+from app.models import Job
+from app.tasks import process_image_task, queue_for_priority
 from app.config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+SUBMITTED_MESSAGE = "Job submitted successfully"
+CACHED_MESSAGE = "Job completed from cached description"
+ATTACHED_MESSAGE = "Job attached to in-flight job with identical content"
+# Extras the result endpoint can include on request
+RESULT_EXTRAS = {"timings"}
+
 @router.post("/submit", response_model=JobSubmitResponse)
 async def submit_job(
     file: UploadFile = File(...),
+    priority: JobPriority = Form(JobPriority.INTERACTIVE),
+    tenant_id: str = Depends(get_tenant_id),
     job_manager: JobManager = Depends(get_job_manager),
-    image_processor: ImageProcessor = Depends(get_image_processor)
+    image_processor: ImageProcessor = Depends(get_image_processor),
+    admission: AdmissionController = Depends(get_admission_controller)
 ):
-    """Submit an image for processing."""
-    # Read file content first
-    file_content = await file.read()
-    
-    # Validate file size
-    if len(file_content) > settings.MAX_FILE_SIZE:
-        raise HTTPException(status_code=400, detail="File too large")
-    
-    # Validate uploaded file
-    image_processor.validate_uploaded_file(file, file_content)
+    """Submit an image for processing, interactive priority by default."""
+    # Refuse the job before storing anything when the service is saturated
+    await admission.admit(job_manager, tenant_id)
+    accepted_at = datetime.now(timezone.utc)
     
-    # Get file extension and create job
-    file_extension = image_processor.get_file_extension(file.filename)
-    job = await job_manager.create_job(file.filename, file_extension)
+    try:
+        staged = await _stage_upload(file, image_processor)
+    except BaseException:
+        # No job is queued for an invalid upload
+        admission.release()
+        raise
+    stored_at = datetime.now(timezone.utc)
     
-    # Save uploaded file
-    await image_processor.save_uploaded_file(file_content, job.image_path)
+    job = None
+    try:
+        # Reuse a job for identical content instead of storing and describing it again
+        if settings.DEDUP_ENABLED:
+            existing_job = await job_manager.find_job_by_content_hash(staged.sha256, tenant_id, priority)
+            if existing_job:
+                await image_processor.discard_upload(staged)
+                response = await _submit_duplicate(existing_job, job_manager, tenant_id, priority, accepted_at, stored_at)
+                # A duplicate adds nothing to the backlog
+                admission.release()
+                return response
+        
+        # Get file extension and create job
+        file_extension = image_processor.get_file_extension(file.filename)
+        job = await job_manager.create_job(
+            file.filename, file_extension, staged.sha256, tenant_id, priority, accepted_at, stored_at
+        )
+        
+        # Move uploaded file into place
+        await image_processor.commit_upload(staged, job.image_path)
+    except BaseException:
+        await image_processor.discard_upload(staged)
+        if job is not None:
+            await _delete_jobs_without_image(job_manager, [job.id])
+        admission.release()
+        raise
     
-    # Queue processing task
-    process_image_task.delay(job.id, job.image_path)
+    # Queue processing task on its priority's queue
+    process_image_task.apply_async(
+        args=(job.id, job.image_path),
+        kwargs={"tenant_id": tenant_id, "priority": priority.value, "enqueued_at": datetime.now(timezone.utc).isoformat()},
+        queue=queue_for_priority(priority)
+    )
     
     return JobSubmitResponse(
         job_id=job.id,
         status=job.status,
-        message="Job submitted successfully"
+        message=SUBMITTED_MESSAGE
+    )
+
+@router.post("/submit/batch", response_model=BatchSubmitResponse)
+async def submit_batch(
+    files: List[UploadFile] = File(...),
+    priority: JobPriority = Form(JobPriority.BULK),
+    tenant_id: str = Depends(get_tenant_id),
+    job_manager: JobManager = Depends(get_job_manager),
+    image_processor: ImageProcessor = Depends(get_image_processor),
+    admission: AdmissionController = Depends(get_admission_controller)
+):
+    """Submit several images for processing in a single request, bulk priority by default."""
+    if len(files) > settings.MAX_BATCH_FILES:
+        raise HTTPException(status_code=400, detail=f"Too many files, at most {settings.MAX_BATCH_FILES} per batch")
+    await admission.admit(job_manager, tenant_id, len(files))
+    accepted_at = datetime.now(timezone.utc)
+    
+    # Validate and stage all uploads concurrently
+    results = await asyncio.gather(
+        *(_stage_upload(file, image_processor) for file in files),
+        return_exceptions=True
+    )
+    stored_at = datetime.now(timezone.utc)
+    staged_uploads = [result for result in results if not isinstance(result, BaseException)]
+    errors = [(file, result) for file, result in zip(files, results) if isinstance(result, BaseException)]
+    if errors:
+        await asyncio.gather(*(image_processor.discard_upload(staged) for staged in staged_uploads))
+        admission.release(len(files))
+        file, error = errors[0]
+        if isinstance(error, HTTPException):
+            raise HTTPException(status_code=error.status_code, detail=f"{file.filename}: {error.detail}")
+        raise error
+    
+    inserted_jobs = []
+    try:
+        existing_jobs = {}
+        if settings.DEDUP_ENABLED:
+            existing_jobs = await job_manager.find_jobs_by_content_hashes(
+                [staged.sha256 for staged in staged_uploads], tenant_id, priority
+            )
+        
+        responses = []
+        new_jobs = []
+        uploads_to_keep = []
+        for file, staged in zip(files, staged_uploads):
+            existing_job = existing_jobs.get(staged.sha256)
+            if existing_job and existing_job.status == JobStatus.DONE:
+                job = job_manager.build_cached_job(existing_job, tenant_id, priority, accepted_at, stored_at)
+                new_jobs.append(job)
+                message = CACHED_MESSAGE
+            elif existing_job:
+                job = existing_job
+                message = ATTACHED_MESSAGE
+            else:
+                file_extension = image_processor.get_file_extension(file.filename)
+                job = job_manager.build_job(file_extension, staged.sha256, tenant_id, priority, accepted_at, stored_at)
+                new_jobs.append(job)
+                uploads_to_keep.append((staged, job))
+                message = SUBMITTED_MESSAGE
+                # Later files with the same content in this batch attach to this job
+                if settings.DEDUP_ENABLED:
+                    existing_jobs[staged.sha256] = job
+            responses.append(JobSubmitResponse(job_id=job.id, status=job.status, message=message))
+        
+        # Insert all job rows in one transaction
+        await job_manager.create_jobs(new_jobs)
+        inserted_jobs = new_jobs
+        
+        # Move uploaded files into place
+        await asyncio.gather(*(image_processor.commit_upload(staged, job.image_path) for staged, job in uploads_to_keep))
+    except BaseException:
+        if inserted_jobs:
+            await _delete_jobs_without_image(job_manager, [job.id for job in inserted_jobs])
+        admission.release(len(files))
+        raise
+    finally:
+        # Drop staged files that were deduplicated or not committed
+        await asyncio.gather(*(image_processor.discard_upload(staged) for staged in staged_uploads))
+    # Only the files that got a job of their own add to the backlog
+    admission.release(len(files) - len(uploads_to_keep))
+    
+    # Queue processing tasks on their priority's queue in one publish
+    if uploads_to_keep:
+        enqueued_at = datetime.now(timezone.utc).isoformat()
+        group([
+            process_image_task.s(job.id, job.image_path, tenant_id=tenant_id, priority=priority.value, enqueued_at=enqueued_at)
+            for _, job in uploads_to_keep
+        ]).apply_async(queue=queue_for_priority(priority))
+    
+    return BatchSubmitResponse(jobs=responses)
+
+async def _stage_upload(file: UploadFile, image_processor: ImageProcessor) -> StagedUpload:
+    """Validate an upload and stream it to a temporary file."""
+    # Reject oversized uploads before reading any content
+    if file.size is not None and file.size > settings.MAX_FILE_SIZE:
+        raise HTTPException(status_code=400, detail="File too large")
+    
+    # Validate uploaded file, sniffing magic bytes from the first chunk only
+    first_chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+    await image_processor.validate_uploaded_file(file, first_chunk)
+    
+    # Stream the rest of the upload to a temporary file
+    return await image_processor.stage_upload(file, first_chunk)
+
+async def _delete_jobs_without_image(job_manager: JobManager, job_ids: List[str]) -> None:
+    """
+    Delete the rows of a submission whose images could not be stored.
+    
+    No task is queued for such a job, so a row left behind would stay queued
+    forever, counting against admission and attracting duplicates.
+    """
+    try:
+        await job_manager.delete_jobs(job_ids)
+    except Exception:
+        logger.warning("Could not delete jobs %s left without an image", job_ids, exc_info=True)
+
+async def _submit_duplicate(
+    existing_job: Job,
+    job_manager: JobManager,
+    tenant_id: str,
+    priority: JobPriority,
+    accepted_at: datetime,
+    stored_at: datetime
+) -> JobSubmitResponse:
+    """Answer a submission whose content matches an existing job."""
+    if existing_job.status == JobStatus.DONE:
+        job = await job_manager.create_cached_job(existing_job, tenant_id, priority, accepted_at, stored_at)
+        return JobSubmitResponse(
+            job_id=job.id,
+            status=job.status,
+            message=CACHED_MESSAGE
+        )
+    
+    # Identical content is already queued or processing, so share that job
+    return JobSubmitResponse(
+        job_id=existing_job.id,
+        status=existing_job.status,
+        message=ATTACHED_MESSAGE
     )
 
 @router.get("/status/{job_id}", response_model=JobStatusResponse)
 async def get_job_status(
     job_id: str,
-    job_manager: JobManager = Depends(get_job_manager)
+    job_manager: JobManager = Depends(get_job_manager),
+    result_cache: ResultCache = Depends(get_result_cache)
 ):
     """Get job status."""
+    # A cached job is done for good, so its status comes from the cache too
+    cached = await result_cache.get(job_id)
+    if cached:
+        return JobStatusResponse(job_id=cached.job_id, status=cached.status, created_at=cached.created_at)
+    
     job = await job_manager.get_job(job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
@@ -61,21 +280,300 @@ async def get_job_status(
 @router.get("/result/{job_id}", response_model=JobResultResponse)
 async def get_job_result(
     job_id: str,
-    job_manager: JobManager = Depends(get_job_manager)
+    include: Optional[str] = Query(None, description="Comma-separated extras to include: timings"),
+    job_manager: JobManager = Depends(get_job_manager),
+    result_cache: ResultCache = Depends(get_result_cache)
 ):
-    """Get job result."""
-    job = await job_manager.get_job(job_id)
-    if not job:
-        raise HTTPException(status_code=404, detail="Job not found")
+    """Get job result, optionally with its stage timings."""
+    extras = _parse_include(include)
     
-    if job.status != JobStatus.DONE:
-        raise HTTPException(status_code=400, detail="Job not completed")
+    # Timings are only kept in the database, so asking for them skips the cache
+    cached = None if "timings" in extras else await result_cache.get(job_id)
+    timings = None
+    if not cached:
+        job = await job_manager.get_job(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        if job.status != JobStatus.DONE:
+            raise HTTPException(status_code=400, detail="Job not completed")
+        
+        cached = CachedResult.from_job(job)
+        await result_cache.put(cached)
+        if "timings" in extras:
+            timings = JobTimings.from_job(job)
     
     return JobResultResponse(
+        job_id=cached.job_id,
+        status=cached.status,
+        image_description=cached.image_description,
+        generated_by=cached.generated_by,
+        created_at=cached.created_at,
+        completed_at=cached.updated_at,
+        timings=timings
+    )
+
+def _parse_include(include: Optional[str]) -> set:
+    """Parse the `include` query parameter of the result endpoint."""
+    extras = {extra.strip() for extra in include.split(",") if extra.strip()} if include else set()
+    unknown = extras - RESULT_EXTRAS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(sorted(unknown))}")
+    return extras
+
+@router.get("/cache/stats", response_model=ResultCacheStatsResponse)
+async def get_result_cache_stats(result_cache: ResultCache = Depends(get_result_cache)):
+    """Get hit and miss counters of this process's result cache."""
+    return ResultCacheStatsResponse(**result_cache.stats())
+
+@router.post("/status/bulk", response_model=BulkStatusResponse)
+async def get_job_statuses(
+    request: BulkJobRequest,
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """Get the status of several jobs."""
+    _check_bulk_size(request)
+    rows = await job_manager.get_job_statuses(request.job_ids)
+    
+    statuses = []
+    for job_id in request.job_ids:
+        row = rows.get(job_id)
+        if not row:
+            statuses.append(BulkJobStatus(job_id=job_id, error="Job not found"))
+            continue
+        statuses.append(BulkJobStatus(job_id=job_id, status=row.status, created_at=row.created_at))
+    
+    return BulkStatusResponse(jobs=statuses)
+
+@router.post("/result/bulk", response_model=BulkResultResponse)
+async def get_job_results(
+    request: BulkJobRequest,
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """Get the result of several jobs."""
+    _check_bulk_size(request)
+    rows = await job_manager.get_job_results(request.job_ids)
+    
+    results = []
+    for job_id in request.job_ids:
+        row = rows.get(job_id)
+        if not row:
+            results.append(BulkJobResult(job_id=job_id, error="Job not found"))
+            continue
+        if row.status != JobStatus.DONE:
+            results.append(BulkJobResult(job_id=job_id, status=row.status, created_at=row.created_at, error="Job not completed"))
+            continue
+        results.append(BulkJobResult(
+            job_id=job_id,
+            status=row.status,
+            image_description=row.image_description,
+            generated_by=row.generated_by,
+            created_at=row.created_at,
+            completed_at=row.updated_at
+        ))
+    
+    return BulkResultResponse(jobs=results)
+
+def _check_bulk_size(request: BulkJobRequest) -> None:
+    """Reject bulk lookups for more jobs than configured."""
+    if len(request.job_ids) > settings.BULK_LOOKUP_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Too many job ids, at most {settings.BULK_LOOKUP_MAX_IDS} per request")
+
+@router.get("/jobs", response_model=JobListResponse)
+async def list_jobs(
+    status: Optional[JobStatus] = Query(None, description="Only list jobs with this status"),
+    created_after: Optional[datetime] = Query(None, description="Only list jobs created after this time"),
+    updated_before: Optional[datetime] = Query(None, description="Only list jobs last updated before this time"),
+    limit: int = Query(settings.JOB_LIST_DEFAULT_LIMIT, ge=1, le=settings.JOB_LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """List jobs newest first, a page at a time."""
+    after = _decode_cursor(cursor) if cursor else None
+    # Fetch one extra row to know whether another page follows
+    rows = await job_manager.list_jobs(
+        limit + 1,
+        status=status,
+        created_after=created_after,
+        updated_before=updated_before,
+        after=after
+    )
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    return JobListResponse(
+        jobs=[
+            JobListItem(job_id=row.id, status=row.status, created_at=row.created_at, updated_at=row.updated_at)
+            for row in rows
+        ],
+        next_cursor=next_cursor
+    )
+
+@router.get("/jobs/summary", response_model=JobSummaryResponse)
+async def get_jobs_summary(
+    created_after: Optional[datetime] = Query(None, description="Only count jobs created after this time"),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """Count jobs in each status."""
+    counts = await job_manager.count_jobs_by_status(created_after)
+    return JobSummaryResponse(counts=counts, total=sum(counts.values()))
+
+@router.get("/jobs/dead-letters", response_model=DeadLetterListResponse)
+async def list_dead_letters(
+    limit: int = Query(settings.JOB_LIST_DEFAULT_LIMIT, ge=1, le=settings.JOB_LIST_MAX_LIMIT),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """List jobs that failed for good, most recently failed first, a page at a time."""
+    after = _decode_cursor(cursor) if cursor else None
+    # Fetch one extra row to know whether another page follows
+    rows = await job_manager.list_dead_letters(limit + 1, after=after)
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].dead_lettered_at, rows[-1].id)
+    
+    return DeadLetterListResponse(
+        jobs=[
+            DeadLetterItem(
+                job_id=row.id,
+                attempts=row.attempts,
+                last_error=row.last_error,
+                created_at=row.created_at,
+                dead_lettered_at=row.dead_lettered_at
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor
+    )
+
+@router.post("/jobs/dead-letters/replay", response_model=DeadLetterReplayResponse)
+async def replay_dead_letters(
+    request: BulkJobRequest,
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    """Queue dead-lettered jobs for processing again, each on its priority's queue."""
+    _check_bulk_size(request)
+    rows = await job_manager.replay_jobs(request.job_ids)
+    
+    # Queue the processing tasks in one publish
+    if rows:
+        enqueued_at = datetime.now(timezone.utc).isoformat()
+        group([
+            process_image_task.s(
+                row.id, row.image_path, tenant_id=row.tenant_id, priority=row.priority.value, enqueued_at=enqueued_at
+            ).set(queue=queue_for_priority(row.priority))
+            for row in rows
+        ]).apply_async()
+    
+    replayed = {row.id for row in rows}
+    job_ids = list(dict.fromkeys(request.job_ids))
+    return DeadLetterReplayResponse(
+        replayed=[job_id for job_id in job_ids if job_id in replayed],
+        skipped=[job_id for job_id in job_ids if job_id not in replayed]
+    )
+
+def _encode_cursor(created_at: datetime, job_id: str) -> str:
+    """Encode the position after a job as an opaque page cursor."""
+    payload = json.dumps([created_at.isoformat(), job_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a page cursor into the (created_at, id) it points after."""
+    try:
+        created_at, job_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(created_at), str(job_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/jobs/{job_id}/wait", response_model=JobStatusResponse)
+async def wait_for_job(
+    job_id: str,
+    timeout: float = Query(30.0, gt=0, description="Seconds to wait, capped at LONG_POLL_MAX_TIMEOUT"),
+    job_manager: JobManager = Depends(get_job_manager),
+    event_bus: JobEventBus = Depends(get_job_event_bus)
+):
+    """Wait until a job is done or failed, or the timeout expires, and return its status."""
+    # Subscribe before reading the job so a completion in between is not missed
+    async with event_bus.subscribe([job_id]) as subscription:
+        job = await job_manager.get_job(job_id)
+        # Do not hold a database connection while waiting
+        await job_manager.close()
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        status = job.status
+        if status not in TERMINAL_STATUSES:
+            event = await subscription.get(min(timeout, settings.LONG_POLL_MAX_TIMEOUT))
+            if event:
+                status = event.status
+    
+    return JobStatusResponse(
         job_id=job.id,
-        status=job.status,
-        image_description=job.image_description,
-        generated_by=job.generated_by,
-        created_at=job.created_at,
-        completed_at=job.updated_at
-    ) 
\ No newline at end of file
+        status=status,
+        created_at=job.created_at
+    )
+
+@router.get("/jobs/events")
+async def stream_job_events(
+    job_ids: List[str] = Query(..., description="Jobs to follow"),
+    timeout: float = Query(None, gt=0, description="Seconds to stream, capped at LONG_POLL_MAX_TIMEOUT"),
+    job_manager: JobManager = Depends(get_job_manager),
+    event_bus: JobEventBus = Depends(get_job_event_bus)
+):
+    """Stream status events for a set of jobs as Server-Sent Events until all are done or failed."""
+    if len(job_ids) > settings.BULK_LOOKUP_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"Too many job ids, at most {settings.BULK_LOOKUP_MAX_IDS} per request")
+    
+    timeout = min(timeout or settings.LONG_POLL_MAX_TIMEOUT, settings.LONG_POLL_MAX_TIMEOUT)
+    return StreamingResponse(
+        _job_event_stream(list(dict.fromkeys(job_ids)), timeout, job_manager, event_bus),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+async def _job_event_stream(
+    job_ids: List[str],
+    timeout: float,
+    job_manager: JobManager,
+    event_bus: JobEventBus
+) -> AsyncIterator[str]:
+    """Yield the current status of each job, then its completion event as it arrives."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    
+    async with event_bus.subscribe(job_ids) as subscription:
+        rows = await job_manager.get_job_statuses(job_ids)
+        await job_manager.close()
+        
+        pending = set()
+        for job_id in job_ids:
+            row = rows.get(job_id)
+            if not row:
+                yield _format_event("error", {"job_id": job_id, "error": "Job not found"})
+                continue
+            yield _format_event("status", {"job_id": job_id, "status": row.status.value})
+            if row.status not in TERMINAL_STATUSES:
+                pending.add(job_id)
+        
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                yield _format_event("timeout", {"job_ids": sorted(pending)})
+                break
+            
+            event = await subscription.get(min(remaining, settings.JOB_EVENTS_KEEPALIVE_SECONDS))
+            if event is None:
+                # Keep intermediaries from closing an idle stream
+                yield ": keep-alive\n\n"
+            elif event.job_id in pending:
+                yield _format_event("status", {"job_id": event.job_id, "status": event.status.value})
+                pending.discard(event.job_id)
+
+def _format_event(event: str, data: dict) -> str:
+    """Format a Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
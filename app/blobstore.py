@@ -0,0 +1,76 @@
+"""
+Minimal HTTP object store, a local stand-in for the `http` storage backend.
+
+Blobs are kept under BLOBSTORE_DIR and served with PUT, GET, HEAD and
+DELETE on `/blobs/<key>`, the API `HttpBlobStore` speaks. It is meant for
+development and tests, not for production data. Run it with:
+
+    uvicorn app.blobstore:app --port 9000
+"""
+
+import os
+import tempfile
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from app.config import settings
+from app.services.blocking_io import blocking_io
+from app.services.storage import LocalBlobStore
+
+def create_blobstore_app(root: str) -> FastAPI:
+    """Create an object store app keeping its blobs under a directory."""
+    blobs = LocalBlobStore(root)
+    blobstore = FastAPI(title="Blob Store Stand-in")
+    
+    def blob_path(key: str) -> str:
+        """Get the location of a key, refusing keys outside the store."""
+        try:
+            return blobs.path(key)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    
+    @blobstore.put("/blobs/{key:path}", status_code=201)
+    async def put_blob(key: str, request: Request) -> Response:
+        """Store the streamed request body under a key."""
+        path = blob_path(key)
+        await blocking_io.run(os.makedirs, os.path.dirname(path), exist_ok=True)
+        fd, temp_path = await blocking_io.run(tempfile.mkstemp, dir=os.path.dirname(path), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                async for chunk in request.stream():
+                    await blocking_io.run(temp_file.write, chunk)
+                await blocking_io.run(temp_file.flush)
+        except BaseException:
+            await blocking_io.run(os.remove, temp_path)
+            raise
+        await blobs.put_file(temp_path, key)
+        return Response(status_code=201)
+    
+    @blobstore.get("/blobs/{key:path}")
+    async def get_blob(key: str) -> FileResponse:
+        """Stream the blob stored under a key."""
+        path = blob_path(key)
+        if not await blobs.exists(key):
+            raise HTTPException(status_code=404, detail="Blob not found")
+        return FileResponse(path)
+    
+    @blobstore.head("/blobs/{key:path}")
+    async def head_blob(key: str) -> Response:
+        """Answer whether a blob is stored under a key, with its size."""
+        path = blob_path(key)
+        if not await blobs.exists(key):
+            return Response(status_code=404)
+        size = await blocking_io.run(os.path.getsize, path)
+        return Response(headers={"Content-Length": str(size)})
+    
+    @blobstore.delete("/blobs/{key:path}", status_code=204)
+    async def delete_blob(key: str) -> Response:
+        """Delete the blob stored under a key."""
+        blob_path(key)
+        if not await blobs.exists(key):
+            raise HTTPException(status_code=404, detail="Blob not found")
+        await blobs.delete(key)
+        return Response(status_code=204)
+    
+    return blobstore
+
+app = create_blobstore_app(settings.BLOBSTORE_DIR)
@@ -18,21 +18,129 @@ class Settings(BaseSettings):
     
     # Database Settings
     DATABASE_URL: str = "sqlite+aiosqlite:///./test.db"
+    DATABASE_ECHO: bool = False  # Log every SQL statement
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 16 * 1024  # 16MB
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024  # 256MB
+    DB_POOL_SIZE: int = 5  # Server databases only
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
     
     # Redis Settings
+    REDIS_URL: str = "redis://localhost:6379"
     CELERY_BROKER_URL: str = "redis://localhost:6379"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379"
     
     # Celery Settings
     CELERY_WORKERS: int = 1
+    WORKER_MODE: str = "prefork"  # "prefork" or "async"
+    WORKER_ASYNC_CONCURRENCY: int = 32
+    CELERY_INTERACTIVE_QUEUE: str = "interactive"
+    CELERY_BULK_QUEUE: str = "bulk"
+    WORKER_PREFETCH_MULTIPLIER: int = 1
+    CELERY_VISIBILITY_TIMEOUT: int = 3600  # Seconds before Redis redelivers an unacknowledged task
     
     # File Upload Settings
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     UPLOAD_DIR: str = "data/images"
+    UPLOAD_CHUNK_SIZE: int = 64 * 1024  # 64KB
+    DEDUP_ENABLED: bool = True
+    MAX_BATCH_FILES: int = 100
+    BLOCKING_IO_WORKERS: int = 8  # Threads for blocking file and libmagic calls, 0 runs them on the event loop
+    
+    # Storage Settings
+    STORAGE_BACKEND: str = "local"  # "local" or "http"
+    STORAGE_SHARD_DEPTH: int = 2  # Hash-prefix directory levels of new storage keys
+    STORAGE_HTTP_URL: str = "http://localhost:9000/blobs"
+    STORAGE_HTTP_TIMEOUT: float = 30.0
+    STORAGE_CACHE_DIR: str = "data/cache"  # Where workers keep blobs fetched over HTTP
+    BLOBSTORE_DIR: str = "data/blobs"  # Root of the stand-in object store
+    
+    # Admission Control Settings
+    ADMISSION_MAX_OUTSTANDING_JOBS: int = 10000  # Queued plus processing jobs, 0 disables the limit
+    ADMISSION_REFRESH_SECONDS: float = 1.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 5
+    ADMISSION_TENANT_RATE: float = 0.0  # Jobs per second per tenant, 0 disables the rate limit
+    ADMISSION_TENANT_BURST: int = 100
+    ADMISSION_MAX_TRACKED_TENANTS: int = 10000
+    
+    # Lookup Settings
+    BULK_LOOKUP_MAX_IDS: int = 1000
+    JOB_LIST_DEFAULT_LIMIT: int = 50
+    JOB_LIST_MAX_LIMIT: int = 500
+    
+    # Job Event Settings
+    JOB_EVENTS_BACKEND: str = "redis"  # "redis" or "memory" (single process only)
+    JOB_EVENTS_CHANNEL: str = "job-events"
+    LONG_POLL_MAX_TIMEOUT: float = 60.0
+    JOB_EVENTS_KEEPALIVE_SECONDS: float = 15.0
+    
+    # Result Cache Settings
+    RESULT_CACHE_BACKEND: str = "memory"  # "memory", "redis" (memory plus a shared Redis tier) or "none"
+    RESULT_CACHE_MAX_ENTRIES: int = 10000
+    RESULT_CACHE_TTL_SECONDS: float = 3600.0
+    RESULT_CACHE_KEY_PREFIX: str = "job-result:"
+    
+    # Tenant Settings
+    TENANT_MAX_CONCURRENT_JOBS: int = 0  # Per tenant across all workers, 0 disables the cap
+    TENANT_LIMIT_BACKEND: str = "redis"  # "redis" or "memory" (single worker process only)
+    TENANT_LIMIT_KEY_PREFIX: str = "tenant-jobs:"
+    TENANT_LIMIT_LEASE_SECONDS: int = 600
+    TENANT_LIMIT_RETRY_DELAY: float = 2.0
+    TENANT_LIMIT_MAX_RETRY_DELAY: float = 60.0
+    
+    # Metrics Settings
+    WORKER_METRICS_PORT: int = 9100  # Worker exporter port, 0 disables it
+    
+    # Profiling Settings
+    PROFILING_ENABLED: bool = False  # Nothing is profiled unless set
+    PROFILING_SAMPLE_RATE: float = 0.0  # Fraction of requests and tasks profiled
+    PROFILING_HEADER: str = "X-Profile"  # Requests with this header set to 1 are profiled
+    PROFILING_DIR: str = "data/profiles"
+    
+    # Preprocessing Settings
+    PREPROCESS_ENABLED: bool = True
+    PREPROCESS_MAX_SIDE: int = 1024  # Longest side of the image given to the describer, in pixels
+    PREPROCESS_FORMAT: str = "JPEG"  # "JPEG", "PNG" or "WEBP"
+    PREPROCESS_QUALITY: int = 85
+    PREPROCESS_WORKERS: int = 2  # Processes in async worker mode
+    
+    # Describer Settings
+    DESCRIBER_BACKEND: str = "mock"  # "mock" or "stub"
+    DESCRIBER_STUB_LATENCY_MS: int = 50
+    
+    # Description Batching Settings
+    DESCRIBE_BATCH_MAX_SIZE: int = 1  # 1 disables batching
+    DESCRIBE_BATCH_MAX_WAIT_MS: int = 50
     
     # Task Settings
     TASK_MAX_RETRIES: int = 3
-    TASK_RETRY_DELAY: int = 60
+    TASK_RETRY_DELAY: int = 60  # Backoff bound of the first retry, doubling on each one after
+    TASK_RETRY_MAX_DELAY: int = 900  # Cap of the backoff bound
+    
+    # Lease Settings
+    JOB_LEASE_SECONDS: int = 120  # A processing job whose lease is not renewed for this long is stale
+    JOB_LEASE_HEARTBEAT_SECONDS: int = 30
+    REAPER_ENABLED: bool = True  # Schedules the stale job reaper on Celery beat
+    REAPER_INTERVAL_SECONDS: int = 60
+    REAPER_BATCH_SIZE: int = 500
+    REAPER_MAX_ATTEMPTS: int = 5  # A stale job claimed this many times is failed instead of requeued
+    
+    # Retention Settings
+    RETENTION_ENABLED: bool = True  # Schedules the retention task on Celery beat
+    RETENTION_IMAGE_TTL_DONE_HOURS: float = 168  # Hours after a job finished, 0 keeps forever
+    RETENTION_IMAGE_TTL_FAILED_HOURS: float = 24
+    RETENTION_JOB_TTL_DONE_HOURS: float = 720
+    RETENTION_JOB_TTL_FAILED_HOURS: float = 168
+    RETENTION_BATCH_SIZE: int = 500
+    RETENTION_MAX_BATCHES_PER_RUN: int = 20
+    RETENTION_BATCH_PAUSE_SECONDS: float = 0.5
+    RETENTION_INTERVAL_SECONDS: int = 600
+    RETENTION_ARCHIVE_DIR: str = ""  # Deleted job rows are appended here as JSON lines, empty to not archive
 
 # Global settings instance
 settings = Settings() 
\ No newline at end of file
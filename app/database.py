@@ -1,17 +1,166 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from typing import Any, Dict, Optional
+from sqlalchemy import Enum, event, inspect, literal
+from sqlalchemy.dialects.postgresql import CreateEnumType
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.models import Base
 from app.config import settings
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
-AsyncSessionLocal = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+SQLITE_JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+SQLITE_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
 
-async def init_db() -> None:
-    """Initialize the database and create all tables."""
-    async with engine.begin() as conn:
+def create_engine(database_url: Optional[str] = None) -> AsyncEngine:
+    """
+    Create an async engine, with its own connection pool, from settings.
+    
+    SQLite connections get the SQLITE_* pragmas applied as they are opened.
+    Server databases get a connection pool sized by the DB_POOL_* settings.
+    
+    Args:
+        database_url: Database URL, DATABASE_URL by default
+    
+    Returns:
+        AsyncEngine: The configured engine
+    """
+    url = make_url(database_url or settings.DATABASE_URL)
+    if url.get_backend_name() == "sqlite":
+        engine = create_async_engine(url, echo=settings.DATABASE_ECHO)
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+        return engine
+    
+    return create_async_engine(url, echo=settings.DATABASE_ECHO, **_pool_options())
+
+def create_session_factory(engine: AsyncEngine) -> sessionmaker:
+    """Create a session factory bound to the given engine."""
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """
+    Get the pragmas applied to every SQLite connection.
+    
+    Raises:
+        ValueError: If the journal or synchronous mode is not a SQLite mode
+    """
+    journal_mode = settings.SQLITE_JOURNAL_MODE.upper()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Unknown SQLite journal mode: {settings.SQLITE_JOURNAL_MODE}")
+    synchronous = settings.SQLITE_SYNCHRONOUS.upper()
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"Unknown SQLite synchronous mode: {settings.SQLITE_SYNCHRONOUS}")
+    
+    return {
+        "journal_mode": journal_mode,
+        "synchronous": synchronous,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        # A negative cache size is in KiB rather than pages
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+    }
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply the configured pragmas to a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def _pool_options() -> Dict[str, Any]:
+    """Get the connection pool options for server databases."""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+engine = create_engine()
+AsyncSessionLocal = create_session_factory(engine)
+
+async def init_db(db_engine: Optional[AsyncEngine] = None) -> None:
+    """
+    Initialize the database and create all tables and indexes.
+    
+    A database created by an earlier version is migrated in place: columns
+    and indexes added to its tables since are created as well, along with
+    the enum types and values they need on PostgreSQL.
+    
+    Args:
+        db_engine: Engine of the database, the application's by default
+    """
+    async with (db_engine or engine).begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_enum_values)
+        await conn.run_sync(_add_missing_columns)
+        await conn.run_sync(_create_missing_indexes)
+
+def _add_missing_enum_values(sync_conn) -> None:
+    """
+    Create enum types added since, and add the values added to existing ones, on PostgreSQL.
+    
+    PostgreSQL keeps each enum as a type of its own, which `create_all` only
+    creates along with a new table and ADD COLUMN never creates. Values are
+    added with ALTER TYPE ... ADD VALUE, which needs PostgreSQL 12 or later to
+    run in the migration's transaction. Other databases keep an enum's values
+    with its column, so there is nothing to do.
+    """
+    if sync_conn.dialect.name != "postgresql":
+        return
+    existing = {enum["name"]: enum["labels"] for enum in inspect(sync_conn).get_enums()}
+    preparer = sync_conn.dialect.identifier_preparer
+    enum_types = {
+        column.type.name: column.type
+        for table in Base.metadata.sorted_tables
+        for column in table.columns
+        if isinstance(column.type, Enum) and column.type.native_enum
+    }
+    for name, enum_type in enum_types.items():
+        if name not in existing:
+            sync_conn.execute(CreateEnumType(enum_type))
+            continue
+        for label in enum_type.enums:
+            if label not in existing[name]:
+                quoted = label.replace("'", "''")
+                sync_conn.exec_driver_sql(f"ALTER TYPE {preparer.format_type(enum_type)} ADD VALUE IF NOT EXISTS '{quoted}'")
+
+def _add_missing_columns(sync_conn) -> None:
+    """
+    Add columns added to tables that already existed, which `create_all` leaves alone.
+    
+    A column is added with its scalar default, if it has one, so existing
+    rows get the value new rows would; without one it is added as nullable.
+    The types of enum columns must exist already, see `_add_missing_enum_values`.
+    """
+    inspector = inspect(sync_conn)
+    preparer = sync_conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = (
+                f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} "
+                f"{column.type.compile(dialect=sync_conn.dialect)}"
+            )
+            if column.default is not None and column.default.is_scalar:
+                default = literal(column.default.arg, column.type).compile(
+                    dialect=sync_conn.dialect, compile_kwargs={"literal_binds": True}
+                )
+                ddl += f" DEFAULT {default}"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+            sync_conn.exec_driver_sql(ddl)
+
+def _create_missing_indexes(sync_conn) -> None:
+    """Create indexes added to tables that already existed."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(sync_conn, checkfirst=True)
 
 async def get_db_session() -> AsyncSession:
     """Yield an async database session for dependency injection."""
     async with AsyncSessionLocal() as session:
-        yield session 
\ No newline at end of file
+        yield session
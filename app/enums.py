@@ -4,5 +4,14 @@ class JobStatus(str, Enum):
     """Enumeration of possible job statuses."""
     QUEUED = "queued"
     PROCESSING = "processing"
+    RETRYING = "retrying"
     DONE = "done"
-    FAILED = "failed" 
\ No newline at end of file
+    FAILED = "failed"
+
+# Statuses after which a job no longer changes on its own
+TERMINAL_STATUSES = frozenset({JobStatus.DONE, JobStatus.FAILED})
+
+class JobPriority(str, Enum):
+    """Enumeration of job priorities, each consumed from its own queue."""
+    INTERACTIVE = "interactive"
+    BULK = "bulk"
@@ -1,11 +1,35 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from app.api.routes import jobs
+from app.metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, render_metrics
+from app.profiling import ProfilingMiddleware
+from app.services.blocking_io import blocking_io
+from app.services.job_events import job_event_bus
+from app.services.result_cache import result_cache
+from app.services.storage import blob_store
 
-app = FastAPI(title="Asynchronous Image Description Service")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release process-wide resources on shutdown."""
+    yield
+    await job_event_bus.close()
+    await result_cache.close()
+    await blob_store.close()
+    blocking_io.shutdown()
+
+app = FastAPI(title="Asynchronous Image Description Service", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
 
 app.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint to verify service is running."""
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Expose service metrics in the Prometheus text format."""
+    # Multiprocess metrics are read from files
+    return Response(await blocking_io.run(render_metrics), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,178 @@
+from datetime import datetime, timezone
+from typing import Optional
+import logging
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from a cached read to a slow describer call
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Queue wait buckets in seconds, up to hours of backlog
+QUEUE_WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0, 14400.0)
+# Upload size buckets in bytes, up to the default MAX_FILE_SIZE
+SIZE_BUCKETS = (16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024, 2 * 1024 * 1024, 5 * 1024 * 1024, 10 * 1024 * 1024)
+
+# API
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests being served", multiprocess_mode="livesum"
+)
+UPLOAD_SIZE = Histogram("upload_size_bytes", "Size of uploaded images", buckets=SIZE_BUCKETS)
+UPLOAD_VALIDATION_LATENCY = Histogram(
+    "upload_validation_seconds", "Time spent sniffing the content type of an upload", buckets=LATENCY_BUCKETS
+)
+
+# Worker pipeline
+JOB_QUEUE_WAIT = Histogram(
+    "job_queue_wait_seconds", "Time from publishing a job's task until a worker claims it",
+    ["priority"], buckets=QUEUE_WAIT_BUCKETS
+)
+IMAGE_PROCESSING_LATENCY = Histogram(
+    "image_processing_seconds", "Time spent describing a batch of images", buckets=LATENCY_BUCKETS
+)
+IMAGE_PREPROCESSING_LATENCY = Histogram(
+    "image_preprocessing_seconds", "Time spent normalizing an image before description", buckets=LATENCY_BUCKETS
+)
+DB_TRANSITION_LATENCY = Histogram(
+    "job_db_transition_seconds", "Latency of job state transition statements by target status",
+    ["status"], buckets=LATENCY_BUCKETS
+)
+JOBS_PROCESSED = Counter("jobs_processed_total", "Processing task runs by outcome", ["outcome"])
+JOB_RETRIES = Counter("job_retries_total", "Failed processing attempts that will be retried")
+JOB_FAILURES = Counter("job_failures_total", "Jobs that failed after their last retry")
+JOBS_REAPED = Counter(
+    "jobs_reaped_total", "Processing jobs taken back from workers that stopped renewing their lease", ["outcome"]
+)
+JOBS_IN_FLIGHT = Gauge(
+    "worker_jobs_in_flight", "Jobs being processed by the worker", multiprocess_mode="livesum"
+)
+
+# Retention
+RETENTION_IMAGES_DELETED = Counter("retention_images_deleted_total", "Stored images deleted after their TTL")
+RETENTION_BYTES_RECLAIMED = Counter(
+    "retention_bytes_reclaimed_total", "Bytes freed by deleting stored images and their preprocessed copies"
+)
+RETENTION_JOBS_ARCHIVED = Counter("retention_jobs_archived_total", "Job rows written to the retention archive")
+RETENTION_JOBS_DELETED = Counter("retention_jobs_deleted_total", "Job rows deleted after their TTL")
+
+def collector_registry() -> CollectorRegistry:
+    """
+    Get the registry to expose.
+    
+    With PROMETHEUS_MULTIPROC_DIR set, as it must be for several web or
+    prefork worker processes, the metrics of all processes are aggregated from
+    that directory. Otherwise the current process's metrics are exposed.
+    """
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+def render_metrics() -> bytes:
+    """Render the metrics in the Prometheus text format, whose content type is CONTENT_TYPE_LATEST."""
+    return generate_latest(collector_registry())
+
+def start_worker_exporter(port: int, pool_processes: bool = False) -> bool:
+    """
+    Serve the worker's metrics over HTTP on a port of its own.
+    
+    A prefork worker runs its tasks in pool processes, whose metrics only
+    reach the exporter of the main process through PROMETHEUS_MULTIPROC_DIR.
+    Without it the exporter would serve empty metrics, so it is not started.
+    
+    Args:
+        port: Port to serve the metrics on
+        pool_processes: Whether tasks run in pool processes rather than the main process
+        
+    Returns:
+        bool: Whether the exporter was started
+    """
+    if pool_processes and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        logger.warning(
+            "Not serving worker metrics on port %s: set PROMETHEUS_MULTIPROC_DIR to collect the metrics of prefork pool processes",
+            port
+        )
+        return False
+    start_http_server(port, registry=collector_registry())
+    return True
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the live gauges of a worker process that exited."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+def observe_queue_wait(job: Job, now: Optional[datetime] = None) -> None:
+    """
+    Record how long a job waited between its task being published and being claimed.
+    
+    The wait is measured from the sub-second enqueued_at, or from the creation
+    time, stored to the second only, for a job claimed without it.
+    """
+    queued_at = job.enqueued_at or job.created_at
+    if queued_at is None:
+        return
+    # SQLite returns UTC timestamps without a time zone
+    if queued_at.tzinfo is None:
+        queued_at = queued_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    priority = job.priority.value if job.priority is not None else "unknown"
+    JOB_QUEUE_WAIT.labels(priority=priority).observe(max(0.0, (now - queued_at).total_seconds()))
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording the latency and in-flight count of HTTP requests.
+    
+    Requests are labeled by route template, such as /api/v1/status/{job_id},
+    so job ids do not multiply the series. Streaming responses are timed
+    until their last chunk is sent.
+    """
+    
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize MetricsMiddleware around an ASGI app."""
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve a request, timing it if it is HTTP."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        status = "500"
+        
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+        
+        started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=status
+            ).observe(time.perf_counter() - started)
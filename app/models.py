@@ -1,11 +1,25 @@
-from sqlalchemy import Column, String, Text, DateTime, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index, Enum as SQLEnum
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.sql import func
-from app.enums import JobStatus
+from app.enums import JobStatus, JobPriority
 import uuid
 
 Base = declarative_base()
 
+# SQLite fills timestamps with CURRENT_TIMESTAMP, which has no fractional
+# seconds. Bound values use the same format so that equal timestamps compare
+# equal, as keyset pagination needs.
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite"
+)
+
+# Stage timestamps are set by the application with sub-second precision
+PreciseTimestamp = DateTime(timezone=True)
+
 def generate_uuid() -> str:
     """Generate a new UUID string."""
     return str(uuid.uuid4())
@@ -13,12 +27,41 @@ def generate_uuid() -> str:
 class Job(Base):
     """SQLAlchemy model for a job record."""
     __tablename__ = "jobs"
+    __table_args__ = (
+        # Listing by status, newest first, and the keyset tie-break on id
+        Index("ix_jobs_status_created_at", "status", "created_at", "id"),
+        Index("ix_jobs_created_at", "created_at", "id"),
+        # Finding jobs that have not moved for a while
+        Index("ix_jobs_updated_at", "updated_at"),
+        # Finding the other jobs sharing a stored image before retention deletes it
+        Index("ix_jobs_image_path", "image_path"),
+        # Listing the dead-letter queue, most recent first
+        Index("ix_jobs_dead_lettered_at", "dead_lettered_at", "id"),
+        # Finding processing jobs whose worker stopped renewing their lease
+        Index("ix_jobs_status_lease_expires_at", "status", "lease_expires_at"),
+    )
     
     id: str = Column(String(36), primary_key=True, default=generate_uuid)
     status: JobStatus = Column(SQLEnum(JobStatus), nullable=False, default=JobStatus.QUEUED)
     image_path: str = Column(String(500), nullable=False)
     file_extension: str = Column(String(10), nullable=False)
+    content_hash: str = Column(String(64), nullable=True, index=True)
     image_description: str = Column(Text, nullable=True)
-    generated_by: str = Column(String(100), nullable=False, default="vision-node-gpt")
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now()) 
\ No newline at end of file
+    generated_by: str = Column(String(100), nullable=False)  # Set by JobManager from the configured describer
+    priority: JobPriority = Column(SQLEnum(JobPriority), nullable=False, default=JobPriority.INTERACTIVE)
+    tenant_id: str = Column(String(100), nullable=False, default="anonymous")
+    created_at = Column(Timestamp, server_default=func.now())
+    updated_at = Column(Timestamp, onupdate=func.now())
+    # Stage timings, in UTC, for latency forensics on individual jobs
+    accepted_at = Column(PreciseTimestamp, nullable=True)  # Submission admitted
+    stored_at = Column(PreciseTimestamp, nullable=True)  # Upload validated and written to disk
+    enqueued_at = Column(PreciseTimestamp, nullable=True)  # Processing task published
+    picked_up_at = Column(PreciseTimestamp, nullable=True)  # First claimed by a worker
+    describer_started_at = Column(PreciseTimestamp, nullable=True)  # Last describer call started
+    describer_finished_at = Column(PreciseTimestamp, nullable=True)  # Last describer call returned
+    completed_at = Column(PreciseTimestamp, nullable=True)  # Result stored
+    attempts: int = Column(Integer, nullable=False, default=0)
+    image_deleted_at = Column(PreciseTimestamp, nullable=True)  # Stored image removed by retention
+    last_error: str = Column(Text, nullable=True)  # Error of the last failed attempt
+    dead_lettered_at = Column(PreciseTimestamp, nullable=True)  # Failed for good, replayable until then
+    lease_expires_at = Column(PreciseTimestamp, nullable=True)  # Renewed by the processing worker, stale once passed 
\ No newline at end of file
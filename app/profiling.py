@@ -0,0 +1,135 @@
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+import cProfile
+import os
+import random
+import re
+import threading
+import uuid
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.config import settings
+from app.services.blocking_io import blocking_io
+
+# Only one profiler can be active at a time in a process
+_profiling = threading.Lock()
+# Profilers of running tasks, by task id
+_task_profilers: Dict[str, cProfile.Profile] = {}
+
+def should_profile(requested: bool = False) -> bool:
+    """
+    Decide whether to profile a request or task.
+    
+    Nothing is profiled unless PROFILING_ENABLED is set. Then a request asking
+    for it with the profiling header is profiled, and others are sampled at
+    PROFILING_SAMPLE_RATE.
+    """
+    if not settings.PROFILING_ENABLED:
+        return False
+    return requested or random.random() < settings.PROFILING_SAMPLE_RATE
+
+def start_profile() -> Optional[cProfile.Profile]:
+    """Start profiling the current thread, or return None if another profile is in progress."""
+    if not _profiling.acquire(blocking=False):
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except BaseException:
+        _profiling.release()
+        raise
+    return profiler
+
+def stop_profile(profiler: cProfile.Profile) -> None:
+    """Stop a profile started by `start_profile`."""
+    profiler.disable()
+    _profiling.release()
+
+def profile_path(kind: str, name: str) -> str:
+    """Get a unique path in PROFILING_DIR for the profile of a request or task."""
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_") or "root"
+    return os.path.join(settings.PROFILING_DIR, f"{kind}-{safe_name}-{timestamp}-{uuid.uuid4().hex[:8]}.prof")
+
+def write_profile(profiler: cProfile.Profile, path: str) -> None:
+    """Write a profile in pstats format."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    profiler.dump_stats(path)
+
+def _call_here(func: Callable[..., Any], *args: Any) -> Any:
+    """Call a function on the current thread."""
+    return func(*args)
+
+def start_task_profile(task_id: str, call_in_task_thread: Callable[..., Any] = _call_here) -> None:
+    """
+    Profile a task about to run, if it is sampled.
+    
+    cProfile only sees the thread it was enabled on, so the profiler is
+    started through `call_in_task_thread`, which calls a function on the
+    thread that runs the task's code: the current one by default, or the
+    worker's event loop thread when the task only waits for a loop running
+    elsewhere.
+    """
+    if not should_profile():
+        return
+    profiler = call_in_task_thread(start_profile)
+    if profiler is not None:
+        _task_profilers[task_id] = profiler
+
+def finish_task_profile(
+    task_id: str,
+    task_name: str,
+    call_in_task_thread: Callable[..., Any] = _call_here
+) -> Optional[str]:
+    """Stop profiling a task, on the thread it was started on, and write its profile, returning its path."""
+    profiler = _task_profilers.pop(task_id, None)
+    if profiler is None:
+        return None
+    call_in_task_thread(stop_profile, profiler)
+    path = profile_path("task", task_name)
+    write_profile(profiler, path)
+    return path
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling sampled requests with cProfile.
+    
+    A request is profiled when PROFILING_ENABLED is set and it either carries
+    the PROFILING_HEADER header or is picked at PROFILING_SAMPLE_RATE. Its
+    profile is written in pstats format to PROFILING_DIR and the file name is
+    returned in the profiling header of the response. The profile covers
+    the event loop thread while the request runs, so other requests served
+    meanwhile appear in it too. When profiling is off the cost per request is
+    one settings check.
+    """
+    
+    def __init__(self, app: ASGIApp) -> None:
+        """Initialize ProfilingMiddleware around an ASGI app."""
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Serve a request, profiling it if it is selected."""
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        
+        requested = Headers(scope=scope).get(settings.PROFILING_HEADER, "").lower() in ("1", "true", "yes")
+        profiler = start_profile() if should_profile(requested) else None
+        if profiler is None:
+            await self.app(scope, receive, send)
+            return
+        
+        path = profile_path("request", f"{scope['method']}{scope['path']}")
+        
+        async def send_with_profile_name(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (settings.PROFILING_HEADER.lower().encode(), os.path.basename(path).encode())
+                ]
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_with_profile_name)
+        finally:
+            stop_profile(profiler)
+            await blocking_io.run(write_profile, profiler, path)
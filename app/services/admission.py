@@ -0,0 +1,139 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+import asyncio
+import math
+import time
+from fastapi import HTTPException
+from app.config import settings
+from app.services.job_manager import JobManager
+
+@dataclass
+class TokenBucket:
+    """Submission allowance of one tenant, refilled at a steady rate."""
+    tokens: float
+    refilled_at: float
+
+class AdmissionController:
+    """
+    Backpressure on job submission.
+    
+    Submissions are refused with 503 once the number of outstanding (queued
+    or processing) jobs would pass `max_outstanding`, so the backlog stays at
+    what the workers can drain instead of growing until Redis or the disk
+    fills up. The count is read from the database at most every
+    `refresh_seconds` and jobs admitted in between are added to it, so every
+    web process sees the load of the whole service without a query per
+    submission. Admitted jobs that end up not being queued, because their
+    upload was invalid or a duplicate, are given back with `release`.
+    
+    With a `tenant_rate`, each tenant also has a token bucket of `tenant_burst`
+    jobs refilled at `tenant_rate` jobs per second, and a tenant that runs it
+    dry is refused with 429. Buckets are kept per process for at most
+    `max_tracked_tenants` tenants, least recently seen first out. Tokens pay
+    for the submission itself, so they are not given back.
+    """
+    
+    def __init__(
+        self,
+        max_outstanding: int,
+        refresh_seconds: float = 1.0,
+        retry_after_seconds: int = 5,
+        tenant_rate: float = 0.0,
+        tenant_burst: int = 100,
+        max_tracked_tenants: int = 10000
+    ) -> None:
+        """Initialize AdmissionController; a limit of 0 disables the corresponding check."""
+        self.max_outstanding = max_outstanding
+        self.refresh_seconds = refresh_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.tenant_rate = tenant_rate
+        self.tenant_burst = tenant_burst
+        self.max_tracked_tenants = max_tracked_tenants
+        self._outstanding = 0
+        self._refreshed_at: Optional[float] = None
+        self._refresh_lock = asyncio.Lock()
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+    
+    async def admit(self, job_manager: JobManager, tenant_id: str, jobs: int = 1) -> None:
+        """
+        Admit a submission of one or more jobs, or refuse it.
+        
+        Args:
+            job_manager: Job manager used to count outstanding jobs
+            tenant_id: The tenant submitting the jobs
+            jobs: Number of jobs the submission may create
+        
+        Raises:
+            HTTPException: 503 if the service is at its backlog limit, or 429 if
+                the tenant is over its submission rate, both with Retry-After
+        """
+        if self.max_outstanding > 0:
+            outstanding = await self._count_outstanding(job_manager)
+            if outstanding + jobs > self.max_outstanding:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Too many jobs outstanding, retry later",
+                    headers={"Retry-After": str(self.retry_after_seconds)}
+                )
+        
+        if self.tenant_rate > 0:
+            self._take_tokens(tenant_id, jobs)
+        
+        # Count the admitted jobs until the next refresh sees them
+        self._outstanding += jobs
+    
+    def release(self, jobs: int = 1) -> None:
+        """Give back admitted jobs that will not be queued after all."""
+        self._outstanding = max(0, self._outstanding - jobs)
+    
+    async def _count_outstanding(self, job_manager: JobManager) -> int:
+        """Get the number of outstanding jobs, reading it again once it is stale."""
+        stale = self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_seconds
+        # While one request refreshes the count, the others use the previous one
+        if stale and not self._refresh_lock.locked():
+            async with self._refresh_lock:
+                self._outstanding = await job_manager.count_outstanding_jobs()
+                self._refreshed_at = time.monotonic()
+        return self._outstanding
+    
+    def _take_tokens(self, tenant_id: str, jobs: int) -> None:
+        """
+        Take a submission's jobs from the tenant's bucket.
+        
+        A submission larger than the burst waits for a full bucket and leaves
+        it in debt, which delays the tenant's next submissions accordingly.
+        """
+        now = time.monotonic()
+        bucket = self._buckets.pop(tenant_id, None)
+        if bucket is None:
+            bucket = TokenBucket(tokens=self.tenant_burst, refilled_at=now)
+        bucket.tokens = min(self.tenant_burst, bucket.tokens + (now - bucket.refilled_at) * self.tenant_rate)
+        bucket.refilled_at = now
+        self._buckets[tenant_id] = bucket
+        while len(self._buckets) > self.max_tracked_tenants:
+            self._buckets.popitem(last=False)
+        
+        needed = min(jobs, self.tenant_burst)
+        if bucket.tokens < needed:
+            retry_after = math.ceil((needed - bucket.tokens) / self.tenant_rate)
+            raise HTTPException(
+                status_code=429,
+                detail="Submission rate limit exceeded, retry later",
+                headers={"Retry-After": str(retry_after)}
+            )
+        bucket.tokens -= jobs
+
+def create_admission_controller() -> AdmissionController:
+    """Create the admission controller configured by the ADMISSION_* settings."""
+    return AdmissionController(
+        settings.ADMISSION_MAX_OUTSTANDING_JOBS,
+        settings.ADMISSION_REFRESH_SECONDS,
+        settings.ADMISSION_RETRY_AFTER_SECONDS,
+        settings.ADMISSION_TENANT_RATE,
+        settings.ADMISSION_TENANT_BURST,
+        settings.ADMISSION_MAX_TRACKED_TENANTS
+    )
+
+# Process-wide admission controller
+admission_controller = create_admission_controller()
@@ -0,0 +1,62 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+import asyncio
+import functools
+import threading
+from app.config import settings
+
+class BlockingIOExecutor:
+    """
+    Bounded thread pool for blocking filesystem and libmagic calls.
+    
+    Coroutines hand blocking calls to `run` instead of making them on the
+    event loop, so a slow disk or a large upload delays only the request
+    waiting for it. At most `max_workers` calls run at once and the others
+    queue, which keeps a burst of uploads from starving the threads that
+    starlette uses for other work. The pool is created on first use and is
+    shared by every event loop of the process.
+    """
+    
+    def __init__(self, max_workers: int) -> None:
+        """Initialize BlockingIOExecutor; with 0 workers calls run inline on the event loop."""
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    async def run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run a blocking call on the pool and wait for its result.
+        
+        Args:
+            func: The blocking callable
+            *args: Positional arguments of the call
+            **kwargs: Keyword arguments of the call
+        
+        Returns:
+            Any: What the call returned
+        """
+        if self.max_workers <= 0:
+            return func(*args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool(), functools.partial(func, *args, **kwargs))
+    
+    def shutdown(self) -> None:
+        """Stop the pool once its queued calls are done; it is created again if used afterwards."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+    
+    def _pool(self) -> ThreadPoolExecutor:
+        """Get the thread pool, creating it if needed."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="blocking-io")
+            return self._executor
+
+def create_blocking_io_executor() -> BlockingIOExecutor:
+    """Create the blocking I/O executor sized by BLOCKING_IO_WORKERS."""
+    return BlockingIOExecutor(settings.BLOCKING_IO_WORKERS)
+
+# Process-wide blocking I/O executor
+blocking_io = create_blocking_io_executor()
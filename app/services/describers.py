@@ -0,0 +1,124 @@
+from typing import Callable, Dict, List, Optional, Type
+import asyncio
+import os
+from app.config import settings
+
+class DescriberBackend:
+    """
+    Base class for image describer backends.
+    
+    A backend is created once per worker process, loaded and warmed up before
+    its first job, and closed when the process shuts down. `name` is recorded
+    as `Job.generated_by` for the descriptions it produces.
+    """
+    
+    name: str = ""
+    
+    async def load(self) -> None:
+        """Load model weights or open connections."""
+    
+    async def warmup(self) -> None:
+        """Prime the backend so the first real job is not slowed down."""
+    
+    async def close(self) -> None:
+        """Release everything acquired by load."""
+    
+    async def describe(self, image_paths: List[str]) -> List[str]:
+        """
+        Describe a batch of images.
+        
+        Args:
+            image_paths: Full paths of the image files
+        
+        Returns:
+            List[str]: One description per image, in the same order
+        """
+        raise NotImplementedError
+
+# Registered backends, selected by DESCRIBER_BACKEND
+DESCRIBER_BACKENDS: Dict[str, Type[DescriberBackend]] = {}
+
+def register_describer(key: str) -> Callable[[Type[DescriberBackend]], Type[DescriberBackend]]:
+    """Register a describer backend class under the given key."""
+    def decorator(backend_class: Type[DescriberBackend]) -> Type[DescriberBackend]:
+        DESCRIBER_BACKENDS[key] = backend_class
+        return backend_class
+    return decorator
+
+@register_describer("mock")
+class MockDescriber(DescriberBackend):
+    """Describer that simulates a remote vision model with a fixed description."""
+    
+    name = "vision-node-gpt"
+    
+    async def describe(self, image_paths: List[str]) -> List[str]:
+        """Return the mock description for every image."""
+        # Simulate processing time
+        await asyncio.sleep(2)
+        
+        # Mock image processing result
+        return ["A beautiful landscape with mountains and trees" for _ in image_paths]
+
+@register_describer("stub")
+class StubDescriber(DescriberBackend):
+    """CPU-only describer with configurable latency, for tests and benchmarks."""
+    
+    name = "stub"
+    
+    def __init__(self, latency_ms: Optional[int] = None) -> None:
+        """Initialize StubDescriber with a latency per describer call."""
+        self.latency_ms = settings.DESCRIBER_STUB_LATENCY_MS if latency_ms is None else latency_ms
+    
+    async def describe(self, image_paths: List[str]) -> List[str]:
+        """Return a description derived from each file's name and size."""
+        await asyncio.sleep(self.latency_ms / 1000)
+        return [
+            f"Image {os.path.basename(image_path)} of {os.path.getsize(image_path)} bytes"
+            for image_path in image_paths
+        ]
+
+def describer_class(key: Optional[str] = None) -> Type[DescriberBackend]:
+    """
+    Get a registered describer backend class, by default the one selected by DESCRIBER_BACKEND.
+    
+    Raises:
+        ValueError: If no backend is registered under the key
+    """
+    key = key or settings.DESCRIBER_BACKEND
+    if key not in DESCRIBER_BACKENDS:
+        raise ValueError(f"Unknown describer backend: {key}")
+    return DESCRIBER_BACKENDS[key]
+
+def describer_name() -> str:
+    """Get the name of the configured describer backend, without creating it."""
+    return describer_class().name
+
+def create_describer(key: Optional[str] = None) -> DescriberBackend:
+    """Create an unloaded describer backend, by default the one selected by DESCRIBER_BACKEND."""
+    return describer_class(key)()
+
+_describer: Optional[DescriberBackend] = None
+_describer_lock: Optional[asyncio.Lock] = None
+
+async def get_describer() -> DescriberBackend:
+    """Get the process-wide describer backend, loading and warming it up on first use."""
+    global _describer, _describer_lock
+    if _describer is not None:
+        return _describer
+    
+    if _describer_lock is None:
+        _describer_lock = asyncio.Lock()
+    async with _describer_lock:
+        if _describer is None:
+            describer = create_describer()
+            await describer.load()
+            await describer.warmup()
+            _describer = describer
+    return _describer
+
+async def close_describer() -> None:
+    """Close the process-wide describer backend, if it was loaded."""
+    global _describer, _describer_lock
+    describer, _describer, _describer_lock = _describer, None, None
+    if describer is not None:
+        await describer.close()
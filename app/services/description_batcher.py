@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.image_processor import ImageProcessor
+from app.models import Job
+from app.services.job_manager import JobManager
+
+class DescriptionBatcher:
+    """
+    Service that groups pending jobs into batched describer calls.
+    
+    Jobs are collected until `max_batch_size` are waiting or the oldest has
+    waited `max_wait_ms`, then described with one `process_images` call. The
+    results are written to every job of the batch still processing in a
+    single statement.
+    """
+    
+    def __init__(
+        self,
+        image_processor: ImageProcessor,
+        session_factory: Callable[[], AsyncSession],
+        max_batch_size: int,
+        max_wait_ms: int
+    ) -> None:
+        """Initialize DescriptionBatcher with a describer, a session factory and batch bounds."""
+        self.image_processor = image_processor
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._batches: set = set()
+    
+    async def describe(self, job_id: str, image_path: str) -> Optional[Job]:
+        """
+        Describe an image as part of the next batch and store the result on its job.
+        
+        Args:
+            job_id: The job identifier
+            image_path: Storage key of the image
+        
+        Returns:
+            Optional[Job]: The completed job, or None if it stopped processing before its result was stored
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((job_id, image_path, future))
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        
+        return await future
+    
+    def _flush(self) -> None:
+        """Start describing every pending job as one batch."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run_batch(batch))
+            # Keep a reference so the batch is not garbage collected mid-flight
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+    
+    async def _run_batch(self, batch: List[Tuple[str, str, asyncio.Future]]) -> None:
+        """Describe a batch and fan the results out to its jobs."""
+        try:
+            # An image that cannot be fetched fails only its own job, not the
+            # whole batch; the copies fetched here are reused by `process_images`
+            fetched = await asyncio.gather(
+                *(self.image_processor.storage.fetch(image_path) for _, image_path, _ in batch),
+                return_exceptions=True
+            )
+            ready = []
+            for (job_id, image_path, future), result in zip(batch, fetched):
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    ready.append((job_id, image_path, future))
+            
+            if not ready:
+                return
+            
+            describer = await self.image_processor.get_describer()
+            describer_started_at = datetime.now(timezone.utc)
+            descriptions = await self.image_processor.process_images([image_path for _, image_path, _ in ready])
+            describer_finished_at = datetime.now(timezone.utc)
+            
+            async with self.session_factory() as session:
+                job_manager = JobManager(session)
+                completed_jobs = await job_manager.update_job_results(
+                    {job_id: description for (job_id, _, _), description in zip(ready, descriptions)},
+                    describer.name,
+                    describer_started_at,
+                    describer_finished_at
+                )
+        except Exception as exc:
+            # No job of the batch may be left waiting for a result that never comes
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        
+        completed = {job.id: job for job in completed_jobs}
+        for job_id, _, future in ready:
+            if not future.done():
+                future.set_result(completed.get(job_id))
@@ -1,9 +1,25 @@
-from typing import Optional, Tuple
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
 import asyncio
+import hashlib
 import os
+import tempfile
+import time
 import magic
 from fastapi import UploadFile, HTTPException
 from app.config import settings
+from app.metrics import UPLOAD_SIZE, UPLOAD_VALIDATION_LATENCY, IMAGE_PROCESSING_LATENCY
+from app.services.blocking_io import blocking_io
+from app.services.describers import DescriberBackend, get_describer
+from app.services.preprocessor import ImagePreprocessor, image_preprocessor
+from app.services.storage import BlobStore, blob_store
+
+@dataclass
+class StagedUpload:
+    """An upload streamed to a temporary file, waiting to be moved into place."""
+    temp_path: str
+    size: int
+    sha256: str
 
 class ImageProcessor:
     """Service for processing images and managing file uploads."""
@@ -11,9 +27,17 @@ class ImageProcessor:
     # Allowed image file extensions
     ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp', '.tiff', '.tif'}
     
-    def __init__(self) -> None:
-        """Initialize ImageProcessor with upload directory from settings."""
+    def __init__(
+        self,
+        describer: Optional[DescriberBackend] = None,
+        preprocessor: Optional[ImagePreprocessor] = None,
+        storage: Optional[BlobStore] = None
+    ) -> None:
+        """Initialize ImageProcessor with the staging directory from settings and optional collaborators."""
         self.upload_dir = settings.UPLOAD_DIR
+        self.describer = describer
+        self.preprocessor = preprocessor or image_preprocessor
+        self.storage = storage or blob_store
     
     def validate_image_file(self, file: UploadFile) -> Tuple[bool, str]:
         """
@@ -41,17 +65,20 @@ class ImageProcessor:
             Tuple[bool, str]: (is_valid, error_message)
         """
         try:
-            mime_type = magic.from_buffer(file_content, mime=True)
+            with UPLOAD_VALIDATION_LATENCY.time():
+                mime_type = magic.from_buffer(file_content, mime=True)
             if not mime_type.startswith('image/'):
                 return False, f"File content type '{mime_type}' is not an image"
             return True, ""
         except Exception as e:
             return False, f"Error validating file content: {str(e)}"
     
-    def validate_uploaded_file(self, file: UploadFile, file_content: bytes) -> None:
+    async def validate_uploaded_file(self, file: UploadFile, file_content: bytes) -> None:
         """
         Validate uploaded file for image processing.
         
+        The content is sniffed with libmagic on the blocking I/O executor.
+        
         Raises:
             HTTPException: If validation fails
         """
@@ -61,33 +88,117 @@ class ImageProcessor:
             raise HTTPException(status_code=400, detail=error_msg)
         
         # Content validation
-        is_valid, error_msg = self.validate_image_content(file_content)
+        is_valid, error_msg = await blocking_io.run(self.validate_image_content, file_content)
         if not is_valid:
             raise HTTPException(status_code=400, detail=error_msg)
     
     async def process_image(self, image_path: str) -> str:
-        """Process image and return description."""
-        # Validate file exists
-        full_path = os.path.join(self.upload_dir, image_path)
-        if not os.path.exists(full_path):
-            raise FileNotFoundError(f"Image file not found: {full_path}")
+        """Process the image stored under a storage key and return description."""
+        descriptions = await self.process_images([image_path])
+        return descriptions[0]
+    
+    async def process_images(self, image_paths: List[str]) -> List[str]:
+        """Process a batch of stored images with one describer call and return a description per image."""
+        # Get local copies, failing if any image is missing
+        full_paths = await asyncio.gather(*(self.storage.fetch(image_path) for image_path in image_paths))
         
-        # Simulate processing time
-        await asyncio.sleep(2)
+        # Describe downscaled, normalized copies rather than the uploads as stored
+        model_inputs = await asyncio.gather(*(self.preprocessor.prepare(full_path) for full_path in full_paths))
         
-        # Mock image processing result
-        return "A beautiful landscape with mountains and trees"
+        describer = await self.get_describer()
+        started = time.perf_counter()
+        try:
+            return await describer.describe(list(model_inputs))
+        finally:
+            IMAGE_PROCESSING_LATENCY.observe(time.perf_counter() - started)
+    
+    async def get_describer(self) -> DescriberBackend:
+        """Get the describer backend, defaulting to the warm process-wide one."""
+        return self.describer or await get_describer()
     
     def get_file_extension(self, filename: str) -> str:
         """Get file extension from filename."""
         return os.path.splitext(filename.lower())[1]
     
-    async def save_uploaded_file(self, file_content: bytes, filename: str) -> str:
-        """Save uploaded file and return the saved path."""
-        os.makedirs(self.upload_dir, exist_ok=True)
-        file_path = os.path.join(self.upload_dir, filename)
+    async def save_uploaded_file(self, file_content: bytes, image_path: str) -> str:
+        """Store uploaded file content under a storage key and return the key."""
+        temp_path = await blocking_io.run(self._write_temp_file, file_content)
+        try:
+            await self.storage.put_file(temp_path, image_path)
+        except BaseException:
+            await blocking_io.run(self._remove_file, temp_path)
+            raise
+        return image_path
+    
+    async def stage_upload(self, file: UploadFile, first_chunk: bytes) -> StagedUpload:
+        """
+        Stream an upload into a temporary file in the staging directory.
         
-        with open(file_path, 'wb') as f:
-            f.write(file_content)
+        The upload is consumed in chunks of UPLOAD_CHUNK_SIZE, starting with the
+        already-read first chunk, so memory use does not grow with the upload size.
+        The SHA-256 digest of the content is computed as the chunks are written.
         
-        return filename 
\ No newline at end of file
+        Args:
+            file: The upload being received
+            first_chunk: The first chunk of the upload, already read by the caller
+            
+        Returns:
+            StagedUpload: The temporary file holding the upload
+            
+        Raises:
+            HTTPException: If the upload exceeds MAX_FILE_SIZE
+        """
+        await blocking_io.run(os.makedirs, self.upload_dir, exist_ok=True)
+        fd, temp_path = await blocking_io.run(
+            tempfile.mkstemp, dir=self.upload_dir, prefix=".upload-", suffix=".part"
+        )
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                chunk = first_chunk
+                while chunk:
+                    size += len(chunk)
+                    if size > settings.MAX_FILE_SIZE:
+                        raise HTTPException(status_code=400, detail="File too large")
+                    await blocking_io.run(self._write_chunk, temp_file, digest, chunk)
+                    chunk = await file.read(settings.UPLOAD_CHUNK_SIZE)
+        except BaseException:
+            await blocking_io.run(self._remove_file, temp_path)
+            raise
+        
+        UPLOAD_SIZE.observe(size)
+        return StagedUpload(temp_path=temp_path, size=size, sha256=digest.hexdigest())
+    
+    async def commit_upload(self, staged: StagedUpload, image_path: str) -> str:
+        """Store a staged upload under its storage key and return the key."""
+        await self.storage.put_file(staged.temp_path, image_path)
+        return image_path
+    
+    async def discard_upload(self, staged: StagedUpload) -> None:
+        """Remove a staged upload that will not be kept."""
+        await blocking_io.run(self._remove_file, staged.temp_path)
+    
+    @staticmethod
+    def _write_chunk(temp_file, digest, chunk: bytes) -> None:
+        """Write a chunk to the staged file and feed it to the content digest."""
+        digest.update(chunk)
+        temp_file.write(chunk)
+        # Flush here so that closing the file does not write on the event loop
+        temp_file.flush()
+    
+    def _write_temp_file(self, file_content: bytes) -> str:
+        """Write file content to a temporary file in the staging directory and return its path."""
+        os.makedirs(self.upload_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.upload_dir, prefix=".upload-", suffix=".part")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(file_content)
+        return temp_path
+    
+    @staticmethod
+    def _remove_file(path: str) -> None:
+        """Remove a file, ignoring it if it is already gone."""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
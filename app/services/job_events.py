@@ -0,0 +1,160 @@
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional, Set
+import asyncio
+import json
+import logging
+import redis.asyncio as redis
+from app.config import settings
+from app.enums import JobStatus
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class JobEvent:
+    """A job status change announced by the worker."""
+    job_id: str
+    status: JobStatus
+
+class JobSubscription:
+    """Queue of events for the jobs a client is waiting on."""
+    
+    def __init__(self, job_ids: List[str]) -> None:
+        """Initialize JobSubscription for the given job IDs, on the running event loop."""
+        self.job_ids = set(job_ids)
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+    
+    def put(self, event: JobEvent) -> None:
+        """Deliver an event to this subscription, from any thread."""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._queue.put_nowait(event)
+        else:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+    
+    async def get(self, timeout: float) -> Optional[JobEvent]:
+        """Wait for the next event, returning None if none arrives within the timeout."""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+class JobEventBus:
+    """
+    In-process publish/subscribe of job events, used when no Redis is available.
+    
+    Events may be published from another thread, such as the event loop thread
+    of an async mode worker running in the same process.
+    """
+    
+    def __init__(self) -> None:
+        """Initialize JobEventBus with no subscriptions."""
+        self._subscriptions: Dict[str, Set[JobSubscription]] = {}
+    
+    async def publish(self, job_id: str, status: JobStatus) -> None:
+        """Publish a job status change."""
+        self._dispatch(JobEvent(job_id=job_id, status=status))
+    
+    @asynccontextmanager
+    async def subscribe(self, job_ids: List[str]) -> AsyncIterator[JobSubscription]:
+        """Subscribe to events for the given jobs for the duration of the context."""
+        subscription = JobSubscription(job_ids)
+        for job_id in subscription.job_ids:
+            self._subscriptions.setdefault(job_id, set()).add(subscription)
+        try:
+            await self._on_subscribe()
+            yield subscription
+        finally:
+            for job_id in subscription.job_ids:
+                subscribers = self._subscriptions.get(job_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[job_id]
+    
+    async def close(self) -> None:
+        """Release any resources held by the bus."""
+    
+    async def _on_subscribe(self) -> None:
+        """Hook run when a subscription is opened."""
+    
+    def _dispatch(self, event: JobEvent) -> None:
+        """Deliver an event to the local subscribers of its job."""
+        for subscription in list(self._subscriptions.get(event.job_id, ())):
+            subscription.put(event)
+
+class RedisJobEventBus(JobEventBus):
+    """Job events shared between the web and worker processes over Redis pub/sub."""
+    
+    def __init__(self, redis_url: str, channel: str) -> None:
+        """Initialize RedisJobEventBus for a Redis URL and channel."""
+        super().__init__()
+        self.redis_url = redis_url
+        self.channel = channel
+        self._redis: Optional[redis.Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._listener_lock: Optional[asyncio.Lock] = None
+    
+    async def publish(self, job_id: str, status: JobStatus) -> None:
+        """Publish a job status change to every process listening on the channel."""
+        message = json.dumps({"job_id": job_id, "status": status.value})
+        await self._client().publish(self.channel, message)
+    
+    async def close(self) -> None:
+        """Stop listening and close the Redis connection."""
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+    
+    async def _on_subscribe(self) -> None:
+        """Start the channel listener on first use."""
+        client = self._client()
+        async with self._listener_lock:
+            if self._listener is None or self._listener.done():
+                # Subscribe before returning so no event published afterwards is missed
+                pubsub = client.pubsub()
+                await pubsub.subscribe(self.channel)
+                self._listener = asyncio.create_task(self._listen(pubsub))
+    
+    def _client(self) -> redis.Redis:
+        """Get the Redis client, creating it for the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._loop is not loop:
+            self._redis = redis.from_url(self.redis_url)
+            self._loop = loop
+            self._listener = None
+            self._listener_lock = asyncio.Lock()
+        return self._redis
+    
+    async def _listen(self, pubsub) -> None:
+        """Relay channel messages to local subscribers."""
+        try:
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                try:
+                    payload = json.loads(message["data"])
+                    self._dispatch(JobEvent(job_id=payload["job_id"], status=JobStatus(payload["status"])))
+                except (ValueError, KeyError):
+                    logger.warning("Ignoring malformed job event: %r", message["data"])
+        finally:
+            await pubsub.close()
+
+def create_job_event_bus() -> JobEventBus:
+    """Create the job event bus selected by JOB_EVENTS_BACKEND."""
+    if settings.JOB_EVENTS_BACKEND == "memory":
+        return JobEventBus()
+    if settings.JOB_EVENTS_BACKEND == "redis":
+        return RedisJobEventBus(settings.REDIS_URL, settings.JOB_EVENTS_CHANNEL)
+    raise ValueError(f"Unknown job events backend: {settings.JOB_EVENTS_BACKEND}")
+
+# Process-wide job event bus
+job_event_bus = create_job_event_bus()
@@ -1,58 +1,714 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, delete, case, func, literal, tuple_, and_, or_, not_, exists, false
+from sqlalchemy.orm import aliased
+from sqlalchemy.engine import Row
 from app.models import Job
-from app.enums import JobStatus
-from datetime import datetime
-from typing import Optional
+from app.metrics import DB_TRANSITION_LATENCY
+from app.enums import JobStatus, JobPriority
+from app.services.describers import describer_name
+from app.services.storage import storage_key
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 import uuid
 import os
 
 class JobManager:
     """Service for managing job operations in the database."""
     
+    # Statuses whose jobs may be reused for uploads with identical content
+    _REUSABLE_STATUSES = (JobStatus.DONE, JobStatus.QUEUED, JobStatus.PROCESSING, JobStatus.RETRYING)
+    # Statuses a worker may move to processing; retrying jobs are claimed again by their retry
+    _CLAIMABLE_STATUSES = (JobStatus.QUEUED, JobStatus.RETRYING)
+    # Statuses a job may fail from; a finished job is never overwritten
+    _FAILABLE_STATUSES = (JobStatus.QUEUED, JobStatus.PROCESSING, JobStatus.RETRYING)
+    # Statuses of jobs still waiting for or taking up worker capacity
+    _OUTSTANDING_STATUSES = (JobStatus.QUEUED, JobStatus.PROCESSING, JobStatus.RETRYING)
+    # Statuses of jobs the reaper takes back once their lease expires: a processing
+    # job whose worker died, or a retrying job whose retry message was lost
+    _LEASED_STATUSES = (JobStatus.PROCESSING, JobStatus.RETRYING)
+    # Error recorded on a job taken back from a worker that stopped renewing its lease
+    LEASE_EXPIRED_ERROR = "Worker lost: job lease expired"
+    
     def __init__(self, db_session: AsyncSession) -> None:
         """Initialize JobManager with a database session."""
         self.db_session = db_session
     
-    async def create_job(self, original_filename: str, file_extension: str) -> Job:
-        """Create a new job record with UUID-based filename."""
+    async def close(self) -> None:
+        """Release the database connection held by the session."""
+        await self.db_session.close()
+    
+    def build_job(
+        self,
+        file_extension: str,
+        content_hash: Optional[str] = None,
+        tenant_id: str = "anonymous",
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        accepted_at: Optional[datetime] = None,
+        stored_at: Optional[datetime] = None
+    ) -> Job:
+        """Build a new, not yet persisted, job record with a UUID-based storage key and its submission timings."""
         job_uuid = str(uuid.uuid4())
-        image_filename = f"{job_uuid}{file_extension}"
         
-        job = Job(
+        return Job(
             id=job_uuid,
-            image_path=image_filename,
+            image_path=storage_key(f"{job_uuid}{file_extension}"),
             file_extension=file_extension,
+            content_hash=content_hash,
             status=JobStatus.QUEUED,
-            generated_by="vision-node-gpt"
+            # The configured describer until the one that completes the job is recorded
+            generated_by=describer_name(),
+            priority=priority,
+            tenant_id=tenant_id,
+            accepted_at=accepted_at,
+            stored_at=stored_at
+        )
+    
+    def build_cached_job(
+        self,
+        source_job: Job,
+        tenant_id: str = "anonymous",
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        accepted_at: Optional[datetime] = None,
+        stored_at: Optional[datetime] = None
+    ) -> Job:
+        """Build a completed, not yet persisted, job reusing the stored image and description of another job."""
+        return Job(
+            id=str(uuid.uuid4()),
+            image_path=source_job.image_path,
+            file_extension=source_job.file_extension,
+            content_hash=source_job.content_hash,
+            status=JobStatus.DONE,
+            image_description=source_job.image_description,
+            generated_by=source_job.generated_by,
+            priority=priority,
+            tenant_id=tenant_id,
+            accepted_at=accepted_at,
+            stored_at=stored_at,
+            completed_at=datetime.now(timezone.utc),
+            image_deleted_at=source_job.image_deleted_at
         )
-        self.db_session.add(job)
+    
+    async def create_job(
+        self,
+        original_filename: str,
+        file_extension: str,
+        content_hash: Optional[str] = None,
+        tenant_id: str = "anonymous",
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        accepted_at: Optional[datetime] = None,
+        stored_at: Optional[datetime] = None
+    ) -> Job:
+        """Create a new job record with a UUID-based storage key, in one INSERT ... RETURNING."""
+        created_jobs = await self.create_jobs([
+            self.build_job(file_extension, content_hash, tenant_id, priority, accepted_at, stored_at)
+        ])
+        return created_jobs[0]
+    
+    async def create_cached_job(
+        self,
+        source_job: Job,
+        tenant_id: str = "anonymous",
+        priority: JobPriority = JobPriority.INTERACTIVE,
+        accepted_at: Optional[datetime] = None,
+        stored_at: Optional[datetime] = None
+    ) -> Job:
+        """Create a completed job that reuses the stored image and description of another job."""
+        created_jobs = await self.create_jobs([
+            self.build_cached_job(source_job, tenant_id, priority, accepted_at, stored_at)
+        ])
+        return created_jobs[0]
+    
+    async def create_jobs(self, jobs: List[Job]) -> List[Job]:
+        """Insert built job records with a single bulk INSERT in one transaction."""
+        if not jobs:
+            return []
+        
+        result = await self.db_session.scalars(
+            insert(Job).returning(Job, sort_by_parameter_order=True),
+            [
+                {column.key: getattr(job, column.key) for column in Job.__table__.columns if getattr(job, column.key) is not None}
+                for job in jobs
+            ]
+        )
+        created_jobs = list(result)
         await self.db_session.commit()
-        await self.db_session.refresh(job)
-        return job
+        return created_jobs
+    
+    async def find_job_by_content_hash(
+        self,
+        content_hash: str,
+        tenant_id: str = "anonymous",
+        priority: JobPriority = JobPriority.INTERACTIVE
+    ) -> Optional[Job]:
+        """
+        Find a reusable job of a tenant for the given content hash.
+        
+        A completed job is preferred over one still queued or processing; failed
+        jobs are never reused. Only jobs of the same tenant are reused, and a job
+        still queued or processing only at the priority it is asked for, so a
+        submission never waits in another priority's queue.
+        """
+        result = await self.db_session.execute(
+            select(Job)
+            .where(Job.content_hash == content_hash, self._reusable_by(tenant_id, priority))
+            .order_by(*self._reuse_preference())
+            .limit(1)
+        )
+        return result.scalars().first()
+    
+    async def find_jobs_by_content_hashes(
+        self,
+        content_hashes: List[str],
+        tenant_id: str = "anonymous",
+        priority: JobPriority = JobPriority.INTERACTIVE
+    ) -> Dict[str, Job]:
+        """Find the reusable job of a tenant for each of the given content hashes, keyed by hash."""
+        ranked = (
+            select(
+                Job.id,
+                func.row_number().over(partition_by=Job.content_hash, order_by=self._reuse_preference()).label("rank")
+            )
+            .where(Job.content_hash.in_(set(content_hashes)), self._reusable_by(tenant_id, priority))
+            .subquery()
+        )
+        result = await self.db_session.execute(
+            select(Job).join(ranked, Job.id == ranked.c.id).where(ranked.c.rank == 1)
+        )
+        return {job.content_hash: job for job in result.scalars()}
+    
+    @classmethod
+    def _reusable_by(cls, tenant_id: str, priority: JobPriority):
+        """Condition on jobs a submission of the tenant at the priority can reuse."""
+        return and_(
+            Job.tenant_id == tenant_id,
+            Job.status.in_(cls._REUSABLE_STATUSES),
+            or_(Job.status == JobStatus.DONE, Job.priority == priority)
+        )
+    
+    @staticmethod
+    def _reuse_preference() -> tuple:
+        """Ordering that ranks completed jobs first, then the most recent."""
+        return (case((Job.status == JobStatus.DONE, 0), else_=1), Job.created_at.desc())
     
     async def get_job(self, job_id: str) -> Optional[Job]:
-        """Get job by ID."""
+        """Get job by ID, as currently stored even if the session already holds it."""
         result = await self.db_session.execute(
-            select(Job).where(Job.id == job_id)
+            select(Job).where(Job.id == job_id).execution_options(populate_existing=True)
         )
         return result.scalar_one_or_none()
     
+    async def get_job_statuses(self, job_ids: List[str]) -> Dict[str, Row]:
+        """Get the status columns of several jobs with one query, keyed by job ID."""
+        result = await self.db_session.execute(
+            select(Job.id, Job.status, Job.created_at).where(Job.id.in_(set(job_ids)))
+        )
+        return {row.id: row for row in result}
+    
+    async def get_job_results(self, job_ids: List[str]) -> Dict[str, Row]:
+        """Get the result columns of several jobs with one query, keyed by job ID."""
+        result = await self.db_session.execute(
+            select(
+                Job.id,
+                Job.status,
+                Job.image_description,
+                Job.generated_by,
+                Job.created_at,
+                Job.updated_at
+            ).where(Job.id.in_(set(job_ids)))
+        )
+        return {row.id: row for row in result}
+    
+    async def list_jobs(
+        self,
+        limit: int,
+        status: Optional[JobStatus] = None,
+        created_after: Optional[datetime] = None,
+        updated_before: Optional[datetime] = None,
+        after: Optional[Tuple[datetime, str]] = None
+    ) -> List[Row]:
+        """
+        List jobs newest first, one page at a time.
+        
+        Pages are keyset paginated on (created_at, id), so each page is an
+        index range scan however deep it is.
+        
+        Args:
+            limit: Maximum number of jobs to return
+            status: Only list jobs with this status
+            created_after: Only list jobs created after this time
+            updated_before: Only list jobs last updated before this time
+            after: (created_at, id) of the last job of the previous page
+        
+        Returns:
+            List[Row]: The id, status, created_at and updated_at of each job
+        """
+        query = select(Job.id, Job.status, Job.created_at, Job.updated_at)
+        if status is not None:
+            query = query.where(Job.status == status)
+        if created_after is not None:
+            query = query.where(Job.created_at > created_after)
+        if updated_before is not None:
+            query = query.where(Job.updated_at < updated_before)
+        if after is not None:
+            created_at, job_id = after
+            # Bind with the column types so the timestamp uses the stored format
+            query = query.where(
+                tuple_(Job.created_at, Job.id)
+                < tuple_(literal(created_at, Job.created_at.type), literal(job_id, Job.id.type))
+            )
+        
+        result = await self.db_session.execute(
+            query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit)
+        )
+        return list(result)
+    
+    async def count_jobs_by_status(self, created_after: Optional[datetime] = None) -> Dict[JobStatus, int]:
+        """Count jobs in each status, optionally only those created after a time."""
+        query = select(Job.status, func.count()).group_by(Job.status)
+        if created_after is not None:
+            query = query.where(Job.created_at > created_after)
+        
+        result = await self.db_session.execute(query)
+        counts = {status: 0 for status in JobStatus}
+        counts.update({status: count for status, count in result})
+        return counts
+    
+    async def count_outstanding_jobs(self) -> int:
+        """Count jobs that are queued or processing."""
+        result = await self.db_session.execute(
+            select(func.count()).select_from(Job).where(Job.status.in_(self._OUTSTANDING_STATUSES))
+        )
+        return result.scalar_one()
+    
+    async def find_expired_images(
+        self,
+        done_before: Optional[datetime],
+        failed_before: Optional[datetime],
+        limit: int
+    ) -> List[str]:
+        """
+        Find stored images that every job using them is done with.
+        
+        An image qualifies once all the jobs sharing it, as deduplicated jobs
+        do, are done or failed since before the cutoff of their status. An
+        image still used by a queued, processing or more recent job is kept.
+        
+        Args:
+            done_before: Cutoff for done jobs, or None to keep their images
+            failed_before: Cutoff for failed jobs, or None to keep their images
+            limit: Maximum number of images to return
+        
+        Returns:
+            List[str]: Storage keys of the expired images
+        """
+        other = aliased(Job)
+        result = await self.db_session.scalars(
+            select(Job.image_path).distinct().where(
+                Job.image_deleted_at.is_(None),
+                self._expired(Job, done_before, failed_before),
+                ~exists().where(
+                    other.image_path == Job.image_path,
+                    other.image_deleted_at.is_(None),
+                    not_(self._expired(other, done_before, failed_before))
+                )
+            ).limit(limit)
+        )
+        return list(result)
+    
+    async def mark_images_deleted(self, image_paths: List[str], deleted_at: datetime) -> int:
+        """Record that stored images were deleted on every job using them, returning the number of jobs."""
+        if not image_paths:
+            return 0
+        result = await self.db_session.execute(
+            update(Job)
+            .where(Job.image_path.in_(image_paths), Job.image_deleted_at.is_(None))
+            # Keep updated_at, which the job TTLs count from
+            .values(image_deleted_at=deleted_at, updated_at=Job.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db_session.commit()
+        return result.rowcount
+    
+    async def find_expired_jobs(
+        self,
+        done_before: Optional[datetime],
+        failed_before: Optional[datetime],
+        limit: int
+    ) -> List[Job]:
+        """
+        Find done or failed jobs finished before the cutoff of their status, oldest first.
+        
+        Only jobs whose image was already deleted qualify, so a job row never
+        disappears while the image it points to is still stored.
+        """
+        result = await self.db_session.scalars(
+            select(Job).where(
+                Job.image_deleted_at.is_not(None),
+                self._expired(Job, done_before, failed_before)
+            ).order_by(Job.created_at, Job.id).limit(limit)
+        )
+        return list(result)
+    
+    async def delete_jobs(self, job_ids: List[str]) -> int:
+        """Delete job rows in one transaction, returning the number deleted."""
+        if not job_ids:
+            return 0
+        result = await self.db_session.execute(
+            delete(Job).where(Job.id.in_(job_ids)).execution_options(synchronize_session=False)
+        )
+        await self.db_session.commit()
+        return result.rowcount
+    
+    @staticmethod
+    def _expired(job, done_before: Optional[datetime], failed_before: Optional[datetime]):
+        """
+        Build the condition of a job being done or failed since before its status's cutoff.
+        
+        The created_at bound is implied by the other one and lets the status
+        and creation time index narrow the scan.
+        """
+        conditions = []
+        for status, before in ((JobStatus.DONE, done_before), (JobStatus.FAILED, failed_before)):
+            if before is None:
+                continue
+            before = literal(before, Job.created_at.type)
+            conditions.append(and_(
+                job.status == status,
+                job.created_at < before,
+                func.coalesce(job.updated_at, job.created_at) < before
+            ))
+        return or_(*conditions) if conditions else false()
+    
     async def update_job_status(self, job_id: str, status: JobStatus) -> Optional[Job]:
         """Update job status."""
-        job = await self.get_job(job_id)
-        if job:
-            job.status = status
+        return await self._transition_job(job_id, None, status=status)
+    
+    async def update_job_result(self, job_id: str, image_description: str, generated_by: Optional[str] = None) -> Optional[Job]:
+        """Update job with processing result."""
+        values = {"image_description": image_description, "status": JobStatus.DONE}
+        if generated_by:
+            values["generated_by"] = generated_by
+        return await self._transition_job(job_id, None, **values)
+    
+    async def claim_job(
+        self,
+        job_id: str,
+        enqueued_at: Optional[datetime] = None,
+        lease_seconds: float = 0
+    ) -> Optional[Job]:
+        """
+        Move a queued job, or a retrying one, to processing.
+        
+        Only one of several deliveries of the same task can claim the job.
+        Each claim counts an attempt; the first also records when the job was
+        picked up and, if given, when its task was first published.
+        
+        Args:
+            job_id: The job identifier
+            enqueued_at: When the processing task was first published
+            lease_seconds: How long the job stays claimed without its lease being renewed, 0 for no lease
+        
+        Returns:
+            Optional[Job]: The claimed job, or None if it does not exist or is not claimable
+        """
+        now = datetime.now(timezone.utc)
+        values = {
+            "status": JobStatus.PROCESSING,
+            "attempts": Job.attempts + 1,
+            "picked_up_at": func.coalesce(Job.picked_up_at, self._timestamp(now)),
+            "lease_expires_at": now + timedelta(seconds=lease_seconds) if lease_seconds else None,
+        }
+        if enqueued_at is not None:
+            values["enqueued_at"] = func.coalesce(Job.enqueued_at, self._timestamp(enqueued_at))
+        return await self._transition_job(job_id, self._CLAIMABLE_STATUSES, **values)
+    
+    async def complete_job(
+        self,
+        job_id: str,
+        image_description: str,
+        generated_by: str,
+        describer_started_at: Optional[datetime] = None,
+        describer_finished_at: Optional[datetime] = None
+    ) -> Optional[Job]:
+        """
+        Store the result of a processing job and mark it done.
+        
+        Args:
+            job_id: The job identifier
+            image_description: The generated description
+            generated_by: Name of the describer backend
+            describer_started_at: When the describer call started
+            describer_finished_at: When the describer call returned
+        
+        Returns:
+            Optional[Job]: The completed job, or None if it was not processing
+        """
+        return await self._transition_job(
+            job_id,
+            (JobStatus.PROCESSING,),
+            status=JobStatus.DONE,
+            image_description=image_description,
+            generated_by=generated_by,
+            describer_started_at=describer_started_at,
+            describer_finished_at=describer_finished_at,
+            completed_at=datetime.now(timezone.utc),
+            lease_expires_at=None
+        )
+    
+    async def retry_job(self, job_id: str, error: Optional[str] = None, lease_seconds: float = 0) -> Optional[Job]:
+        """
+        Mark a processing job as waiting for its next attempt.
+        
+        Args:
+            job_id: The job identifier
+            error: Why the attempt failed
+            lease_seconds: How long the job may wait for its retry to claim it
+                before the reaper takes it back, 0 for no lease
+        
+        Returns:
+            Optional[Job]: The retrying job, or None if it was not processing
+        """
+        lease_expires_at = datetime.now(timezone.utc) + timedelta(seconds=lease_seconds) if lease_seconds else None
+        return await self._transition_job(
+            job_id, (JobStatus.PROCESSING,), status=JobStatus.RETRYING, last_error=error, lease_expires_at=lease_expires_at
+        )
+    
+    async def fail_job(self, job_id: str, error: Optional[str] = None) -> Optional[Job]:
+        """
+        Mark an unfinished job failed for good, moving it to the dead-letter queue.
+        
+        Args:
+            job_id: The job identifier
+            error: Why the job failed
+        
+        Returns:
+            Optional[Job]: The failed job, or None if it had already finished
+        """
+        return await self._transition_job(
+            job_id,
+            self._FAILABLE_STATUSES,
+            status=JobStatus.FAILED,
+            last_error=error,
+            dead_lettered_at=datetime.now(timezone.utc),
+            lease_expires_at=None
+        )
+    
+    async def renew_lease(self, job_id: str, lease_seconds: float) -> bool:
+        """
+        Extend the lease of a processing job from now.
+        
+        Returns:
+            bool: Whether the job is still processing, and so was renewed
+        """
+        result = await self.db_session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.PROCESSING)
+            # Keep updated_at, which tracks status changes rather than heartbeats
+            .values(
+                lease_expires_at=datetime.now(timezone.utc) + timedelta(seconds=lease_seconds),
+                updated_at=Job.updated_at
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self.db_session.commit()
+        return result.rowcount == 1
+    
+    async def requeue_stale_jobs(self, now: datetime, max_attempts: int, limit: int) -> List[Row]:
+        """
+        Move processing or retrying jobs whose lease expired before `now` back to the queue.
+        
+        Only jobs claimed fewer than `max_attempts` times are requeued. The
+        statement only matches jobs that are still stale, so a job its worker
+        finished, its retry claimed, or another reaper requeued, in the
+        meantime is left alone. A retrying job keeps the error of its last
+        attempt.
+        
+        Returns:
+            List[Row]: The id, image_path, tenant_id and priority of each job to enqueue again
+        """
+        result = await self.db_session.execute(
+            update(Job)
+            .where(Job.id.in_(self._stale_job_ids(now, Job.attempts < max_attempts, limit)), self._stale(now))
+            .values(status=JobStatus.QUEUED, lease_expires_at=None, last_error=self._stale_error())
+            .returning(Job.id, Job.image_path, Job.tenant_id, Job.priority)
+            .execution_options(synchronize_session=False)
+        )
+        rows = list(result)
+        await self.db_session.commit()
+        return rows
+    
+    async def fail_stale_jobs(self, now: datetime, max_attempts: int, limit: int) -> List[str]:
+        """
+        Fail processing or retrying jobs whose lease expired before `now` after `max_attempts` claims, dead-lettering them.
+        
+        Returns:
+            List[str]: IDs of the failed jobs
+        """
+        result = await self.db_session.execute(
+            update(Job)
+            .where(Job.id.in_(self._stale_job_ids(now, Job.attempts >= max_attempts, limit)), self._stale(now))
+            .values(
+                status=JobStatus.FAILED,
+                lease_expires_at=None,
+                last_error=self._stale_error(),
+                dead_lettered_at=now
+            )
+            .returning(Job.id)
+            .execution_options(synchronize_session=False)
+        )
+        job_ids = list(result.scalars())
+        await self.db_session.commit()
+        return job_ids
+    
+    def _stale(self, now: datetime):
+        """Build the condition of a job being processing or retrying with a lease that expired before `now`."""
+        return and_(Job.status.in_(self._LEASED_STATUSES), Job.lease_expires_at < self._timestamp(now))
+    
+    def _stale_error(self):
+        """Build the error recorded on a stale job: its own for a retrying job, a lost worker otherwise."""
+        return case((Job.status == JobStatus.RETRYING, Job.last_error), else_=literal(self.LEASE_EXPIRED_ERROR, Job.last_error.type))
+    
+    def _stale_job_ids(self, now: datetime, condition, limit: int):
+        """Select the IDs of up to `limit` stale jobs also meeting a condition, oldest lease first."""
+        return (
+            select(Job.id)
+            .where(self._stale(now), condition)
+            .order_by(Job.lease_expires_at)
+            .limit(limit)
+            .scalar_subquery()
+        )
+    
+    async def list_dead_letters(self, limit: int, after: Optional[Tuple[datetime, str]] = None) -> List[Row]:
+        """
+        List dead-lettered jobs, most recently failed first, one page at a time.
+        
+        Args:
+            limit: Maximum number of jobs to return
+            after: (dead_lettered_at, id) of the last job of the previous page
+        
+        Returns:
+            List[Row]: The id, attempts, last_error, created_at and dead_lettered_at of each job
+        """
+        query = select(
+            Job.id, Job.attempts, Job.last_error, Job.created_at, Job.dead_lettered_at
+        ).where(Job.status == JobStatus.FAILED, Job.dead_lettered_at.is_not(None))
+        if after is not None:
+            dead_lettered_at, job_id = after
+            query = query.where(
+                tuple_(Job.dead_lettered_at, Job.id)
+                < tuple_(self._timestamp(dead_lettered_at), literal(job_id, Job.id.type))
+            )
+        
+        result = await self.db_session.execute(
+            query.order_by(Job.dead_lettered_at.desc(), Job.id.desc()).limit(limit)
+        )
+        return list(result)
+    
+    async def replay_jobs(self, job_ids: List[str]) -> List[Row]:
+        """
+        Move dead-lettered jobs back to the queue in one transaction.
+        
+        Jobs that are not dead-lettered, or whose image retention already
+        deleted, are left alone, so replaying the same jobs twice queues them
+        once. A replayed job starts over with no attempts and no error, so the
+        reaper gives it as many attempts as a new job.
+        
+        Returns:
+            List[Row]: The id, image_path, tenant_id and priority of each job to enqueue again
+        """
+        if not job_ids:
+            return []
+        result = await self.db_session.execute(
+            update(Job)
+            .where(
+                Job.id.in_(set(job_ids)),
+                Job.status == JobStatus.FAILED,
+                Job.dead_lettered_at.is_not(None),
+                Job.image_deleted_at.is_(None)
+            )
+            .values(status=JobStatus.QUEUED, dead_lettered_at=None, attempts=0, last_error=None)
+            .returning(Job.id, Job.image_path, Job.tenant_id, Job.priority)
+            .execution_options(synchronize_session=False)
+        )
+        rows = list(result)
+        await self.db_session.commit()
+        return rows
+    
+    @staticmethod
+    def _timestamp(value: datetime):
+        """Bind a stage timestamp with the column type, for use in SQL expressions."""
+        return literal(value, Job.picked_up_at.type)
+    
+    async def _transition_job(self, job_id: str, from_statuses: Optional[Tuple[JobStatus, ...]], **values) -> Optional[Job]:
+        """
+        Update a job with a single UPDATE ... RETURNING statement.
+        
+        Args:
+            job_id: The job identifier
+            from_statuses: Statuses the job must be in for the update to apply, any if None
+            **values: Column values to set
+        
+        Returns:
+            Optional[Job]: The updated job, detached from the session, or None if no row matched
+        """
+        statement = update(Job).where(Job.id == job_id)
+        if from_statuses is not None:
+            # Compare-and-set: a concurrent transition makes this one match nothing
+            statement = statement.where(Job.status.in_(from_statuses))
+        
+        status = values.get("status")
+        with DB_TRANSITION_LATENCY.labels(status=status.value if status else "none").time():
+            result = await self.db_session.execute(
+                statement.values(**values).returning(*Job.__table__.columns).execution_options(synchronize_session=False)
+            )
+            row = result.one_or_none()
+            # Built from the returned row, since a copy already in the session is not refreshed by RETURNING
+            job = Job(**row._mapping) if row is not None else None
             await self.db_session.commit()
-            await self.db_session.refresh(job)
         return job
     
-    async def update_job_result(self, job_id: str, image_description: str) -> Optional[Job]:
-        """Update job with processing result."""
-        job = await self.get_job(job_id)
-        if job:
-            job.image_description = image_description
-            job.status = JobStatus.DONE
+    async def update_job_results(
+        self,
+        image_descriptions: Dict[str, str],
+        generated_by: str,
+        describer_started_at: Optional[datetime] = None,
+        describer_finished_at: Optional[datetime] = None
+    ) -> List[Job]:
+        """
+        Store the results of several jobs, described by one describer call, and mark them done in one statement.
+        
+        Like `complete_job`, only jobs still processing are updated, so a job
+        the reaper took back or failed in the meantime keeps its status.
+        
+        Args:
+            image_descriptions: The generated description by job identifier
+            generated_by: Name of the describer backend
+            describer_started_at: When the describer call started
+            describer_finished_at: When the describer call returned
+        
+        Returns:
+            List[Job]: The completed jobs, detached from the session
+        """
+        if not image_descriptions:
+            return []
+        
+        statement = (
+            update(Job)
+            .where(Job.id.in_(list(image_descriptions)), Job.status == JobStatus.PROCESSING)
+            .values(
+                image_description=case(image_descriptions, value=Job.id),
+                status=JobStatus.DONE,
+                generated_by=generated_by,
+                describer_started_at=describer_started_at,
+                describer_finished_at=describer_finished_at,
+                completed_at=datetime.now(timezone.utc),
+                lease_expires_at=None
+            )
+            .returning(*Job.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        with DB_TRANSITION_LATENCY.labels(status=JobStatus.DONE.value).time():
+            result = await self.db_session.execute(statement)
+            jobs = [Job(**row._mapping) for row in result.all()]
             await self.db_session.commit()
-            await self.db_session.refresh(job)
-        return job 
\ No newline at end of file
+        return jobs
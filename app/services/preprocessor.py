@@ -0,0 +1,173 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from PIL import Image, ImageOps
+from app.config import settings
+from app.metrics import IMAGE_PREPROCESSING_LATENCY
+from app.services.blocking_io import blocking_io
+from app.services.storage import remove_file
+
+logger = logging.getLogger(__name__)
+
+# File extension of the normalized image, by Pillow format
+PREPROCESS_EXTENSIONS = {"JPEG": ".jpg", "PNG": ".png", "WEBP": ".webp"}
+
+def normalize_image(source_path: str, target_path: str, max_side: int, image_format: str, quality: int) -> None:
+    """
+    Decode an image, normalize it and write it to `target_path`.
+    
+    The image is turned upright according to its EXIF orientation, converted
+    to RGB with transparency flattened onto white, downscaled so neither side
+    exceeds `max_side` and encoded in `image_format`. The target is written
+    atomically, so a concurrent reader never sees a partial file. This runs in
+    a pool process or thread, never on the event loop.
+    """
+    with Image.open(source_path) as source:
+        # Let JPEG decode at a reduced scale instead of at full resolution
+        source.draft("RGB", (max_side, max_side))
+        image = ImageOps.exif_transpose(source)
+        image = _to_rgb(image)
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target_path), prefix=".preprocess-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as target:
+            image.save(target, format=image_format, quality=quality, optimize=True)
+        os.replace(temp_path, target_path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+def _to_rgb(image: Image.Image) -> Image.Image:
+    """Convert an image to RGB, flattening any transparency onto a white background."""
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    if image.mode != "RGB":
+        return image.convert("RGB")
+    return image
+
+class ImagePreprocessor:
+    """
+    Stage turning stored uploads into compact, normalized describer input.
+    
+    Each image is decoded once, normalized by `normalize_image` and cached
+    next to the original, so retries, duplicates and later jobs on the same
+    file reuse the result. The CPU-bound work runs in a pool of `max_workers`
+    processes, or on the blocking I/O executor threads when `max_workers` is
+    0. An image that cannot be decoded is passed on as uploaded.
+    """
+    
+    def __init__(
+        self,
+        enabled: bool = True,
+        max_side: int = 1024,
+        image_format: str = "JPEG",
+        quality: int = 85,
+        max_workers: int = 0
+    ) -> None:
+        """Initialize ImagePreprocessor with the output size and format and the process pool size."""
+        if image_format not in PREPROCESS_EXTENSIONS:
+            raise ValueError(f"Unknown preprocess format: {image_format}")
+        self.enabled = enabled
+        self.max_side = max_side
+        self.image_format = image_format
+        self.quality = quality
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+    
+    def artifact_path(self, full_path: str) -> str:
+        """Get where the normalized version of an image is cached."""
+        return f"{full_path}.{self.max_side}{PREPROCESS_EXTENSIONS[self.image_format]}"
+    
+    async def discard(self, full_path: str) -> int:
+        """Remove the cached normalized version of an image, if any, and return the bytes freed."""
+        return await blocking_io.run(remove_file, self.artifact_path(full_path))
+    
+    async def prepare(self, full_path: str) -> str:
+        """
+        Get the describer input for a stored image, normalizing it if it is not cached yet.
+        
+        Args:
+            full_path: Full path of the stored image
+        
+        Returns:
+            str: Full path of the normalized image, or of the original if
+                preprocessing is disabled or the image cannot be decoded
+        """
+        if not self.enabled:
+            return full_path
+        target_path = self.artifact_path(full_path)
+        if await blocking_io.run(os.path.exists, target_path):
+            return target_path
+        
+        started = time.perf_counter()
+        try:
+            await self._run(normalize_image, full_path, target_path, self.max_side, self.image_format, self.quality)
+        except Exception as exc:
+            if isinstance(exc, BrokenProcessPool):
+                # A pool process died, for example out of memory; start a new pool next time
+                self.shutdown()
+            logger.warning("Could not preprocess image %s, describing the original", full_path, exc_info=True)
+            return full_path
+        finally:
+            IMAGE_PREPROCESSING_LATENCY.observe(time.perf_counter() - started)
+        return target_path
+    
+    def shutdown(self) -> None:
+        """Stop the process pool; it is created again if used afterwards."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def _run(self, func, *args) -> None:
+        """Run a CPU-bound call on the process pool, or on the blocking I/O executor without one."""
+        if self.max_workers <= 0:
+            await blocking_io.run(func, *args)
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._pool(), functools.partial(func, *args))
+    
+    def _pool(self) -> ProcessPoolExecutor:
+        """Get the process pool, creating it if needed."""
+        with self._lock:
+            if self._executor is None:
+                # Forking a process that runs threads and an event loop is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+def create_image_preprocessor() -> ImagePreprocessor:
+    """
+    Create the image preprocessor configured by the PREPROCESS_* settings.
+    
+    Only an `async` mode worker, where one process serves many jobs, gets a
+    process pool. A `prefork` worker process describes one image at a time,
+    so it preprocesses on a thread of its own.
+    """
+    return ImagePreprocessor(
+        settings.PREPROCESS_ENABLED,
+        settings.PREPROCESS_MAX_SIDE,
+        settings.PREPROCESS_FORMAT,
+        settings.PREPROCESS_QUALITY,
+        settings.PREPROCESS_WORKERS if settings.WORKER_MODE == "async" else 0
+    )
+
+# Process-wide image preprocessor
+image_preprocessor = create_image_preprocessor()
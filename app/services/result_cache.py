@@ -0,0 +1,238 @@
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+import asyncio
+import json
+import logging
+import threading
+import time
+import redis.asyncio as redis
+from app.config import settings
+from app.enums import JobStatus
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class CachedResult:
+    """The stored result of a completed job."""
+    job_id: str
+    status: JobStatus
+    image_description: str
+    generated_by: str
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    
+    @classmethod
+    def from_job(cls, job: Job) -> "CachedResult":
+        """Build a cached result from a job record."""
+        return cls(
+            job_id=job.id,
+            status=job.status,
+            image_description=job.image_description,
+            generated_by=job.generated_by,
+            created_at=job.created_at,
+            updated_at=job.updated_at
+        )
+    
+    def to_json(self) -> str:
+        """Serialize the result for the shared tier."""
+        payload = asdict(self)
+        payload["status"] = self.status.value
+        for key in ("created_at", "updated_at"):
+            if payload[key] is not None:
+                payload[key] = payload[key].isoformat()
+        return json.dumps(payload)
+    
+    @classmethod
+    def from_json(cls, data: str) -> "CachedResult":
+        """Deserialize a result read from the shared tier."""
+        payload = json.loads(data)
+        payload["status"] = JobStatus(payload["status"])
+        for key in ("created_at", "updated_at"):
+            if payload[key] is not None:
+                payload[key] = datetime.fromisoformat(payload[key])
+        return cls(**payload)
+
+class ResultCache:
+    """
+    Read-through cache of completed job results.
+    
+    A job's row never changes once it is done, so its result can be served
+    without touching the database. Results are kept in an in-process LRU
+    bounded by `max_entries` and `ttl_seconds`, and, when a Redis URL is
+    given, in a shared Redis tier that the worker fills on completion. Only
+    done jobs are cached: a failed job may still be retried.
+    
+    With a `row_ttl_seconds`, the age from its last update past which
+    retention may delete a done job's row, no result is cached beyond that
+    age. Retention discards what it deletes from the local tier of its own
+    process and from Redis, and this bound keeps the local tiers of every
+    other process from serving a deleted job.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        redis_url: Optional[str] = None,
+        key_prefix: str = "job-result:",
+        row_ttl_seconds: float = 0
+    ) -> None:
+        """Initialize ResultCache with its size and TTL bounds and optional Redis tier; a row TTL of 0 keeps rows forever."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.row_ttl_seconds = row_ttl_seconds
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self._entries: "OrderedDict[str, Tuple[float, CachedResult]]" = OrderedDict()
+        # The worker may push results from its own event loop thread
+        self._lock = threading.Lock()
+        self._redis: Optional[redis.Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "evictions": 0}
+    
+    async def get(self, job_id: str) -> Optional[CachedResult]:
+        """
+        Get the cached result of a job.
+        
+        Args:
+            job_id: The job identifier
+        
+        Returns:
+            Optional[CachedResult]: The result, or None if it is not cached
+        """
+        result = self._get_local(job_id)
+        if result is not None:
+            self._count("local_hits")
+            return result
+        
+        if self.redis_url:
+            try:
+                data = await self._client().get(self._key(job_id))
+            except Exception:
+                logger.warning("Could not read cached result of job %s", job_id, exc_info=True)
+                data = None
+            if data is not None:
+                result = CachedResult.from_json(data)
+                self._put_local(result, self._ttl(result))
+                self._count("redis_hits")
+                return result
+        
+        self._count("misses")
+        return None
+    
+    async def put(self, result: CachedResult) -> None:
+        """Cache the result of a done job; results in any other status are ignored."""
+        if result.status != JobStatus.DONE:
+            return
+        ttl = self._ttl(result)
+        if ttl <= 0:
+            # Retention may already have deleted the job
+            return
+        
+        self._put_local(result, ttl)
+        if self.redis_url:
+            try:
+                await self._client().set(self._key(result.job_id), result.to_json(), ex=max(1, int(ttl)))
+            except Exception:
+                logger.warning("Could not cache result of job %s", result.job_id, exc_info=True)
+    
+    async def discard(self, job_id: str) -> None:
+        """Remove a job's result from every tier."""
+        with self._lock:
+            self._entries.pop(job_id, None)
+        if self.redis_url:
+            try:
+                await self._client().delete(self._key(job_id))
+            except Exception:
+                logger.warning("Could not discard cached result of job %s", job_id, exc_info=True)
+    
+    def stats(self) -> Dict[str, int]:
+        """Get hit, miss and eviction counters and the number of local entries."""
+        with self._lock:
+            return {**self._stats, "size": len(self._entries), "max_entries": self.max_entries}
+    
+    async def close(self) -> None:
+        """Close the Redis connection."""
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+    
+    def _get_local(self, job_id: str) -> Optional[CachedResult]:
+        """Get a result from the in-process tier, dropping it if it expired."""
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at <= time.monotonic():
+                del self._entries[job_id]
+                return None
+            self._entries.move_to_end(job_id)
+            return result
+    
+    def _ttl(self, result: CachedResult) -> float:
+        """Get how long a result may be cached: `ttl_seconds`, cut short where retention may delete its row."""
+        if self.row_ttl_seconds <= 0:
+            return self.ttl_seconds
+        updated_at = result.updated_at or result.created_at
+        if updated_at is None:
+            return self.ttl_seconds
+        if updated_at.tzinfo is None:
+            # SQLite returns naive timestamps, stored in UTC
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        row_age = (datetime.now(timezone.utc) - updated_at).total_seconds()
+        return min(self.ttl_seconds, self.row_ttl_seconds - row_age)
+    
+    def _put_local(self, result: CachedResult, ttl: float) -> None:
+        """Store a result in the in-process tier for `ttl` seconds, evicting the least recently used ones."""
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[result.job_id] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(result.job_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+    
+    def _count(self, counter: str) -> None:
+        """Increment a stats counter."""
+        with self._lock:
+            self._stats[counter] += 1
+    
+    def _key(self, job_id: str) -> str:
+        """Get the Redis key of a job's result."""
+        return f"{self.key_prefix}{job_id}"
+    
+    def _client(self) -> redis.Redis:
+        """Get the Redis client, creating it for the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._loop is not loop:
+            self._redis = redis.from_url(self.redis_url)
+            self._loop = loop
+        return self._redis
+
+def create_result_cache() -> ResultCache:
+    """Create the result cache selected by RESULT_CACHE_BACKEND."""
+    if settings.RESULT_CACHE_BACKEND == "none":
+        return ResultCache(0, settings.RESULT_CACHE_TTL_SECONDS)
+    # Results are never cached past the age at which retention may delete their row
+    row_ttl_seconds = settings.RETENTION_JOB_TTL_DONE_HOURS * 3600
+    if settings.RESULT_CACHE_BACKEND == "memory":
+        return ResultCache(
+            settings.RESULT_CACHE_MAX_ENTRIES, settings.RESULT_CACHE_TTL_SECONDS, row_ttl_seconds=row_ttl_seconds
+        )
+    if settings.RESULT_CACHE_BACKEND == "redis":
+        return ResultCache(
+            settings.RESULT_CACHE_MAX_ENTRIES,
+            settings.RESULT_CACHE_TTL_SECONDS,
+            settings.REDIS_URL,
+            settings.RESULT_CACHE_KEY_PREFIX,
+            row_ttl_seconds
+        )
+    raise ValueError(f"Unknown result cache backend: {settings.RESULT_CACHE_BACKEND}")
+
+# Process-wide result cache
+result_cache = create_result_cache()
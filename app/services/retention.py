@@ -0,0 +1,197 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Callable, Dict, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.enums import JobStatus
+from app.metrics import (
+    RETENTION_BYTES_RECLAIMED,
+    RETENTION_IMAGES_DELETED,
+    RETENTION_JOBS_ARCHIVED,
+    RETENTION_JOBS_DELETED
+)
+from app.models import Job
+from app.services.blocking_io import blocking_io
+from app.services.job_manager import JobManager
+from app.services.preprocessor import ImagePreprocessor, image_preprocessor
+from app.services.result_cache import ResultCache, result_cache
+from app.services.storage import BlobStore, blob_store
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RetentionStats:
+    """What one retention run removed."""
+    images_deleted: int = 0
+    bytes_reclaimed: int = 0
+    jobs_archived: int = 0
+    jobs_deleted: int = 0
+
+class RetentionService:
+    """
+    Service deleting stored images and job rows once their TTL has passed.
+    
+    A run has two phases. First, images whose jobs have all been done or
+    failed for longer than the image TTL of their status are deleted from the
+    blob store, together with their preprocessed copies, and the jobs are
+    marked with `image_deleted_at`; the rows stay, so results can still be
+    read. Then job rows past the job TTL of their status, whose image is
+    already gone, are written to the archive, if there is one, and deleted.
+    
+    Each phase works in batches of `batch_size`, each in a short transaction
+    of its own, pausing `batch_pause_seconds` between batches and stopping
+    after `max_batches`, so a large backlog is worked off over several runs
+    without holding database locks or the disk for long. A TTL of 0 hours
+    keeps what it applies to forever.
+    """
+    
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        image_ttl_hours: Dict[JobStatus, float],
+        job_ttl_hours: Dict[JobStatus, float],
+        batch_size: int = 500,
+        max_batches: int = 20,
+        batch_pause_seconds: float = 0.5,
+        archive_dir: str = "",
+        storage: Optional[BlobStore] = None,
+        preprocessor: Optional[ImagePreprocessor] = None,
+        cache: Optional[ResultCache] = None
+    ) -> None:
+        """Initialize RetentionService with a session factory, the TTLs by terminal status and the batch bounds."""
+        self.session_factory = session_factory
+        self.image_ttl_hours = image_ttl_hours
+        self.job_ttl_hours = job_ttl_hours
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self.batch_pause_seconds = batch_pause_seconds
+        self.archive_dir = archive_dir
+        self.storage = storage or blob_store
+        self.preprocessor = preprocessor or image_preprocessor
+        self.cache = cache or result_cache
+    
+    async def run(self, now: Optional[datetime] = None) -> RetentionStats:
+        """
+        Delete what has expired, up to `max_batches` batches per phase.
+        
+        Args:
+            now: The time TTLs are measured from, the current time by default
+        
+        Returns:
+            RetentionStats: What was removed
+        """
+        now = now or datetime.now(timezone.utc)
+        stats = RetentionStats()
+        await self._delete_images(now, stats)
+        await self._delete_jobs(now, stats)
+        return stats
+    
+    async def _delete_images(self, now: datetime, stats: RetentionStats) -> None:
+        """Delete expired images batch by batch."""
+        done_before, failed_before = self._cutoffs(self.image_ttl_hours, now)
+        if done_before is None and failed_before is None:
+            return
+        
+        for batch in range(self.max_batches):
+            if batch:
+                await asyncio.sleep(self.batch_pause_seconds)
+            async with self.session_factory() as session:
+                image_paths = await JobManager(session).find_expired_images(done_before, failed_before, self.batch_size)
+            if not image_paths:
+                return
+            
+            deleted_paths = []
+            for image_path in image_paths:
+                try:
+                    freed = await self.storage.delete(image_path)
+                    freed += await self.preprocessor.discard(self.storage.local_copy(image_path))
+                except Exception:
+                    # Left for the next run, as its jobs are not marked
+                    logger.warning("Could not delete expired image %s", image_path, exc_info=True)
+                    continue
+                deleted_paths.append(image_path)
+                stats.bytes_reclaimed += freed
+                RETENTION_BYTES_RECLAIMED.inc(freed)
+            
+            async with self.session_factory() as session:
+                await JobManager(session).mark_images_deleted(deleted_paths, now)
+            stats.images_deleted += len(deleted_paths)
+            RETENTION_IMAGES_DELETED.inc(len(deleted_paths))
+            if not deleted_paths:
+                # The images left would only be found again by the next batch
+                return
+    
+    async def _delete_jobs(self, now: datetime, stats: RetentionStats) -> None:
+        """Archive and delete expired job rows batch by batch."""
+        done_before, failed_before = self._cutoffs(self.job_ttl_hours, now)
+        if done_before is None and failed_before is None:
+            return
+        
+        for batch in range(self.max_batches):
+            if batch:
+                await asyncio.sleep(self.batch_pause_seconds)
+            async with self.session_factory() as session:
+                job_manager = JobManager(session)
+                jobs = await job_manager.find_expired_jobs(done_before, failed_before, self.batch_size)
+                if not jobs:
+                    return
+                if self.archive_dir:
+                    # Rows are only deleted once they are safely archived
+                    await blocking_io.run(self._archive, [archive_record(job) for job in jobs], now)
+                    stats.jobs_archived += len(jobs)
+                    RETENTION_JOBS_ARCHIVED.inc(len(jobs))
+                job_ids = [job.id for job in jobs]
+                deleted = await job_manager.delete_jobs(job_ids)
+            
+            stats.jobs_deleted += deleted
+            RETENTION_JOBS_DELETED.inc(deleted)
+            for job_id in job_ids:
+                await self.cache.discard(job_id)
+            if len(jobs) < self.batch_size:
+                return
+    
+    def _archive(self, records: List[dict], now: datetime) -> None:
+        """Append job records as JSON lines to the archive file of the day."""
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = os.path.join(self.archive_dir, f"jobs-{now:%Y%m%d}.jsonl")
+        with open(path, "a") as archive:
+            archive.writelines(json.dumps(record) + "\n" for record in records)
+            archive.flush()
+            os.fsync(archive.fileno())
+    
+    @staticmethod
+    def _cutoffs(ttl_hours: Dict[JobStatus, float], now: datetime) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Get the done and failed cutoffs of a set of TTLs, None where the TTL is 0."""
+        return tuple(
+            now - timedelta(hours=ttl_hours[status]) if ttl_hours.get(status) else None
+            for status in (JobStatus.DONE, JobStatus.FAILED)
+        )
+
+def archive_record(job: Job) -> dict:
+    """Convert a job row to a JSON-serializable dict of its columns."""
+    record = {}
+    for column in Job.__table__.columns:
+        value = getattr(job, column.key)
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, Enum):
+            value = value.value
+        record[column.key] = value
+    return record
+
+def create_retention_service(session_factory: Callable[[], AsyncSession]) -> RetentionService:
+    """Create a retention service configured by the RETENTION_* settings."""
+    return RetentionService(
+        session_factory,
+        {JobStatus.DONE: settings.RETENTION_IMAGE_TTL_DONE_HOURS, JobStatus.FAILED: settings.RETENTION_IMAGE_TTL_FAILED_HOURS},
+        {JobStatus.DONE: settings.RETENTION_JOB_TTL_DONE_HOURS, JobStatus.FAILED: settings.RETENTION_JOB_TTL_FAILED_HOURS},
+        settings.RETENTION_BATCH_SIZE,
+        settings.RETENTION_MAX_BATCHES_PER_RUN,
+        settings.RETENTION_BATCH_PAUSE_SECONDS,
+        settings.RETENTION_ARCHIVE_DIR
+    )
@@ -0,0 +1,66 @@
+from typing import Callable
+import random
+import httpx
+from PIL import Image, UnidentifiedImageError
+from app.config import settings
+from app.services.storage import InvalidStorageKey
+
+class PermanentJobError(Exception):
+    """Error of a job that fails the same way however often it is retried."""
+
+# Errors that retrying cannot fix: the image is gone, undecodable or refused
+PERMANENT_ERRORS = (
+    PermanentJobError,
+    FileNotFoundError,
+    InvalidStorageKey,
+    UnidentifiedImageError,
+    Image.DecompressionBombError,
+)
+# Statuses of a refused request that may be accepted later
+RETRIABLE_HTTP_STATUSES = frozenset({408, 425, 429})
+
+class RetryPolicy:
+    """
+    Decides whether a failed processing attempt is retried, and when.
+    
+    Errors are retriable unless they are permanent, such as a missing image
+    or a 4xx answer from a remote service, so an outage of the describer, the
+    blob store or the database is ridden out while a job that cannot succeed
+    fails at once. Retries back off exponentially from `base_delay` up to
+    `max_delay` with full jitter: each waits a random time up to the current
+    bound, which spreads out the jobs that failed together in an outage
+    instead of retrying them in lockstep.
+    """
+    
+    def __init__(self, base_delay: float, max_delay: float, rng: Callable[[], float] = random.random) -> None:
+        """Initialize RetryPolicy with the backoff bounds in seconds and a source of randomness."""
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng
+    
+    def is_retriable(self, exc: BaseException) -> bool:
+        """Whether a processing attempt that raised `exc` may succeed if retried."""
+        if isinstance(exc, httpx.HTTPStatusError):
+            status_code = exc.response.status_code
+            return status_code >= 500 or status_code in RETRIABLE_HTTP_STATUSES
+        return not isinstance(exc, PERMANENT_ERRORS)
+    
+    def delay(self, retries: int) -> float:
+        """
+        Get the countdown of the next retry.
+        
+        Args:
+            retries: Retries of the job so far, 0 before the first
+        
+        Returns:
+            float: Seconds to wait, between 0 and min(max_delay, base_delay * 2 ** retries)
+        """
+        bound = min(self.max_delay, self.base_delay * 2 ** min(retries, 32))
+        return self.rng() * bound
+
+def create_retry_policy() -> RetryPolicy:
+    """Create the retry policy configured by the TASK_RETRY_* settings."""
+    return RetryPolicy(settings.TASK_RETRY_DELAY, settings.TASK_RETRY_MAX_DELAY)
+
+# Process-wide retry policy
+retry_policy = create_retry_policy()
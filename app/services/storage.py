@@ -0,0 +1,257 @@
+from typing import AsyncIterator, Optional
+import asyncio
+import hashlib
+import os
+import shutil
+import tempfile
+import httpx
+from app.config import settings
+from app.services.blocking_io import blocking_io
+
+class InvalidStorageKey(ValueError):
+    """Error of a storage key that points outside the store."""
+
+def storage_key(filename: str, shard_depth: Optional[int] = None) -> str:
+    """
+    Get the storage key of a new file, fanned out into hash-prefix directories.
+    
+    Args:
+        filename: Name of the file, unique across the store
+        shard_depth: Directory levels of two hex digits each, STORAGE_SHARD_DEPTH by default
+    
+    Returns:
+        str: A key such as `3f/a2/<filename>`
+    """
+    depth = settings.STORAGE_SHARD_DEPTH if shard_depth is None else shard_depth
+    digest = hashlib.sha256(filename.encode()).hexdigest()
+    return "/".join([digest[level * 2:level * 2 + 2] for level in range(depth)] + [filename])
+
+class BlobStore:
+    """
+    Base class for stores of uploaded images, addressed by storage key.
+    
+    Keys are relative, slash separated paths such as those built by
+    `storage_key`, and are what `Job.image_path` holds. Whatever the backend,
+    `fetch` gives a path on the local filesystem, since describers and the
+    preprocessor read files.
+    """
+    
+    async def put_file(self, source_path: str, key: str) -> None:
+        """Store a local file under a key; the source file is consumed."""
+        raise NotImplementedError
+    
+    async def fetch(self, key: str) -> str:
+        """
+        Get a local path holding the blob stored under a key.
+        
+        Raises:
+            FileNotFoundError: If nothing is stored under the key
+        """
+        raise NotImplementedError
+    
+    async def exists(self, key: str) -> bool:
+        """Whether a blob is stored under a key."""
+        raise NotImplementedError
+    
+    async def delete(self, key: str) -> int:
+        """Delete the blob stored under a key, if there is one, and return the bytes freed."""
+        raise NotImplementedError
+    
+    def local_copy(self, key: str) -> str:
+        """Get where a blob is, or would be, kept on the local filesystem without fetching it."""
+        raise NotImplementedError
+    
+    async def close(self) -> None:
+        """Release connections held by the store."""
+
+class LocalBlobStore(BlobStore):
+    """Blob store in a directory shared by the web and worker processes."""
+    
+    def __init__(self, root: str) -> None:
+        """Initialize LocalBlobStore with its root directory."""
+        self.root = root
+    
+    def path(self, key: str) -> str:
+        """
+        Get the location of a key under the root directory.
+        
+        Raises:
+            InvalidStorageKey: If the key points outside the root directory
+        """
+        root = os.path.abspath(self.root)
+        path = os.path.abspath(os.path.join(root, key))
+        if os.path.commonpath([root, path]) != root or path == root:
+            raise InvalidStorageKey(f"Invalid storage key: {key}")
+        return path
+    
+    async def put_file(self, source_path: str, key: str) -> None:
+        """Move a local file into place under its key."""
+        await blocking_io.run(self._move, source_path, self.path(key))
+    
+    async def fetch(self, key: str) -> str:
+        """Get the location of a stored blob."""
+        path = self.path(key)
+        if not await blocking_io.run(os.path.exists, path):
+            raise FileNotFoundError(f"Image file not found: {key}")
+        return path
+    
+    async def exists(self, key: str) -> bool:
+        """Whether a blob is stored under a key."""
+        return await blocking_io.run(os.path.exists, self.path(key))
+    
+    async def delete(self, key: str) -> int:
+        """Delete the blob stored under a key, if there is one, and return the bytes freed."""
+        return await blocking_io.run(remove_file, self.path(key))
+    
+    def local_copy(self, key: str) -> str:
+        """Get the location of a key under the root directory."""
+        return self.path(key)
+    
+    @staticmethod
+    def _move(source_path: str, target_path: str) -> None:
+        """Move a file, creating its directory; a rename when both are on the same filesystem."""
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        shutil.move(source_path, target_path)
+
+class HttpBlobStore(BlobStore):
+    """
+    Blob store behind an object-store-style HTTP API.
+    
+    Blobs are written with `PUT <base_url>/<key>`, read with GET, checked
+    with HEAD and removed with DELETE, with bodies streamed in chunks of
+    `chunk_size` in both directions. Workers download blobs to `cache_dir`,
+    so the web and worker nodes need no shared volume; a cached blob is
+    reused by retries and preprocessing.
+    """
+    
+    def __init__(
+        self,
+        base_url: str,
+        cache_dir: str,
+        timeout: float = 30.0,
+        chunk_size: int = 64 * 1024,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ) -> None:
+        """Initialize HttpBlobStore with the store's URL, the local cache directory and an optional transport."""
+        self.base_url = base_url.rstrip("/")
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.transport = transport
+        self._http: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def put_file(self, source_path: str, key: str) -> None:
+        """Upload a local file under its key, then remove it."""
+        size = await blocking_io.run(os.path.getsize, source_path)
+        response = await self._client().put(
+            self._url(key),
+            content=self._read_chunks(source_path),
+            headers={"Content-Length": str(size)}
+        )
+        response.raise_for_status()
+        await blocking_io.run(remove_file, source_path)
+    
+    async def fetch(self, key: str) -> str:
+        """Download a blob to the cache directory, unless it is cached already, and return its path."""
+        cached_path = self.local_copy(key)
+        if await blocking_io.run(os.path.exists, cached_path):
+            return cached_path
+        
+        await blocking_io.run(os.makedirs, os.path.dirname(cached_path), exist_ok=True)
+        fd, temp_path = await blocking_io.run(
+            tempfile.mkstemp, dir=os.path.dirname(cached_path), prefix=".fetch-", suffix=".part"
+        )
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                async with self._client().stream("GET", self._url(key)) as response:
+                    if response.status_code == 404:
+                        raise FileNotFoundError(f"Image file not found: {key}")
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(self.chunk_size):
+                        await blocking_io.run(temp_file.write, chunk)
+                await blocking_io.run(temp_file.flush)
+            await blocking_io.run(os.replace, temp_path, cached_path)
+        except BaseException:
+            await blocking_io.run(remove_file, temp_path)
+            raise
+        return cached_path
+    
+    async def exists(self, key: str) -> bool:
+        """Whether a blob is stored under a key."""
+        response = await self._client().head(self._url(key))
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+    
+    async def delete(self, key: str) -> int:
+        """Delete the blob stored under a key and its cached copy, and return the bytes freed in the store."""
+        response = await self._client().head(self._url(key))
+        if response.status_code == 404:
+            size = 0
+        else:
+            response.raise_for_status()
+            size = int(response.headers.get("Content-Length", 0))
+            response = await self._client().delete(self._url(key))
+            if response.status_code != 404:
+                response.raise_for_status()
+        await blocking_io.run(remove_file, self._cached_path(key))
+        return size
+    
+    def local_copy(self, key: str) -> str:
+        """Get where a blob is cached locally once fetched."""
+        return self._cached_path(key)
+    
+    async def close(self) -> None:
+        """Close the HTTP client."""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    def _url(self, key: str) -> str:
+        """Get the URL of a key."""
+        return f"{self.base_url}/{key}"
+    
+    def _cached_path(self, key: str) -> str:
+        """Get where a blob is cached locally."""
+        return LocalBlobStore(self.cache_dir).path(key)
+    
+    async def _read_chunks(self, source_path: str) -> AsyncIterator[bytes]:
+        """Read a local file in chunks, off the event loop."""
+        with await blocking_io.run(open, source_path, "rb") as source:
+            while chunk := await blocking_io.run(source.read, self.chunk_size):
+                yield chunk
+    
+    def _client(self) -> httpx.AsyncClient:
+        """Get the HTTP client, creating it for the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._loop is not loop:
+            self._http = httpx.AsyncClient(timeout=self.timeout, transport=self.transport)
+            self._loop = loop
+        return self._http
+
+def remove_file(path: str) -> int:
+    """Remove a file, ignoring it if it is already gone, and return its size."""
+    try:
+        size = os.path.getsize(path)
+        os.remove(path)
+    except FileNotFoundError:
+        return 0
+    return size
+
+def create_blob_store() -> BlobStore:
+    """Create the blob store selected by STORAGE_BACKEND."""
+    if settings.STORAGE_BACKEND == "local":
+        return LocalBlobStore(settings.UPLOAD_DIR)
+    if settings.STORAGE_BACKEND == "http":
+        return HttpBlobStore(
+            settings.STORAGE_HTTP_URL,
+            settings.STORAGE_CACHE_DIR,
+            settings.STORAGE_HTTP_TIMEOUT,
+            settings.UPLOAD_CHUNK_SIZE
+        )
+    raise ValueError(f"Unknown storage backend: {settings.STORAGE_BACKEND}")
+
+# Process-wide blob store
+blob_store = create_blob_store()
@@ -0,0 +1,206 @@
+from collections import defaultdict
+from enum import Enum
+from typing import Dict, Optional, Set
+import asyncio
+import logging
+import threading
+import time
+import redis.asyncio as redis
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+class SlotGrant(str, Enum):
+    """Outcome of asking for a processing slot of a tenant."""
+    REFUSED = "refused"  # The tenant is at its cap
+    TAKEN = "taken"  # A slot was taken for the job
+    HELD = "held"  # The job already holds a slot, taken by another delivery of its task
+    UNCOUNTED = "uncounted"  # Admitted without a slot, as the cap could not be checked
+
+# Takes a slot for a job unless the tenant is at its cap, after dropping
+# slots whose lease expired, and answers with the SlotGrant code: 0 refused,
+# 1 taken, 2 already held by the job.
+ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZSCORE', KEYS[1], ARGV[3]) then
+    return 2
+end
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[4]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[2], ARGV[3])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return 1
+"""
+# SlotGrant of each ACQUIRE_SCRIPT answer
+SCRIPT_GRANTS = {0: SlotGrant.REFUSED, 1: SlotGrant.TAKEN, 2: SlotGrant.HELD}
+
+class TenantConcurrencyLimiter:
+    """
+    Cap on the number of jobs each tenant has in processing at once.
+    
+    A task takes one of its tenant's slots for its job before it claims the
+    job and gives it back when it finishes, so one tenant with a large backlog
+    can only occupy `max_concurrent` worker slots and the rest stay free for
+    others. Slots are held per job: another delivery of the task of a job
+    that holds one is told so, and must only give the slot back if it claims
+    the job, as the slot otherwise belongs to the delivery processing it.
+    This implementation counts slots in the current process only.
+    """
+    
+    def __init__(self, max_concurrent: int) -> None:
+        """Initialize TenantConcurrencyLimiter; a cap of 0 or less admits every job."""
+        self.max_concurrent = max_concurrent
+        self._active: Dict[str, Set[str]] = defaultdict(set)
+        # Tasks of an async mode worker acquire from several threads
+        self._lock = threading.Lock()
+    
+    @property
+    def enabled(self) -> bool:
+        """Whether the cap is enforced."""
+        return self.max_concurrent > 0
+    
+    async def acquire(self, tenant_id: str, job_id: str) -> SlotGrant:
+        """
+        Take a processing slot of a tenant for a job.
+        
+        Args:
+            tenant_id: The tenant identifier
+            job_id: The job the slot is taken for
+        
+        Returns:
+            SlotGrant: Whether a slot was taken, was already held by the job, or was refused
+        """
+        if not self.enabled:
+            return SlotGrant.UNCOUNTED
+        with self._lock:
+            active = self._active[tenant_id]
+            if job_id in active:
+                return SlotGrant.HELD
+            if len(active) >= self.max_concurrent:
+                return SlotGrant.REFUSED
+            active.add(job_id)
+            return SlotGrant.TAKEN
+    
+    async def renew(self, tenant_id: str, job_id: str) -> None:
+        """Extend the lease of the slot a job holds; slots counted in process never expire."""
+    
+    async def release(self, tenant_id: str, job_id: str) -> None:
+        """Give back the processing slot a job took with `acquire`, if it holds one."""
+        if not self.enabled:
+            return
+        with self._lock:
+            active = self._active.get(tenant_id)
+            if active is None:
+                return
+            active.discard(job_id)
+            if not active:
+                del self._active[tenant_id]
+    
+    async def close(self) -> None:
+        """Release resources held by the limiter."""
+
+class RedisTenantConcurrencyLimiter(TenantConcurrencyLimiter):
+    """
+    Tenant concurrency cap shared by all worker processes through Redis.
+    
+    Each tenant has a sorted set of the jobs holding its slots, scored by
+    when their lease runs out `lease_seconds` after the slot was taken or
+    last renewed by the processing worker's heartbeat. An acquire first drops
+    expired slots, so those of a worker that died without releasing them are
+    returned after the lease whatever the tenant's backlog.
+    When Redis is unavailable the cap is not enforced rather than stalling
+    every job; such a job holds no slot, so releasing it frees nothing.
+    """
+    
+    def __init__(
+        self,
+        max_concurrent: int,
+        redis_url: str,
+        key_prefix: str = "tenant-jobs:",
+        lease_seconds: int = 600
+    ) -> None:
+        """Initialize RedisTenantConcurrencyLimiter with its Redis URL and counter lease."""
+        super().__init__(max_concurrent)
+        self.redis_url = redis_url
+        self.key_prefix = key_prefix
+        self.lease_seconds = lease_seconds
+        self._redis: Optional[redis.Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+    
+    async def acquire(self, tenant_id: str, job_id: str) -> SlotGrant:
+        """Take a processing slot of a tenant for a job, counted across all workers."""
+        if not self.enabled:
+            return SlotGrant.UNCOUNTED
+        now = time.time()
+        try:
+            answer = await self._client().eval(
+                ACQUIRE_SCRIPT,
+                1,
+                self._key(tenant_id),
+                now,
+                now + self.lease_seconds,
+                job_id,
+                self.max_concurrent,
+                self.lease_seconds
+            )
+            return SCRIPT_GRANTS[int(answer)]
+        except Exception:
+            logger.warning("Could not take a processing slot of tenant %s, admitting job", tenant_id, exc_info=True)
+        return SlotGrant.UNCOUNTED
+    
+    async def renew(self, tenant_id: str, job_id: str) -> None:
+        """Extend the lease of the slot a job holds, if it still holds one, by `lease_seconds` from now."""
+        if not self.enabled:
+            return
+        key = self._key(tenant_id)
+        try:
+            async with self._client().pipeline(transaction=True) as pipe:
+                pipe.zadd(key, {job_id: time.time() + self.lease_seconds}, xx=True)
+                pipe.expire(key, self.lease_seconds)
+                await pipe.execute()
+        except Exception:
+            logger.warning("Could not renew a processing slot of tenant %s", tenant_id, exc_info=True)
+    
+    async def release(self, tenant_id: str, job_id: str) -> None:
+        """Give back the processing slot a job took with `acquire`, if it holds one."""
+        if not self.enabled:
+            return
+        try:
+            await self._client().zrem(self._key(tenant_id), job_id)
+        except Exception:
+            logger.warning("Could not release a processing slot of tenant %s", tenant_id, exc_info=True)
+    
+    async def close(self) -> None:
+        """Close the Redis connection."""
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+    
+    def _key(self, tenant_id: str) -> str:
+        """Get the Redis key of a tenant's slots."""
+        return f"{self.key_prefix}{tenant_id}"
+    
+    def _client(self) -> redis.Redis:
+        """Get the Redis client, creating it for the running event loop if needed."""
+        loop = asyncio.get_running_loop()
+        if self._redis is None or self._loop is not loop:
+            self._redis = redis.from_url(self.redis_url)
+            self._loop = loop
+        return self._redis
+
+def create_tenant_limiter() -> TenantConcurrencyLimiter:
+    """Create the tenant concurrency limiter selected by TENANT_LIMIT_BACKEND."""
+    if settings.TENANT_LIMIT_BACKEND == "memory":
+        return TenantConcurrencyLimiter(settings.TENANT_MAX_CONCURRENT_JOBS)
+    if settings.TENANT_LIMIT_BACKEND == "redis":
+        return RedisTenantConcurrencyLimiter(
+            settings.TENANT_MAX_CONCURRENT_JOBS,
+            settings.REDIS_URL,
+            settings.TENANT_LIMIT_KEY_PREFIX,
+            settings.TENANT_LIMIT_LEASE_SECONDS
+        )
+    raise ValueError(f"Unknown tenant limit backend: {settings.TENANT_LIMIT_BACKEND}")
+
+# Process-wide tenant concurrency limiter
+tenant_limiter = create_tenant_limiter()
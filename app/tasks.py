@@ -1,10 +1,48 @@
-from celery import Celery
+from celery import Celery, group
+from celery.signals import (
+    task_postrun,
+    task_prerun,
+    worker_process_init,
+    worker_process_shutdown,
+    worker_ready,
+    worker_shutdown
+)
+from kombu import Queue
+from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Optional
 import asyncio
+import contextlib
+import logging
+import os
 from app.config import settings
-from app.database import AsyncSessionLocal
+from app.metrics import (
+    JOBS_IN_FLIGHT,
+    JOBS_PROCESSED,
+    JOB_FAILURES,
+    JOB_RETRIES,
+    JOBS_REAPED,
+    mark_process_dead,
+    observe_queue_wait,
+    start_worker_exporter
+)
+from app.profiling import finish_task_profile, start_task_profile
+from app.worker_runtime import runtime
 from app.services.job_manager import JobManager
 from app.services.image_processor import ImageProcessor
-from app.enums import JobStatus
+from app.services.job_events import job_event_bus
+from app.services.result_cache import CachedResult, result_cache
+from app.services.tenant_limiter import SlotGrant, tenant_limiter
+from app.services.description_batcher import DescriptionBatcher
+from app.services.retention import create_retention_service
+from app.services.retry_policy import RetryPolicy, retry_policy
+from app.enums import JobStatus, JobPriority
+from app.models import Job
+
+logger = logging.getLogger(__name__)
+
+# Longest error message stored on a job
+ERROR_MESSAGE_MAX_LENGTH = 1000
 
 # Initialize Celery
 celery_app = Celery(
@@ -18,64 +56,423 @@ celery_app = Celery(
     enable_utc=True,
 )
 
-@celery_app.task(bind=True, max_retries=settings.TASK_MAX_RETRIES, default_retry_delay=settings.TASK_RETRY_DELAY)
-def process_image_task(self, job_id: str, file_path: str) -> dict:
+# Interactive and bulk jobs wait in separate queues, so a bulk backlog never
+# sits in front of an interactive job. Workers reserve one message at a time
+# to leave the rest of a queue for other workers.
+celery_app.conf.update(
+    task_queues=(Queue(settings.CELERY_INTERACTIVE_QUEUE), Queue(settings.CELERY_BULK_QUEUE)),
+    task_default_queue=settings.CELERY_INTERACTIVE_QUEUE,
+    worker_prefetch_multiplier=settings.WORKER_PREFETCH_MULTIPLIER,
+)
+
+# Tasks are acknowledged when they finish rather than when they start, so a
+# task whose worker is killed or restarted mid-job is delivered again. Redis
+# redelivers a task left unacknowledged for CELERY_VISIBILITY_TIMEOUT, which
+# must be longer than any task runs or waits for its retry countdown.
+celery_app.conf.update(
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    broker_transport_options={"visibility_timeout": settings.CELERY_VISIBILITY_TIMEOUT},
+)
+
+if settings.WORKER_MODE == "async":
+    # One process whose task threads share a single event loop
+    celery_app.conf.update(worker_pool="threads", worker_concurrency=settings.WORKER_ASYNC_CONCURRENCY)
+else:
+    celery_app.conf.update(worker_concurrency=settings.CELERY_WORKERS)
+
+# Groups concurrently processed jobs into batched describer calls
+description_batcher = DescriptionBatcher(
+    ImageProcessor(),
+    runtime.session,
+    settings.DESCRIBE_BATCH_MAX_SIZE,
+    settings.DESCRIBE_BATCH_MAX_WAIT_MS
+)
+
+# Backs off the deferrals of a job whose tenant stays at its concurrency cap
+tenant_deferral_policy = RetryPolicy(settings.TENANT_LIMIT_RETRY_DELAY, settings.TENANT_LIMIT_MAX_RETRY_DELAY)
+
+# Deletes expired images and job rows when beat schedules it
+retention_service = create_retention_service(runtime.session)
+
+# Periodic tasks; a run still waiting when the next one is due is dropped
+celery_app.conf.beat_schedule = {}
+if settings.RETENTION_ENABLED:
+    # On the interactive queue, so a bulk backlog cannot expire every run before it starts
+    celery_app.conf.beat_schedule["run-retention"] = {
+        "task": "app.tasks.run_retention",
+        "schedule": settings.RETENTION_INTERVAL_SECONDS,
+        "options": {"queue": settings.CELERY_INTERACTIVE_QUEUE, "expires": settings.RETENTION_INTERVAL_SECONDS},
+    }
+if settings.REAPER_ENABLED:
+    # On the interactive queue, so a bulk backlog cannot hold up recovery
+    celery_app.conf.beat_schedule["reap-stale-jobs"] = {
+        "task": "app.tasks.reap_stale_jobs",
+        "schedule": settings.REAPER_INTERVAL_SECONDS,
+        "options": {"queue": settings.CELERY_INTERACTIVE_QUEUE, "expires": settings.REAPER_INTERVAL_SECONDS},
+    }
+
+@worker_process_init.connect
+def start_worker_runtime(**kwargs) -> None:
+    """Create the event loop and load the describer of a pool process before it runs any task."""
+    runtime.start()
+    runtime.warm_up()
+
+@worker_ready.connect
+def start_async_worker_runtime(**kwargs) -> None:
+    """Load the describer of an async mode worker, whose tasks run in the main process."""
+    if settings.WORKER_MODE == "async":
+        runtime.start()
+        runtime.warm_up()
+
+@worker_ready.connect
+def start_metrics_exporter(**kwargs) -> None:
+    """Serve the worker's metrics from the main worker process."""
+    if settings.WORKER_METRICS_PORT:
+        start_worker_exporter(settings.WORKER_METRICS_PORT, pool_processes=settings.WORKER_MODE != "async")
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def stop_worker_runtime(**kwargs) -> None:
+    """Release the event loop and connection pool of a worker process."""
+    runtime.stop()
+
+@worker_process_shutdown.connect
+def drop_process_metrics(**kwargs) -> None:
+    """Drop the live gauges of a pool process that is exiting."""
+    mark_process_dead(os.getpid())
+
+def queue_for_priority(priority: JobPriority) -> str:
+    """Get the Celery queue that jobs of a priority are routed to."""
+    if priority == JobPriority.BULK:
+        return settings.CELERY_BULK_QUEUE
+    return settings.CELERY_INTERACTIVE_QUEUE
+
+@task_prerun.connect
+def start_profiling_task(task_id: str = None, **kwargs) -> None:
+    """Start profiling a task if it is sampled for profiling."""
+    try:
+        # The task's coroutines run on the worker loop, in its own thread in async mode
+        start_task_profile(task_id, runtime.call_in_loop_thread)
+    except Exception:
+        logger.warning("Could not start profiling task %s", task_id, exc_info=True)
+
+@task_postrun.connect
+def finish_profiling_task(task_id: str = None, task=None, **kwargs) -> None:
+    """Write the profile of a task that was profiled."""
+    try:
+        path = finish_task_profile(task_id, task.name if task is not None else "task", runtime.call_in_loop_thread)
+    except Exception:
+        logger.warning("Could not write the profile of task %s", task_id, exc_info=True)
+        return
+    if path:
+        logger.info("Wrote profile of task %s to %s", task_id, path)
+
+@celery_app.task(bind=True, max_retries=settings.TASK_MAX_RETRIES)
+def process_image_task(
+    self,
+    job_id: str,
+    file_path: str,
+    tenant_id: str = "anonymous",
+    priority: str = JobPriority.INTERACTIVE.value,
+    enqueued_at: Optional[str] = None,
+    deferrals: int = 0
+) -> dict:
     """
     Process image task with retry mechanism.
     
+    A tenant already at its concurrency cap does not take a worker slot: the
+    task is sent back to its queue to try again after a jittered backoff
+    from TENANT_LIMIT_RETRY_DELAY up to TENANT_LIMIT_MAX_RETRY_DELAY, growing
+    with each deferral of the job.
+    
+    A failed attempt whose error is retriable moves the job to retrying and is
+    tried again after a backoff chosen by the retry policy. A permanent error,
+    or one left after TASK_MAX_RETRIES retries, fails the job and moves it to
+    the dead-letter queue, from where it can be replayed.
+    
     Args:
         job_id: The job identifier
         file_path: Path to the image file to process
+        tenant_id: The tenant that submitted the job
+        priority: The job priority, which selects its queue
+        enqueued_at: ISO 8601 time the task was first published
+        deferrals: Times the job was deferred for its tenant's cap so far
         
     Returns:
         dict: Processing result with job_id, status, and description
     """
     try:
-        result = asyncio.run(_process_image_async(job_id, file_path))
+        with JOBS_IN_FLIGHT.track_inprogress():
+            result = runtime.run(_process_image_async(
+                job_id, file_path, datetime.fromisoformat(enqueued_at) if enqueued_at else None, tenant_id
+            ))
+        if result["status"] == "deferred":
+            self.apply_async(
+                args=(job_id, file_path),
+                kwargs={"tenant_id": tenant_id, "priority": priority, "enqueued_at": enqueued_at, "deferrals": deferrals + 1},
+                queue=queue_for_priority(JobPriority(priority)),
+                countdown=tenant_deferral_policy.delay(deferrals)
+            )
+            logger.info("Tenant %s is at its concurrency cap, deferring job %s", tenant_id, job_id)
+        JOBS_PROCESSED.labels(outcome=result["status"]).inc()
         return result
     except Exception as exc:
-        # Update job status to failed
-        asyncio.run(_update_job_failed(job_id, str(exc)))
-        raise self.retry(exc=exc, countdown=settings.TASK_RETRY_DELAY)
+        error = _error_message(exc)
+        if retry_policy.is_retriable(exc) and self.request.retries < self.max_retries:
+            JOBS_PROCESSED.labels(outcome="retrying").inc()
+            JOB_RETRIES.inc()
+            countdown = retry_policy.delay(self.request.retries)
+            runtime.run(_update_job_retrying(job_id, error, countdown))
+            raise self.retry(exc=exc, countdown=countdown)
+        JOBS_PROCESSED.labels(outcome="failed").inc()
+        JOB_FAILURES.inc()
+        logger.warning("Job %s failed after %d retries, dead-lettering it: %s", job_id, self.request.retries, error)
+        runtime.run(_update_job_failed(job_id, error))
+        raise
+
+@celery_app.task(name="app.tasks.run_retention")
+def run_retention_task() -> dict:
+    """
+    Delete the stored images and job rows whose TTL has passed.
+    
+    Returns:
+        dict: Images deleted, bytes reclaimed and job rows archived and deleted
+    """
+    stats = asdict(runtime.run(retention_service.run()))
+    logger.info("Retention run finished: %s", stats)
+    return stats
 
-async def _process_image_async(job_id: str, file_path: str) -> dict:
+async def _process_image_async(
+    job_id: str,
+    file_path: str,
+    enqueued_at: Optional[datetime] = None,
+    tenant_id: str = "anonymous"
+) -> dict:
     """
     Async image processing workflow.
     
+    The job is processed in a slot of its tenant, taken before it is claimed.
+    The slot is given back once the job was processed, or at once by a task
+    that did not claim the job and took the slot itself; a slot the job
+    already held belongs to the delivery of its task that is processing it.
+    
     Args:
         job_id: The job identifier
         file_path: Path to the image file to process
+        enqueued_at: When the task was first published, recorded with the job's timings
+        tenant_id: The tenant that submitted the job
         
     Returns:
-        dict: Processing result
+        dict: Processing result, "deferred" if the tenant is at its concurrency cap
     """
-    async with AsyncSessionLocal() as session:
+    async with runtime.session() as session:
         job_manager = JobManager(session)
         image_processor = ImageProcessor()
         
-        # Update status to processing
-        await job_manager.update_job_status(job_id, JobStatus.PROCESSING)
-        
-        # Process image
-        description = await image_processor.process_image(file_path)
+        slot = await tenant_limiter.acquire(tenant_id, job_id)
+        if slot == SlotGrant.REFUSED:
+            return {"job_id": job_id, "status": "deferred"}
         
-        # Update job with result
-        await job_manager.update_job_result(job_id, description)
+        # Claim the job; a duplicate delivery of the task finds it already claimed
+        try:
+            claimed_job = await job_manager.claim_job(job_id, enqueued_at, settings.JOB_LEASE_SECONDS)
+        except BaseException:
+            if slot == SlotGrant.TAKEN:
+                await tenant_limiter.release(tenant_id, job_id)
+            raise
+        if claimed_job is None:
+            if slot == SlotGrant.TAKEN:
+                await tenant_limiter.release(tenant_id, job_id)
+            logger.info("Job %s is not claimable, skipping duplicate or stale task", job_id)
+            return {"job_id": job_id, "status": "skipped"}
+        observe_queue_wait(claimed_job)
         
-        return {
-            "job_id": job_id, 
-            "status": "completed", 
-            "description": description
-        }
+        # Keep the job's lease and tenant slot while it is processed, so neither is taken back
+        heartbeat = asyncio.create_task(_renew_lease(job_id, tenant_id)) if settings.JOB_LEASE_SECONDS else None
+        try:
+            if settings.DESCRIBE_BATCH_MAX_SIZE > 1:
+                # Process image in a batch, which also stores the result
+                completed_job = await description_batcher.describe(job_id, file_path)
+            else:
+                # Process image
+                describer = await image_processor.get_describer()
+                describer_started_at = datetime.now(timezone.utc)
+                description = await image_processor.process_image(file_path)
+                describer_finished_at = datetime.now(timezone.utc)
+                
+                # Update job with result, unless it stopped processing in the meantime
+                completed_job = await job_manager.complete_job(
+                    job_id, description, describer.name, describer_started_at, describer_finished_at
+                )
+        finally:
+            if heartbeat is not None:
+                heartbeat.cancel()
+                # Wait for it to stop, so it cannot renew the lease of a finished job
+                with contextlib.suppress(asyncio.CancelledError):
+                    await heartbeat
+            await tenant_limiter.release(tenant_id, job_id)
+        return await _finish_completed_job(job_id, completed_job)
+
+async def _finish_completed_job(job_id: str, completed_job: Optional[Job]) -> dict:
+    """
+    Cache and announce the stored result of a job, however it was described.
+    
+    Args:
+        job_id: The job identifier
+        completed_job: The completed job, or None if it stopped processing before its result was stored
+    
+    Returns:
+        dict: Processing result
+    """
+    if completed_job is None:
+        logger.warning("Job %s stopped processing before its result was stored", job_id)
+        return {"job_id": job_id, "status": "skipped"}
+    
+    await _cache_result(completed_job)
+    await _publish_job_event(job_id, JobStatus.DONE)
+    
+    return {
+        "job_id": job_id, 
+        "status": "completed", 
+        "description": completed_job.image_description
+    }
+
+async def _renew_lease(job_id: str, tenant_id: str = "anonymous") -> None:
+    """
+    Renew the lease of a processing job, and of its tenant slot, every JOB_LEASE_HEARTBEAT_SECONDS until cancelled.
+    
+    Renewal is best effort: a failed renewal is tried again on the next beat,
+    and the lease only runs out if JOB_LEASE_SECONDS pass without one.
+    
+    Args:
+        job_id: The job identifier
+        tenant_id: The tenant whose slot the job holds
+    """
+    while True:
+        await asyncio.sleep(settings.JOB_LEASE_HEARTBEAT_SECONDS)
+        try:
+            # A session of its own, as the task's session is busy with the job
+            async with runtime.session() as session:
+                if not await JobManager(session).renew_lease(job_id, settings.JOB_LEASE_SECONDS):
+                    # The job finished or was taken back by the reaper
+                    return
+            await tenant_limiter.renew(tenant_id, job_id)
+        except Exception:
+            logger.warning("Could not renew the lease of job %s", job_id, exc_info=True)
+
+@celery_app.task(name="app.tasks.reap_stale_jobs")
+def reap_stale_jobs_task() -> dict:
+    """
+    Take back processing jobs whose worker stopped renewing their lease, and retrying jobs whose retry never came.
+    
+    Returns:
+        dict: Numbers of jobs requeued and failed
+    """
+    result = runtime.run(_reap_stale_jobs())
+    if result["requeued"] or result["failed"]:
+        logger.warning("Reaped stale jobs: %s", result)
+    return result
+
+async def _reap_stale_jobs(now: Optional[datetime] = None) -> dict:
+    """
+    Requeue processing jobs whose lease expired, or fail them after REAPER_MAX_ATTEMPTS claims.
+    
+    Each job is taken back by a compare-and-set on its status and lease, so
+    overlapping reaper runs, and a worker finishing the job after all, never
+    requeue it twice. A task delivered again for a requeued job, as late
+    acknowledgement can do, is skipped by whichever claim comes second.
+    
+    Args:
+        now: The time leases are compared to, the current time by default
+    
+    Returns:
+        dict: Numbers of jobs requeued and failed
+    """
+    now = now or datetime.now(timezone.utc)
+    async with runtime.session() as session:
+        job_manager = JobManager(session)
+        requeued = await job_manager.requeue_stale_jobs(now, settings.REAPER_MAX_ATTEMPTS, settings.REAPER_BATCH_SIZE)
+        failed = await job_manager.fail_stale_jobs(now, settings.REAPER_MAX_ATTEMPTS, settings.REAPER_BATCH_SIZE)
+    
+    if requeued:
+        # Queue the processing tasks on their priority's queue in one publish
+        enqueued_at = now.isoformat()
+        group([
+            process_image_task.s(
+                row.id, row.image_path, tenant_id=row.tenant_id, priority=row.priority.value, enqueued_at=enqueued_at
+            ).set(queue=queue_for_priority(row.priority))
+            for row in requeued
+        ]).apply_async()
+    for job_id in failed:
+        await _publish_job_event(job_id, JobStatus.FAILED)
+    
+    JOBS_REAPED.labels(outcome="requeued").inc(len(requeued))
+    JOBS_REAPED.labels(outcome="failed").inc(len(failed))
+    return {"requeued": len(requeued), "failed": len(failed)}
+
+async def _update_job_retrying(job_id: str, error_message: str, countdown: float) -> None:
+    """
+    Update job status to retrying until its next attempt.
+    
+    The job is leased for the countdown plus JOB_LEASE_SECONDS, so if the
+    retry message is lost the reaper takes the job back rather than leaving
+    it retrying forever.
+    
+    Args:
+        job_id: The job identifier
+        error_message: Error of the failed attempt, stored on the job
+        countdown: Seconds until the retry is delivered
+    """
+    lease_seconds = countdown + settings.JOB_LEASE_SECONDS if settings.JOB_LEASE_SECONDS else 0
+    async with runtime.session() as session:
+        job_manager = JobManager(session)
+        await job_manager.retry_job(job_id, error_message, lease_seconds)
 
 async def _update_job_failed(job_id: str, error_message: str) -> None:
     """
-    Update job status to failed.
+    Update job status to failed, dead-lettering the job.
     
     Args:
         job_id: The job identifier
-        error_message: Error message to log
+        error_message: Error of the last attempt, stored on the job
     """
-    async with AsyncSessionLocal() as session:
+    async with runtime.session() as session:
         job_manager = JobManager(session)
-        await job_manager.update_job_status(job_id, JobStatus.FAILED) 
\ No newline at end of file
+        failed_job = await job_manager.fail_job(job_id, error_message)
+    if failed_job is not None:
+        await _publish_job_event(job_id, JobStatus.FAILED)
+
+def _error_message(exc: BaseException) -> str:
+    """Describe an error for the job record, within ERROR_MESSAGE_MAX_LENGTH."""
+    return f"{type(exc).__name__}: {exc}"[:ERROR_MESSAGE_MAX_LENGTH]
+
+async def _publish_job_event(job_id: str, status: JobStatus) -> None:
+    """
+    Announce a job status change to clients waiting on it.
+    
+    Delivery is best effort: a failure to publish never fails the task.
+    
+    Args:
+        job_id: The job identifier
+        status: The new job status
+    """
+    try:
+        await job_event_bus.publish(job_id, status)
+    except Exception:
+        logger.warning("Could not publish %s event for job %s", status.value, job_id, exc_info=True)
+ 
+
+async def _cache_result(job: Job) -> None:
+    """
+    Push a completed job's result to the result cache before clients ask for it.
+    
+    Caching is best effort: a failure to cache never fails the task.
+    
+    Args:
+        job: The completed job
+    """
+    try:
+        await result_cache.put(CachedResult.from_job(job))
+    except Exception:
+        logger.warning("Could not cache result of job %s", job.id, exc_info=True)
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from app.enums import JobStatus
+from app.models import Job
 
 class JobSubmitResponse(BaseModel):
     """Response model for job submission."""
@@ -9,12 +10,54 @@ class JobSubmitResponse(BaseModel):
     status: JobStatus = Field(..., description="Current job status")
     message: str = Field(..., description="Submission message")
 
+class BatchSubmitResponse(BaseModel):
+    """Response model for batch job submission."""
+    jobs: List[JobSubmitResponse] = Field(..., description="Submitted jobs, in the order of the uploaded files")
+
 class JobStatusResponse(BaseModel):
     """Response model for job status query."""
     job_id: str = Field(..., description="Unique job identifier")
     status: JobStatus = Field(..., description="Current job status")
     created_at: datetime = Field(..., description="Job creation timestamp")
 
+class JobTimings(BaseModel):
+    """Stage timestamps and durations of a job, in UTC."""
+    accepted_at: Optional[datetime] = Field(None, description="Submission admitted")
+    stored_at: Optional[datetime] = Field(None, description="Upload validated and written to disk")
+    enqueued_at: Optional[datetime] = Field(None, description="Processing task first published")
+    picked_up_at: Optional[datetime] = Field(None, description="Job first claimed by a worker")
+    describer_started_at: Optional[datetime] = Field(None, description="Last describer call started")
+    describer_finished_at: Optional[datetime] = Field(None, description="Last describer call returned")
+    completed_at: Optional[datetime] = Field(None, description="Result stored")
+    attempts: int = Field(..., description="Number of times a worker claimed the job")
+    upload_seconds: Optional[float] = Field(None, description="Accepted to stored: validation and upload streaming")
+    queue_seconds: Optional[float] = Field(None, description="Enqueued to picked up")
+    describe_seconds: Optional[float] = Field(None, description="Describer call of the last attempt")
+    total_seconds: Optional[float] = Field(None, description="Accepted to completed, including any retries")
+    
+    @classmethod
+    def from_job(cls, job: Job) -> "JobTimings":
+        """Build the timings of a job record, deriving the stage durations from its timestamps."""
+        def seconds(start: Optional[datetime], end: Optional[datetime]) -> Optional[float]:
+            if start is None or end is None:
+                return None
+            return round((end - start).total_seconds(), 6)
+        
+        return cls(
+            accepted_at=job.accepted_at,
+            stored_at=job.stored_at,
+            enqueued_at=job.enqueued_at,
+            picked_up_at=job.picked_up_at,
+            describer_started_at=job.describer_started_at,
+            describer_finished_at=job.describer_finished_at,
+            completed_at=job.completed_at,
+            attempts=job.attempts or 0,
+            upload_seconds=seconds(job.accepted_at, job.stored_at),
+            queue_seconds=seconds(job.enqueued_at, job.picked_up_at),
+            describe_seconds=seconds(job.describer_started_at, job.describer_finished_at),
+            total_seconds=seconds(job.accepted_at, job.completed_at)
+        )
+
 class JobResultResponse(BaseModel):
     """Response model for job result retrieval."""
     job_id: str = Field(..., description="Unique job identifier")
@@ -22,4 +65,78 @@ class JobResultResponse(BaseModel):
     image_description: str = Field(..., description="Generated image description")
     generated_by: str = Field(..., description="Service that generated the description")
     created_at: datetime = Field(..., description="Job creation timestamp")
-    completed_at: Optional[datetime] = Field(None, description="Job completion timestamp") 
\ No newline at end of file
+    completed_at: Optional[datetime] = Field(None, description="Job completion timestamp")
+    timings: Optional[JobTimings] = Field(None, description="Stage timings, with ?include=timings")
+
+class BulkJobRequest(BaseModel):
+    """Request model for looking up several jobs at once."""
+    job_ids: List[str] = Field(..., min_length=1, description="Job identifiers to look up")
+
+class BulkJobStatus(BaseModel):
+    """Status of one job in a bulk status lookup."""
+    job_id: str = Field(..., description="Unique job identifier")
+    status: Optional[JobStatus] = Field(None, description="Current job status")
+    created_at: Optional[datetime] = Field(None, description="Job creation timestamp")
+    error: Optional[str] = Field(None, description="Why the job could not be reported")
+
+class BulkStatusResponse(BaseModel):
+    """Response model for bulk job status query."""
+    jobs: List[BulkJobStatus] = Field(..., description="Job statuses, in the order requested")
+
+class BulkJobResult(BaseModel):
+    """Result of one job in a bulk result lookup."""
+    job_id: str = Field(..., description="Unique job identifier")
+    status: Optional[JobStatus] = Field(None, description="Current job status")
+    image_description: Optional[str] = Field(None, description="Generated image description")
+    generated_by: Optional[str] = Field(None, description="Service that generated the description")
+    created_at: Optional[datetime] = Field(None, description="Job creation timestamp")
+    completed_at: Optional[datetime] = Field(None, description="Job completion timestamp")
+    error: Optional[str] = Field(None, description="Why the result could not be reported")
+
+class BulkResultResponse(BaseModel):
+    """Response model for bulk job result retrieval."""
+    jobs: List[BulkJobResult] = Field(..., description="Job results, in the order requested")
+
+class JobListItem(BaseModel):
+    """One job in a job listing."""
+    job_id: str = Field(..., description="Unique job identifier")
+    status: JobStatus = Field(..., description="Current job status")
+    created_at: datetime = Field(..., description="Job creation timestamp")
+    updated_at: Optional[datetime] = Field(None, description="Timestamp of the last status change")
+
+class JobListResponse(BaseModel):
+    """Response model for a page of jobs."""
+    jobs: List[JobListItem] = Field(..., description="Jobs, newest first")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, absent on the last page")
+
+class DeadLetterItem(BaseModel):
+    """One job in the dead-letter queue."""
+    job_id: str = Field(..., description="Unique job identifier")
+    attempts: int = Field(..., description="Number of times a worker claimed the job")
+    last_error: Optional[str] = Field(None, description="Error of the last attempt")
+    created_at: datetime = Field(..., description="Job creation timestamp")
+    dead_lettered_at: datetime = Field(..., description="When the job failed for good")
+
+class DeadLetterListResponse(BaseModel):
+    """Response model for a page of the dead-letter queue."""
+    jobs: List[DeadLetterItem] = Field(..., description="Dead-lettered jobs, most recently failed first")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, absent on the last page")
+
+class DeadLetterReplayResponse(BaseModel):
+    """Response model for replaying dead-lettered jobs."""
+    replayed: List[str] = Field(..., description="Jobs queued again")
+    skipped: List[str] = Field(..., description="Jobs not dead-lettered, unknown or whose image was deleted")
+
+class JobSummaryResponse(BaseModel):
+    """Response model for job counts by status."""
+    counts: Dict[JobStatus, int] = Field(..., description="Number of jobs in each status")
+    total: int = Field(..., description="Total number of jobs")
+
+class ResultCacheStatsResponse(BaseModel):
+    """Response model for result cache counters of one web process."""
+    local_hits: int = Field(..., description="Reads served by the in-process cache")
+    redis_hits: int = Field(..., description="Reads served by the shared Redis cache")
+    misses: int = Field(..., description="Reads that went to the database")
+    evictions: int = Field(..., description="Results evicted from the in-process cache to stay within its size")
+    size: int = Field(..., description="Results held by the in-process cache")
+    max_entries: int = Field(..., description="Maximum results held by the in-process cache")
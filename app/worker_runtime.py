@@ -0,0 +1,140 @@
+from typing import Any, Callable, Coroutine, Optional
+import asyncio
+import threading
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from app.config import settings
+from app.database import create_engine, create_session_factory
+from app.services.blocking_io import blocking_io
+from app.services.job_events import job_event_bus
+from app.services.preprocessor import image_preprocessor
+from app.services.result_cache import result_cache
+from app.services.storage import blob_store
+from app.services.tenant_limiter import tenant_limiter
+from app.services.describers import get_describer, close_describer
+
+class WorkerRuntime:
+    """
+    Event loop and database connection pool owned by a worker process for its whole life.
+    
+    In "prefork" mode each pool process runs one task at a time on its loop. In
+    "async" mode the loop runs in a background thread and every task thread of
+    the process submits its coroutine to it, so up to `concurrency` jobs are in
+    flight at once on a single loop.
+    """
+    
+    MODES = ("prefork", "async")
+    
+    def __init__(self, mode: str = "prefork", concurrency: int = 1) -> None:
+        """Initialize WorkerRuntime without starting it."""
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown worker mode: {mode}")
+        self.mode = mode
+        self.concurrency = concurrency
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._lock = threading.Lock()
+        self._engine: Optional[AsyncEngine] = None
+        self._session_factory: Optional[sessionmaker] = None
+    
+    def start(self) -> None:
+        """Create the process event loop, once."""
+        with self._lock:
+            if self.loop is not None:
+                return
+            self.loop = asyncio.new_event_loop()
+            if self.mode == "async":
+                self._slots = asyncio.Semaphore(self.concurrency)
+                self._thread = threading.Thread(target=self.loop.run_forever, name="worker-event-loop", daemon=True)
+                self._thread.start()
+            else:
+                asyncio.set_event_loop(self.loop)
+    
+    def run(self, coro: Coroutine) -> Any:
+        """
+        Run a coroutine to completion on the process event loop.
+        
+        Args:
+            coro: The coroutine to run
+        
+        Returns:
+            Any: The coroutine's result
+        """
+        self.start()
+        if self._thread is None:
+            return self.loop.run_until_complete(coro)
+        return asyncio.run_coroutine_threadsafe(self._run_in_slot(coro), self.loop).result()
+    
+    def call_in_loop_thread(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Call a function on the thread that runs the process event loop, bypassing the concurrency slots.
+        
+        That is the calling thread in "prefork" mode and the loop's background
+        thread in "async" mode, for work that must happen on the same thread as
+        the task's coroutines, such as enabling a profiler.
+        
+        Args:
+            func: The function to call
+            *args: Its arguments
+        
+        Returns:
+            Any: The function's result
+        """
+        self.start()
+        if self._thread is None:
+            return func(*args)
+        
+        async def call() -> Any:
+            return func(*args)
+        
+        return asyncio.run_coroutine_threadsafe(call(), self.loop).result()
+    
+    def warm_up(self) -> None:
+        """Load the process describer backend before the first job needs it."""
+        self.run(get_describer())
+    
+    def session(self) -> AsyncSession:
+        """Open a database session on the process connection pool."""
+        if self._session_factory is None:
+            self._engine = create_engine()
+            self._session_factory = create_session_factory(self._engine)
+        return self._session_factory()
+    
+    def stop(self) -> None:
+        """Close the connection pool and the event loop."""
+        with self._lock:
+            if self.loop is None:
+                return
+            if self._thread is None:
+                self.loop.run_until_complete(self._close_resources())
+                asyncio.set_event_loop(None)
+            else:
+                asyncio.run_coroutine_threadsafe(self._close_resources(), self.loop).result()
+                self.loop.call_soon_threadsafe(self.loop.stop)
+                self._thread.join()
+                self._thread = None
+            self.loop.close()
+            self.loop = None
+    
+    async def _run_in_slot(self, coro: Coroutine) -> Any:
+        """Run a coroutine once one of the concurrency slots is free."""
+        async with self._slots:
+            return await coro
+    
+    async def _close_resources(self) -> None:
+        """Release connections held on the process event loop."""
+        await job_event_bus.close()
+        await result_cache.close()
+        await tenant_limiter.close()
+        await blob_store.close()
+        await close_describer()
+        image_preprocessor.shutdown()
+        blocking_io.shutdown()
+        if self._engine is not None:
+            await self._engine.dispose()
+            self._engine = None
+            self._session_factory = None
+
+# Runtime of the current worker process
+runtime = WorkerRuntime(settings.WORKER_MODE, settings.WORKER_ASYNC_CONCURRENCY)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Database write throughput benchmark under concurrent submits and worker updates.
+
+Submitters insert jobs through one engine, the way the web process does, while
+updaters mark them processing and store their results through a second
+engine, the way a worker process does. Both share a temporary SQLite database,
+or DATABASE_URL if it is set, configured by the DATABASE_* and SQLITE_*
+settings, so runs with different journal modes can be compared. The report is
+printed as JSON.
+
+Usage:
+    python -m benchmarks.db_writes --jobs 2000 --writers 16
+    SQLITE_JOURNAL_MODE=DELETE SQLITE_SYNCHRONOUS=FULL python -m benchmarks.db_writes
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+from benchmarks.e2e import percentiles
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=1000, help="Jobs to insert and complete")
+    parser.add_argument("--writers", type=int, default=8, help="Concurrent submitters, and concurrent updaters")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+async def run_writes(args: argparse.Namespace) -> Dict:
+    """Insert and complete jobs concurrently through separate web and worker engines."""
+    from app.config import settings
+    from app.database import create_engine, create_session_factory, init_db
+    from app.enums import JobStatus
+    from app.services.job_manager import JobManager
+    
+    await init_db()
+    web_engine, worker_engine = create_engine(), create_engine()
+    web_sessions = create_session_factory(web_engine)
+    worker_sessions = create_session_factory(worker_engine)
+    
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    job_numbers = iter(range(args.jobs))
+    queued: asyncio.Queue = asyncio.Queue()
+    completed = 0
+    
+    async def timed(operation: str, session_factory, write) -> object:
+        started = time.perf_counter()
+        try:
+            async with session_factory() as session:
+                return await write(JobManager(session))
+        except Exception as exc:
+            errors[f"{operation} {type(exc).__name__}"] += 1
+            return None
+        finally:
+            latencies[operation].append(time.perf_counter() - started)
+    
+    async def submitter() -> None:
+        for number in job_numbers:
+            job = await timed("create", web_sessions, lambda jobs: jobs.create_job(f"bench-{number}.png", ".png"))
+            await queued.put(job.id if job is not None else None)
+    
+    async def updater() -> None:
+        nonlocal completed
+        while True:
+            job_id = await queued.get()
+            if job_id is None:
+                # Count the failed insert so the run still ends
+                completed += 1
+            else:
+                await timed("processing", worker_sessions, lambda jobs: jobs.update_job_status(job_id, JobStatus.PROCESSING))
+                await timed("result", worker_sessions, lambda jobs: jobs.update_job_result(job_id, "A benchmark image", "bench"))
+                completed += 1
+            if completed >= args.jobs:
+                return
+    
+    started = time.perf_counter()
+    updaters = [asyncio.create_task(updater()) for _ in range(args.writers)]
+    await asyncio.gather(*(submitter() for _ in range(args.writers)))
+    await asyncio.wait(updaters, return_when=asyncio.FIRST_COMPLETED)
+    for task in updaters:
+        task.cancel()
+    elapsed = time.perf_counter() - started
+    
+    await web_engine.dispose()
+    await worker_engine.dispose()
+    
+    writes = sum(len(values) for values in latencies.values())
+    return {
+        "config": {
+            "jobs": args.jobs,
+            "writers": args.writers,
+            "database_url": settings.DATABASE_URL,
+            "journal_mode": settings.SQLITE_JOURNAL_MODE,
+            "synchronous": settings.SQLITE_SYNCHRONOUS,
+            "busy_timeout_ms": settings.SQLITE_BUSY_TIMEOUT_MS,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "writes_per_second": round(writes / elapsed, 2),
+        "jobs_per_second": round(args.jobs / elapsed, 2),
+        "latency": {operation: percentiles(values) for operation, values in latencies.items()},
+        "errors": dict(errors),
+    }
+
+def main() -> None:
+    """Run the benchmark and report the results."""
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="image-service-db-bench-") as work_dir:
+        os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(work_dir, 'bench.db')}")
+        report = asyncio.run(run_writes(args))
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
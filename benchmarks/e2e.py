@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+End-to-end load benchmark for submit -> process -> result.
+
+Boots the FastAPI app in-process against a temporary SQLite database, with an
+in-process async mode Celery worker on the in-memory transport and the stub
+describer. Concurrent clients submit images, poll their status until done
+and fetch the result. Latency percentiles, throughput and peak RSS are printed
+as JSON.
+
+Usage:
+    python -m benchmarks.e2e --clients 16 --jobs 400 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import struct
+import sys
+import tempfile
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, List
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent clients")
+    parser.add_argument("--jobs", type=int, default=200, help="Total jobs to submit")
+    parser.add_argument("--image-size", type=int, default=64 * 1024, help="Bytes per uploaded image")
+    parser.add_argument("--poll-interval", type=float, default=0.02, help="Seconds between status polls")
+    parser.add_argument("--describer-latency-ms", type=int, default=20, help="Stub describer latency per call")
+    parser.add_argument("--worker-concurrency", type=int, default=16, help="Jobs in flight in the worker")
+    parser.add_argument("--batch-size", type=int, default=1, help="DESCRIBE_BATCH_MAX_SIZE for the worker")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+def configure_environment(args: argparse.Namespace, work_dir: str) -> None:
+    """Point the service settings at throwaway, in-process infrastructure before it is imported."""
+    os.environ.update({
+        "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(work_dir, 'bench.db')}",
+        "UPLOAD_DIR": os.path.join(work_dir, "images"),
+        "CELERY_BROKER_URL": "memory://",
+        "CELERY_RESULT_BACKEND": "cache+memory://",
+        "JOB_EVENTS_BACKEND": "memory",
+        "DESCRIBER_BACKEND": "stub",
+        "DESCRIBER_STUB_LATENCY_MS": str(args.describer_latency_ms),
+        "WORKER_MODE": "async",
+        "WORKER_ASYNC_CONCURRENCY": str(args.worker_concurrency),
+        "DESCRIBE_BATCH_MAX_SIZE": str(args.batch_size),
+        "DEDUP_ENABLED": "false",
+    })
+
+def make_png(index: int, size: int) -> bytes:
+    """Build a valid PNG of roughly `size` bytes whose content is unique to `index`."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 0, 0, 0, 0)
+    pixels = zlib.compress(b"\x00\x00")
+    padding = f"{index}:".encode().ljust(max(size - 80, 8), b"x")
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", header)
+        + chunk(b"tEXt", b"bench\x00" + padding)
+        + chunk(b"IDAT", pixels)
+        + chunk(b"IEND", b"")
+    )
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """Summarize latencies in milliseconds with nearest-rank percentiles."""
+    if not values:
+        return {"count": 0}
+    ordered = sorted(values)
+    
+    def rank(q: float) -> float:
+        index = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+        return round(ordered[index] * 1000, 3)
+    
+    return {
+        "count": len(ordered),
+        "p50_ms": rank(0.50),
+        "p95_ms": rank(0.95),
+        "p99_ms": rank(0.99),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+async def run_clients(args: argparse.Namespace) -> Dict:
+    """Drive concurrent clients through submit, status and result."""
+    import httpx
+    from app.main import app
+    from app.database import init_db
+    
+    await init_db()
+    
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    job_latencies: List[float] = []
+    errors: Dict[str, int] = defaultdict(int)
+    job_numbers = iter(range(args.jobs))
+    
+    async def timed(client: httpx.AsyncClient, route: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        latencies[route].append(time.perf_counter() - started)
+        if response.status_code != 200:
+            errors[f"{route} {response.status_code}"] += 1
+        return response
+    
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        for number in job_numbers:
+            submitted = time.perf_counter()
+            image = make_png(number, args.image_size)
+            response = await timed(
+                client, "submit", "POST", "/api/v1/submit",
+                files={"file": (f"bench-{number}.png", image, "image/png")}
+            )
+            if response.status_code != 200:
+                continue
+            job_id = response.json()["job_id"]
+            
+            while True:
+                response = await timed(client, "status", "GET", f"/api/v1/status/{job_id}")
+                status = response.json().get("status")
+                if status in ("done", "failed") or response.status_code != 200:
+                    break
+                await asyncio.sleep(args.poll_interval)
+            
+            if status == "done":
+                await timed(client, "result", "GET", f"/api/v1/result/{job_id}")
+                job_latencies.append(time.perf_counter() - submitted)
+            else:
+                errors[f"job {status}"] += 1
+    
+    started = time.perf_counter()
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=60) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(args.clients)))
+    elapsed = time.perf_counter() - started
+    
+    total_requests = sum(len(values) for values in latencies.values())
+    return {
+        "config": {
+            "clients": args.clients,
+            "jobs": args.jobs,
+            "image_size": args.image_size,
+            "describer_latency_ms": args.describer_latency_ms,
+            "worker_concurrency": args.worker_concurrency,
+            "batch_size": args.batch_size,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "requests_per_second": round(total_requests / elapsed, 2),
+        "jobs_per_second": round(len(job_latencies) / elapsed, 2),
+        "latency": {route: percentiles(values) for route, values in latencies.items()},
+        "job_latency": percentiles(job_latencies),
+        "errors": dict(errors),
+        # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1
+        ),
+    }
+
+def main() -> None:
+    """Run the benchmark and report the results."""
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="image-service-bench-") as work_dir:
+        configure_environment(args, work_dir)
+        
+        from app.tasks import celery_app
+        from app.worker_runtime import runtime
+        
+        from celery.contrib.testing.worker import start_worker
+        
+        # Eager tasks would run inside the submit request and block the web
+        # event loop, so the worker always consumes from the in-memory broker
+        with start_worker(
+            celery_app,
+            pool="threads",
+            concurrency=args.worker_concurrency,
+            perform_ping_check=False,
+            loglevel="WARNING"
+        ):
+            report = asyncio.run(run_clients(args))
+        runtime.stop()
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Event loop lag benchmark under concurrent uploads.
+
+Boots the FastAPI app in-process against a temporary SQLite database and
+the in-memory Celery transport, then has concurrent clients submit images
+while a probe measures how late the event loop wakes it up. The run is
+repeated for each blocking I/O executor size, where 0 makes the file and
+libmagic calls on the event loop as before the executor existed. Lag and
+submit latency percentiles per size are printed as JSON.
+
+Usage:
+    python -m benchmarks.loop_lag --clients 32 --uploads 500 --io-workers 0 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+from benchmarks.e2e import make_png, percentiles
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent uploading clients")
+    parser.add_argument("--uploads", type=int, default=200, help="Uploads per run")
+    parser.add_argument("--image-size", type=int, default=1024 * 1024, help="Bytes per uploaded image")
+    parser.add_argument(
+        "--io-workers", type=int, nargs="+", default=[0, 8],
+        help="BLOCKING_IO_WORKERS values to compare, 0 runs blocking calls on the event loop"
+    )
+    parser.add_argument("--probe-interval-ms", type=float, default=5.0, help="Sleep of the lag probe")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args()
+
+def configure_environment(work_dir: str) -> None:
+    """Point the service settings at throwaway, in-process infrastructure before it is imported."""
+    os.environ.update({
+        "DATABASE_URL": f"sqlite+aiosqlite:///{os.path.join(work_dir, 'bench.db')}",
+        "UPLOAD_DIR": os.path.join(work_dir, "images"),
+        "CELERY_BROKER_URL": "memory://",
+        "CELERY_RESULT_BACKEND": "cache+memory://",
+        "JOB_EVENTS_BACKEND": "memory",
+        "DESCRIBER_BACKEND": "stub",
+        "DEDUP_ENABLED": "false",
+        # Nothing consumes the queue, so the backlog only grows
+        "ADMISSION_MAX_OUTSTANDING_JOBS": "0",
+    })
+
+async def run_uploads(args: argparse.Namespace, io_workers: int) -> Dict:
+    """Upload images concurrently while probing the event loop lag."""
+    import httpx
+    from app.main import app
+    from app.services.blocking_io import blocking_io
+    
+    blocking_io.shutdown()
+    blocking_io.max_workers = io_workers
+    
+    latencies: List[float] = []
+    lags: List[float] = []
+    errors: Dict[str, int] = defaultdict(int)
+    upload_numbers = iter(range(args.uploads))
+    interval = args.probe_interval_ms / 1000
+    
+    async def probe() -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(max(0.0, time.perf_counter() - started - interval))
+    
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        for number in upload_numbers:
+            image = make_png(number, args.image_size)
+            started = time.perf_counter()
+            response = await client.post(
+                "/api/v1/submit", files={"file": (f"bench-{number}.png", image, "image/png")}
+            )
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                errors[f"submit {response.status_code}"] += 1
+    
+    probe_task = asyncio.create_task(probe())
+    started = time.perf_counter()
+    async with httpx.AsyncClient(app=app, base_url="http://bench", timeout=60) as client:
+        await asyncio.gather(*(client_loop(client) for _ in range(args.clients)))
+    elapsed = time.perf_counter() - started
+    probe_task.cancel()
+    blocking_io.shutdown()
+    
+    return {
+        "io_workers": io_workers,
+        "elapsed_s": round(elapsed, 3),
+        "uploads_per_second": round(args.uploads / elapsed, 2),
+        "loop_lag": percentiles(lags),
+        "submit_latency": percentiles(latencies),
+        "errors": dict(errors),
+    }
+
+async def run_benchmark(args: argparse.Namespace) -> Dict:
+    """Run the uploads once per executor size."""
+    from app.database import init_db
+    
+    await init_db()
+    runs = [await run_uploads(args, io_workers) for io_workers in args.io_workers]
+    return {
+        "config": {
+            "clients": args.clients,
+            "uploads": args.uploads,
+            "image_size": args.image_size,
+            "probe_interval_ms": args.probe_interval_ms,
+        },
+        "runs": runs,
+    }
+
+def main() -> None:
+    """Run the benchmark and report the results."""
+    args = parse_args()
+    with tempfile.TemporaryDirectory(prefix="image-service-lag-bench-") as work_dir:
+        configure_environment(work_dir)
+        report = asyncio.run(run_benchmark(args))
+    
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -31,6 +31,7 @@ async def test_celery_integration():
         
         # Now create the test image file with the correct filename
         test_image_path = data_dir / job.image_path
+        test_image_path.parent.mkdir(parents=True, exist_ok=True)
         with open(test_image_path, "wb") as temp_file:
             # Write some dummy image data (minimal JPEG header)
             temp_file.write(b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x01\x00H\x00H\x00\x00\xff\xdb\x00C\x00\x08\x06\x06\x07\x06\x05\x08\x07\x07\x07\t\t\x08\n\x0c\x14\r\x0c\x0b\x0b\x0c\x19\x12\x13\x0f\x14\x1d\x1a\x1f\x1e\x1d\x1a\x1c\x1c $.\' ",#\x1c\x1c(7),01444\x1f\'9=82<.342\xff\xc0\x00\x11\x08\x00\x01\x00\x01\x01\x01\x11\x00\x02\x11\x01\x03\x11\x01\xff\xc4\x00\x14\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x08\xff\xc4\x00\x14\x10\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\xff\xda\x00\x0c\x03\x01\x00\x02\x11\x03\x11\x00\x3f\x00\xaa\xff\xd9')
@@ -63,4 +64,7 @@ async def test_celery_integration():
         finally:
             # Clean up the test file
             if test_image_path.exists():
-                test_image_path.unlink() 
\ No newline at end of file
+                test_image_path.unlink()
+            preprocessed_path = Path(image_processor.preprocessor.artifact_path(str(test_image_path)))
+            if preprocessed_path.exists():
+                preprocessed_path.unlink() 
\ No newline at end of file
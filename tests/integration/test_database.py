@@ -1,7 +1,17 @@
 import pytest
-from app.database import init_db, AsyncSessionLocal
+from unittest.mock import MagicMock
+from sqlalchemy.dialects import postgresql
+from app.config import settings
+from app.database import (
+    init_db,
+    AsyncSessionLocal,
+    create_engine,
+    create_session_factory,
+    sqlite_pragmas,
+    _add_missing_enum_values
+)
 from app.models import Job
-from app.enums import JobStatus
+from app.enums import JobStatus, JobPriority
 
 @pytest.mark.asyncio
 async def test_database_connection() -> None:
@@ -18,7 +28,8 @@ async def test_job_model() -> None:
         job = Job(
             image_path="/test/path/image.jpg",
             file_extension=".jpg",
-            status=JobStatus.QUEUED
+            status=JobStatus.QUEUED,
+            generated_by="mock"
         )
         session.add(job)
         await session.commit()
@@ -27,4 +38,75 @@ async def test_job_model() -> None:
         assert job.id is not None
         assert job.status == JobStatus.QUEUED
         assert job.image_path == "/test/path/image.jpg"
-        assert job.file_extension == ".jpg" 
\ No newline at end of file
+        assert job.file_extension == ".jpg" 
+
+@pytest.mark.asyncio
+async def test_sqlite_pragmas_applied_on_connect(tmp_path) -> None:
+    """Test that new SQLite connections use WAL mode and the configured pragmas."""
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path / 'pragmas.db'}")
+    try:
+        async with engine.connect() as conn:
+            journal_mode = (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar()
+            synchronous = (await conn.exec_driver_sql("PRAGMA synchronous")).scalar()
+            busy_timeout = (await conn.exec_driver_sql("PRAGMA busy_timeout")).scalar()
+        
+        assert journal_mode == "wal"
+        assert synchronous == 1  # NORMAL
+        assert busy_timeout == settings.SQLITE_BUSY_TIMEOUT_MS
+    finally:
+        await engine.dispose()
+
+def test_sqlite_pragmas_reject_unknown_journal_mode(monkeypatch) -> None:
+    """Test that an unknown journal mode is rejected instead of interpolated into a pragma."""
+    monkeypatch.setattr(settings, "SQLITE_JOURNAL_MODE", "WAL; DROP TABLE jobs")
+    
+    with pytest.raises(ValueError):
+        sqlite_pragmas()
+
+@pytest.mark.asyncio
+async def test_init_db_migrates_database_of_earlier_version(tmp_path) -> None:
+    """Test that columns added since a database was created are added, with their defaults, before the indexes."""
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+    try:
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql(
+                "CREATE TABLE jobs (id VARCHAR(36) PRIMARY KEY, status VARCHAR(10) NOT NULL, "
+                "image_path VARCHAR(500) NOT NULL, file_extension VARCHAR(10) NOT NULL, image_description TEXT, "
+                "generated_by VARCHAR(100) NOT NULL, created_at DATETIME, updated_at DATETIME)"
+            )
+            await conn.exec_driver_sql(
+                "INSERT INTO jobs (id, status, image_path, file_extension, generated_by) "
+                "VALUES ('old-job', 'DONE', 'old.jpg', '.jpg', 'vision-node-gpt')"
+            )
+        
+        await init_db(engine)
+        
+        async with create_session_factory(engine)() as session:
+            job = await session.get(Job, "old-job")
+            assert job.status == JobStatus.DONE
+            assert job.priority == JobPriority.INTERACTIVE
+            assert job.tenant_id == "anonymous"
+            assert job.attempts == 0
+            assert job.content_hash is None
+            assert job.dead_lettered_at is None
+        async with engine.connect() as conn:
+            indexes = (await conn.exec_driver_sql("PRAGMA index_list(jobs)")).all()
+        assert "ix_jobs_dead_lettered_at" in {index[1] for index in indexes}
+    finally:
+        await engine.dispose()
+
+
+def test_missing_enum_types_and_values_are_added_on_postgresql(mocker) -> None:
+    """Test that enum types added since are created, and values added since appended, on PostgreSQL."""
+    sync_conn = MagicMock()
+    sync_conn.dialect = postgresql.dialect()
+    inspector = mocker.patch("app.database.inspect").return_value
+    inspector.get_enums.return_value = [
+        {"name": "jobstatus", "labels": ["QUEUED", "PROCESSING", "DONE", "FAILED"]}
+    ]
+    
+    _add_missing_enum_values(sync_conn)
+    
+    sync_conn.exec_driver_sql.assert_called_once_with("ALTER TYPE jobstatus ADD VALUE IF NOT EXISTS 'RETRYING'")
+    created = [call.args[0].element.name for call in sync_conn.execute.call_args_list]
+    assert created == ["jobpriority"]
\ No newline at end of file
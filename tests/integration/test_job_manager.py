@@ -1,7 +1,11 @@
 import pytest
+import uuid
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import update
 from app.services.job_manager import JobManager
 from app.database import AsyncSessionLocal, init_db
-from app.enums import JobStatus
+from app.enums import JobStatus, JobPriority
+from app.models import Job
 
 @pytest.mark.asyncio
 async def test_create_job() -> None:
@@ -50,4 +54,368 @@ async def test_update_job_result() -> None:
         
         updated_job = await job_manager.update_job_result(job.id, "A beautiful landscape")
         assert updated_job.status == JobStatus.DONE
-        assert updated_job.image_description == "A beautiful landscape" 
\ No newline at end of file
+        assert updated_job.image_description == "A beautiful landscape"
+
+@pytest.mark.asyncio
+async def test_find_job_by_content_hash() -> None:
+    """Test that a completed job is preferred when looking up identical content."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        content_hash = uuid.uuid4().hex
+        in_flight_job = await job_manager.create_job("test_image.jpg", ".jpg", content_hash)
+        
+        found_job = await job_manager.find_job_by_content_hash(content_hash)
+        assert found_job.id == in_flight_job.id
+        
+        done_job = await job_manager.create_job("test_image.jpg", ".jpg", content_hash)
+        await job_manager.update_job_result(done_job.id, "A beautiful landscape")
+        
+        found_job = await job_manager.find_job_by_content_hash(content_hash)
+        assert found_job.id == done_job.id
+        
+        assert await job_manager.find_job_by_content_hash(uuid.uuid4().hex) is None
+
+@pytest.mark.asyncio
+async def test_find_job_by_content_hash_is_scoped_to_tenant_and_priority() -> None:
+    """Test that jobs of other tenants are never reused, nor in-flight jobs of another priority."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        content_hash = uuid.uuid4().hex
+        bulk_job = await job_manager.create_job("test_image.jpg", ".jpg", content_hash, "acme", JobPriority.BULK)
+        
+        assert await job_manager.find_job_by_content_hash(content_hash, "acme", JobPriority.INTERACTIVE) is None
+        assert await job_manager.find_jobs_by_content_hashes([content_hash], "acme", JobPriority.INTERACTIVE) == {}
+        assert (await job_manager.find_job_by_content_hash(content_hash, "acme", JobPriority.BULK)).id == bulk_job.id
+        
+        # A completed job serves every priority of its tenant, and no other tenant
+        await job_manager.update_job_result(bulk_job.id, "A beautiful landscape")
+        assert (await job_manager.find_job_by_content_hash(content_hash, "acme", JobPriority.INTERACTIVE)).id == bulk_job.id
+        assert await job_manager.find_job_by_content_hash(content_hash, "globex", JobPriority.BULK) is None
+        assert await job_manager.find_jobs_by_content_hashes([content_hash], "globex", JobPriority.BULK) == {}
+
+@pytest.mark.asyncio
+async def test_create_jobs() -> None:
+    """Test bulk inserting jobs and looking them up by content hash."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        content_hashes = [uuid.uuid4().hex, uuid.uuid4().hex]
+        jobs = [job_manager.build_job(".jpg", content_hash) for content_hash in content_hashes]
+        
+        created_jobs = await job_manager.create_jobs(jobs)
+        
+        assert [job.id for job in created_jobs] == [job.id for job in jobs]
+        assert all(job.created_at is not None for job in created_jobs)
+        
+        found_jobs = await job_manager.find_jobs_by_content_hashes(content_hashes)
+        assert {content_hash: job.id for content_hash, job in found_jobs.items()} == {
+            job.content_hash: job.id for job in jobs
+        }
+
+@pytest.mark.asyncio
+async def test_get_job_statuses_and_results() -> None:
+    """Test looking up several jobs with a single query."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        queued_job = await job_manager.create_job("test_image.jpg", ".jpg")
+        done_job = await job_manager.create_job("test_image.jpg", ".jpg")
+        await job_manager.update_job_result(done_job.id, "A beautiful landscape")
+        
+        statuses = await job_manager.get_job_statuses([queued_job.id, done_job.id, "missing"])
+        assert set(statuses) == {queued_job.id, done_job.id}
+        assert statuses[queued_job.id].status == JobStatus.QUEUED
+        
+        results = await job_manager.get_job_results([done_job.id])
+        assert results[done_job.id].image_description == "A beautiful landscape"
+
+@pytest.mark.asyncio
+async def test_update_job_results() -> None:
+    """Test storing the results of a batch of jobs."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        first_job = await job_manager.create_job("test_image.jpg", ".jpg")
+        second_job = await job_manager.create_job("test_image.jpg", ".jpg")
+        reaped_job = await job_manager.create_job("test_image.jpg", ".jpg")
+        for job in (first_job, second_job, reaped_job):
+            await job_manager.claim_job(job.id)
+        await job_manager.fail_job(reaped_job.id, "Worker lost")
+        
+        completed_jobs = await job_manager.update_job_results(
+            {first_job.id: "A landscape", second_job.id: "A portrait", reaped_job.id: "A late result"}, "stub"
+        )
+        
+        assert {job.id for job in completed_jobs} == {first_job.id, second_job.id}
+        results = await job_manager.get_job_results([first_job.id, second_job.id, reaped_job.id])
+        assert results[first_job.id].status == JobStatus.DONE
+        assert results[first_job.id].image_description == "A landscape"
+        assert results[second_job.id].image_description == "A portrait"
+        assert results[second_job.id].generated_by == "stub"
+        # A job that stopped processing keeps its status
+        assert results[reaped_job.id].status == JobStatus.FAILED
+        assert results[reaped_job.id].image_description is None
+
+@pytest.mark.asyncio
+async def test_job_transitions_compare_and_set() -> None:
+    """Test that each transition applies once and never overwrites a finished job."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        job = await job_manager.create_job("test_image.jpg", ".jpg")
+        assert job.created_at is not None
+        
+        claimed_job = await job_manager.claim_job(job.id)
+        assert claimed_job.status == JobStatus.PROCESSING
+        # A duplicate delivery cannot claim the job again
+        assert await job_manager.claim_job(job.id) is None
+        
+        completed_job = await job_manager.complete_job(job.id, "A landscape", "stub")
+        assert completed_job.status == JobStatus.DONE
+        assert completed_job.image_description == "A landscape"
+        assert completed_job.updated_at is not None
+        # A late failure does not overwrite the result
+        assert await job_manager.fail_job(job.id) is None
+        assert await job_manager.complete_job(job.id, "Another landscape", "stub") is None
+        
+        stored_job = await job_manager.get_job(job.id)
+        assert stored_job.status == JobStatus.DONE
+        assert stored_job.image_description == "A landscape"
+
+@pytest.mark.asyncio
+async def test_retrying_job_can_be_claimed_by_retry() -> None:
+    """Test that a retry claims a job its previous attempt failed, and that a failed job stays failed."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        job = await job_manager.create_job("test_image.jpg", ".jpg")
+        await job_manager.claim_job(job.id)
+        
+        retrying_job = await job_manager.retry_job(job.id, "TimeoutError: describer timed out")
+        assert retrying_job.status == JobStatus.RETRYING
+        assert retrying_job.last_error == "TimeoutError: describer timed out"
+        assert (await job_manager.claim_job(job.id)).status == JobStatus.PROCESSING
+        
+        failed_job = await job_manager.fail_job(job.id, "TimeoutError: describer timed out")
+        assert failed_job.status == JobStatus.FAILED
+        assert failed_job.dead_lettered_at is not None
+        assert await job_manager.claim_job(job.id) is None
+
+@pytest.mark.asyncio
+async def test_dead_letters_can_be_listed_and_replayed() -> None:
+    """Test that failed jobs are listed newest first and replayed once."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        jobs = [await job_manager.create_job("test_image.jpg", ".jpg") for _ in range(3)]
+        for job in jobs:
+            await job_manager.fail_job(job.id, "FileNotFoundError: gone")
+        
+        listed = await job_manager.list_dead_letters(2)
+        assert [row.id for row in listed] == [jobs[2].id, jobs[1].id]
+        assert listed[0].last_error == "FileNotFoundError: gone"
+        following = await job_manager.list_dead_letters(2, after=(listed[-1].dead_lettered_at, listed[-1].id))
+        assert following[0].id == jobs[0].id
+        
+        replayed = await job_manager.replay_jobs([jobs[0].id, jobs[1].id, "missing"])
+        assert {row.id for row in replayed} == {jobs[0].id, jobs[1].id}
+        assert await job_manager.replay_jobs([jobs[0].id]) == []
+        replayed_job = await job_manager.get_job(jobs[0].id)
+        assert replayed_job.status == JobStatus.QUEUED
+        assert replayed_job.dead_lettered_at is None
+        assert replayed_job.attempts == 0
+        assert replayed_job.last_error is None
+
+@pytest.mark.asyncio
+async def test_replayed_job_survives_a_lease_expiry() -> None:
+    """Test that a job dead-lettered by the reaper is requeued, not failed, when its lease expires after replay."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        job = await job_manager.create_job("test_image.jpg", ".jpg")
+        later = datetime.now(timezone.utc) + timedelta(minutes=5)
+        await job_manager.claim_job(job.id, lease_seconds=60)
+        await job_manager.requeue_stale_jobs(later, 2, 10000)
+        await job_manager.claim_job(job.id, lease_seconds=60)
+        assert job.id in await job_manager.fail_stale_jobs(later, 2, 10000)
+        
+        assert [row.id for row in await job_manager.replay_jobs([job.id])] == [job.id]
+        await job_manager.claim_job(job.id, lease_seconds=60)
+        
+        assert job.id not in await job_manager.fail_stale_jobs(later, 2, 10000)
+        assert job.id in [row.id for row in await job_manager.requeue_stale_jobs(later, 2, 10000)]
+
+@pytest.mark.asyncio
+async def test_stage_timings_are_recorded() -> None:
+    """Test that every stage of a retried job is timestamped, keeping the first pickup and counting attempts."""
+    await init_db()
+    accepted_at = datetime.now(timezone.utc) - timedelta(seconds=3)
+    stored_at = accepted_at + timedelta(milliseconds=250)
+    enqueued_at = stored_at + timedelta(milliseconds=10)
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        job = await job_manager.create_job("test_image.jpg", ".jpg", accepted_at=accepted_at, stored_at=stored_at)
+        first_claim = await job_manager.claim_job(job.id, enqueued_at)
+        await job_manager.retry_job(job.id)
+        second_claim = await job_manager.claim_job(job.id, enqueued_at + timedelta(seconds=1))
+        describer_started_at = datetime.now(timezone.utc)
+        await job_manager.complete_job(
+            job.id, "A landscape", "stub", describer_started_at, describer_started_at + timedelta(milliseconds=40)
+        )
+        
+        stored_job = await job_manager.get_job(job.id)
+        assert stored_job.attempts == 2
+        assert second_claim.picked_up_at == first_claim.picked_up_at
+        # Sub-second precision is kept
+        assert stored_job.accepted_at == accepted_at.replace(tzinfo=None)
+        assert stored_job.stored_at == stored_at.replace(tzinfo=None)
+        assert stored_job.enqueued_at == enqueued_at.replace(tzinfo=None)
+        assert stored_job.describer_finished_at - stored_job.describer_started_at == timedelta(milliseconds=40)
+        assert stored_job.completed_at >= stored_job.picked_up_at >= stored_job.enqueued_at
+
+@pytest.mark.asyncio
+async def test_list_jobs_keyset_pagination() -> None:
+    """Test that paging through jobs returns each one once, newest first."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        jobs = await job_manager.create_jobs([job_manager.build_job(".jpg") for _ in range(5)])
+        for job in jobs:
+            await job_manager.update_job_status(job.id, JobStatus.FAILED)
+        
+        listed, after = [], None
+        while True:
+            page = await job_manager.list_jobs(2, status=JobStatus.FAILED, after=after)
+            if not page:
+                break
+            listed.extend(page)
+            after = (page[-1].created_at, page[-1].id)
+        
+        listed_ids = [row.id for row in listed]
+        assert len(listed_ids) == len(set(listed_ids))
+        assert {job.id for job in jobs} <= set(listed_ids)
+        assert all(row.status == JobStatus.FAILED for row in listed)
+        keys = [(row.created_at, row.id) for row in listed]
+        assert keys == sorted(keys, reverse=True)
+
+@pytest.mark.asyncio
+async def test_count_outstanding_jobs() -> None:
+    """Test that queued and processing jobs are outstanding and finished ones are not."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        before = await job_manager.count_outstanding_jobs()
+        queued = await job_manager.create_job("test_image.jpg", ".jpg")
+        processing = await job_manager.create_job("test_image.jpg", ".jpg")
+        done = await job_manager.create_job("test_image.jpg", ".jpg")
+        await job_manager.claim_job(processing.id)
+        await job_manager.update_job_result(done.id, "A description")
+        
+        assert await job_manager.count_outstanding_jobs() == before + 2
+
+@pytest.mark.asyncio
+async def test_count_jobs_by_status() -> None:
+    """Test that every status is counted, including those with no jobs."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        before = await job_manager.count_jobs_by_status()
+        await job_manager.create_job("test_image.jpg", ".jpg")
+        after = await job_manager.count_jobs_by_status()
+        
+        assert set(after) == set(JobStatus)
+        assert after[JobStatus.QUEUED] == before[JobStatus.QUEUED] + 1
+
+@pytest.mark.asyncio
+async def test_retention_queries() -> None:
+    """Test that an image expires only with all its jobs and a row only after its image."""
+    await init_db()
+    long_ago = datetime(2001, 1, 1, tzinfo=timezone.utc)
+    cutoff = datetime(2001, 6, 1, tzinfo=timezone.utc)
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        done = job_manager.build_job(".jpg")
+        shared_done = job_manager.build_job(".jpg")
+        shared_queued = job_manager.build_job(".jpg")
+        shared_queued.image_path = shared_done.image_path
+        failed = job_manager.build_job(".jpg")
+        await job_manager.create_jobs([done, shared_done, shared_queued, failed])
+        for job, status in ((done, JobStatus.DONE), (shared_done, JobStatus.DONE), (failed, JobStatus.FAILED)):
+            await session.execute(
+                update(Job).where(Job.id == job.id).values(status=status, created_at=long_ago, updated_at=long_ago)
+            )
+        await session.commit()
+        
+        expired = await job_manager.find_expired_images(cutoff, None, 10000)
+        assert done.image_path in expired
+        assert shared_done.image_path not in expired
+        assert failed.image_path not in expired
+        assert failed.image_path in await job_manager.find_expired_images(None, cutoff, 10000)
+        assert await job_manager.find_expired_images(None, None, 10000) == []
+        
+        # Rows only expire once their image is deleted
+        expired_ids = [job.id for job in await job_manager.find_expired_jobs(cutoff, cutoff, 10000)]
+        assert done.id not in expired_ids
+        assert await job_manager.mark_images_deleted([done.image_path], datetime.now(timezone.utc)) == 1
+        expired_ids = [job.id for job in await job_manager.find_expired_jobs(cutoff, cutoff, 10000)]
+        assert done.id in expired_ids
+        assert failed.id not in expired_ids
+        
+        assert await job_manager.delete_jobs([done.id]) == 1
+        assert await job_manager.get_job(done.id) is None
+
+@pytest.mark.asyncio
+async def test_stale_jobs_are_requeued_then_failed() -> None:
+    """Test that a job whose lease expired is requeued once, and failed after its last attempt."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        job = await job_manager.create_job("test_image.jpg", ".jpg")
+        claimed_job = await job_manager.claim_job(job.id, lease_seconds=60)
+        assert claimed_job.lease_expires_at is not None
+        assert await job_manager.renew_lease(job.id, 60)
+        
+        # Still leased, so nothing to reap yet
+        now = datetime.now(timezone.utc)
+        assert job.id not in [row.id for row in await job_manager.requeue_stale_jobs(now, 2, 10000)]
+        
+        later = now + timedelta(minutes=5)
+        requeued = await job_manager.requeue_stale_jobs(later, 2, 10000)
+        assert job.id in [row.id for row in requeued]
+        assert job.id not in [row.id for row in await job_manager.requeue_stale_jobs(later, 2, 10000)]
+        requeued_job = await job_manager.get_job(job.id)
+        assert requeued_job.status == JobStatus.QUEUED
+        assert requeued_job.last_error == JobManager.LEASE_EXPIRED_ERROR
+        
+        # The second claim is the last attempt allowed
+        await job_manager.claim_job(job.id, lease_seconds=60)
+        assert job.id not in [row.id for row in await job_manager.requeue_stale_jobs(later, 2, 10000)]
+        assert job.id in await job_manager.fail_stale_jobs(later, 2, 10000)
+        failed_job = await job_manager.get_job(job.id)
+        assert failed_job.status == JobStatus.FAILED
+        assert failed_job.dead_lettered_at is not None
+        assert not await job_manager.renew_lease(job.id, 60)
+
+@pytest.mark.asyncio
+async def test_retrying_job_whose_retry_was_lost_is_requeued() -> None:
+    """Test that a retrying job is requeued once its deadline passes, keeping its error."""
+    await init_db()
+    async with AsyncSessionLocal() as session:
+        job_manager = JobManager(session)
+        job = await job_manager.create_job("test_image.jpg", ".jpg")
+        await job_manager.claim_job(job.id, lease_seconds=60)
+        retrying_job = await job_manager.retry_job(job.id, "TimeoutError: describer timed out", lease_seconds=90)
+        assert retrying_job.lease_expires_at is not None
+        
+        # Still waiting for its retry
+        now = datetime.now(timezone.utc)
+        assert job.id not in [row.id for row in await job_manager.requeue_stale_jobs(now, 2, 10000)]
+        
+        requeued = await job_manager.requeue_stale_jobs(now + timedelta(minutes=5), 2, 10000)
+        assert job.id in [row.id for row in requeued]
+        requeued_job = await job_manager.get_job(job.id)
+        assert requeued_job.status == JobStatus.QUEUED
+        assert requeued_job.last_error == "TimeoutError: describer timed out"
+        assert requeued_job.lease_expires_at is None
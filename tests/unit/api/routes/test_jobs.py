@@ -1,30 +1,58 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import AsyncMock, patch, MagicMock
+from unittest.mock import ANY, AsyncMock, patch, MagicMock
 from app.main import app
-from app.enums import JobStatus
+from app.enums import JobStatus, JobPriority
 from app.models import Job
-from datetime import datetime
+from app.services.job_events import JobEventBus
+from app.services.result_cache import ResultCache
+from app.services.admission import AdmissionController
+from datetime import datetime, timedelta
 
 @pytest.fixture
 def mock_job_manager():
     """Mock JobManager dependency."""
     manager = AsyncMock()
+    manager.find_job_by_content_hash.return_value = None
     return manager
 
 @pytest.fixture
 def mock_image_processor():
     """Mock ImageProcessor dependency."""
     processor = MagicMock()  # Use MagicMock for sync methods
-    processor.validate_uploaded_file = MagicMock()  # This is a sync method
+    processor.validate_uploaded_file = AsyncMock()
     processor.get_file_extension = MagicMock()  # This is a sync method
     processor.save_uploaded_file = AsyncMock()  # This is an async method
+    processor.stage_upload = AsyncMock()
+    processor.commit_upload = AsyncMock()
+    processor.discard_upload = AsyncMock()
     return processor
 
 @pytest.fixture
-def client(mock_job_manager, mock_image_processor):
+def event_bus():
+    """Create an in-process job event bus."""
+    return JobEventBus()
+
+@pytest.fixture
+def result_cache():
+    """Create an in-process result cache."""
+    return ResultCache(max_entries=100, ttl_seconds=60)
+
+@pytest.fixture
+def admission():
+    """Create an admission controller that admits every submission."""
+    return AdmissionController(max_outstanding=0)
+
+@pytest.fixture
+def client(mock_job_manager, mock_image_processor, event_bus, result_cache, admission):
     """Create a test client with mocked dependencies."""
-    from app.api.dependencies import get_job_manager, get_image_processor
+    from app.api.dependencies import (
+        get_job_manager,
+        get_image_processor,
+        get_job_event_bus,
+        get_result_cache,
+        get_admission_controller
+    )
     
     def override_get_job_manager():
         return mock_job_manager
@@ -32,8 +60,20 @@ def client(mock_job_manager, mock_image_processor):
     def override_get_image_processor():
         return mock_image_processor
     
+    def override_get_job_event_bus():
+        return event_bus
+    
+    def override_get_result_cache():
+        return result_cache
+    
+    def override_get_admission_controller():
+        return admission
+    
     app.dependency_overrides[get_job_manager] = override_get_job_manager
     app.dependency_overrides[get_image_processor] = override_get_image_processor
+    app.dependency_overrides[get_job_event_bus] = override_get_job_event_bus
+    app.dependency_overrides[get_result_cache] = override_get_result_cache
+    app.dependency_overrides[get_admission_controller] = override_get_admission_controller
     
     yield TestClient(app)
     
@@ -57,7 +97,7 @@ def test_submit_job_success(client: TestClient, mock_job_manager: AsyncMock, moc
     mock_job_manager.create_job.return_value = mock_job
     
     # Mock file saving
-    mock_image_processor.save_uploaded_file.return_value = "test_image.jpg"
+    mock_image_processor.commit_upload.return_value = "test_image.jpg"
     
     # Mock Celery task
     with patch('app.api.routes.jobs.process_image_task') as mock_task:
@@ -76,7 +116,99 @@ def test_submit_job_success(client: TestClient, mock_job_manager: AsyncMock, moc
     
     # Verify service calls - check that methods were called
     mock_job_manager.create_job.assert_called_once()
-    mock_image_processor.save_uploaded_file.assert_called_once()
+    mock_image_processor.stage_upload.assert_called_once()
+    mock_image_processor.commit_upload.assert_called_once()
+    mock_image_processor.discard_upload.assert_not_called()
+    
+    # Interactive by default, on the interactive queue
+    mock_task.apply_async.assert_called_once_with(
+        args=("test-job-id", "test_image.jpg"),
+        kwargs={"tenant_id": "anonymous", "priority": "interactive", "enqueued_at": ANY},
+        queue="interactive"
+    )
+
+def test_submit_job_with_tenant_and_bulk_priority(client: TestClient, mock_job_manager: AsyncMock, mock_image_processor: AsyncMock) -> None:
+    """Test that the tenant and priority of a submission are stored and select the task's queue."""
+    mock_image_processor.get_file_extension.return_value = '.jpg'
+    mock_job_manager.create_job.return_value = Job(
+        id="test-job-id",
+        image_path="test_image.jpg",
+        file_extension=".jpg",
+        status=JobStatus.QUEUED
+    )
+    
+    with patch('app.api.routes.jobs.process_image_task') as mock_task:
+        response = client.post(
+            "/api/v1/submit",
+            files={"file": ("test.jpg", b"fake image content", "image/jpeg")},
+            data={"priority": "bulk"},
+            headers={"X-Tenant-ID": "acme"}
+        )
+    
+    assert response.status_code == 200
+    args = mock_job_manager.create_job.call_args.args
+    assert args[3:5] == ("acme", JobPriority.BULK)
+    # Submission timings are stored with the job
+    accepted_at, stored_at = args[5:]
+    assert accepted_at <= stored_at
+    mock_task.apply_async.assert_called_once_with(
+        args=("test-job-id", "test_image.jpg"),
+        kwargs={"tenant_id": "acme", "priority": "bulk", "enqueued_at": ANY},
+        queue="bulk"
+    )
+
+def test_submit_job_refused_when_backlog_is_full(client: TestClient, mock_job_manager: AsyncMock, mock_image_processor: AsyncMock, admission: AdmissionController) -> None:
+    """Test that submissions are refused with Retry-After, before storing anything, once too many jobs are outstanding."""
+    admission.max_outstanding = 10
+    mock_job_manager.count_outstanding_jobs.return_value = 10
+    
+    response = client.post(
+        "/api/v1/submit",
+        files={"file": ("test.jpg", b"fake image content", "image/jpeg")}
+    )
+    
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(admission.retry_after_seconds)
+    mock_image_processor.stage_upload.assert_not_called()
+    mock_job_manager.create_job.assert_not_called()
+
+def test_submit_refused_over_tenant_rate(client: TestClient, mock_job_manager: AsyncMock, mock_image_processor: AsyncMock, admission: AdmissionController) -> None:
+    """Test that a tenant submitting faster than its rate is refused with 429, while other tenants are not."""
+    from fastapi import HTTPException
+    admission.tenant_rate = 0.5
+    admission.tenant_burst = 2
+    # Admitted submissions stop at validation, after taking their tokens
+    mock_image_processor.validate_uploaded_file.side_effect = HTTPException(
+        status_code=400, detail="File must be an image"
+    )
+    
+    def submit_batch(tenant_id: str):
+        return client.post(
+            "/api/v1/submit/batch",
+            files=[
+                ("files", ("first.txt", b"first", "text/plain")),
+                ("files", ("second.txt", b"second", "text/plain"))
+            ],
+            headers={"X-Tenant-ID": tenant_id}
+        )
+    
+    assert submit_batch("acme").status_code == 400
+    response = submit_batch("acme")
+    
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "4"
+    assert submit_batch("other").status_code == 400
+
+def test_submit_job_invalid_priority(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test that an unknown priority is rejected."""
+    response = client.post(
+        "/api/v1/submit",
+        files={"file": ("test.jpg", b"fake image content", "image/jpeg")},
+        data={"priority": "urgent"}
+    )
+    
+    assert response.status_code == 422
+    mock_job_manager.create_job.assert_not_called()
 
 def test_submit_job_invalid_file_type(client: TestClient, mock_job_manager: AsyncMock, mock_image_processor: AsyncMock) -> None:
     """Test job submission with invalid file type."""
@@ -114,6 +246,234 @@ def test_submit_job_file_too_large(client: TestClient, mock_job_manager: AsyncMo
     # Verify services were not called
     mock_job_manager.create_job.assert_not_called()
     mock_image_processor.save_uploaded_file.assert_not_called()
+    mock_image_processor.stage_upload.assert_not_called()
+
+def test_submit_job_discards_staged_upload_on_failure(client: TestClient, mock_job_manager: AsyncMock, mock_image_processor: AsyncMock) -> None:
+    """Test that the staged upload is removed when job creation fails."""
+    mock_image_processor.get_file_extension.return_value = '.jpg'
+    mock_job_manager.create_job.side_effect = RuntimeError("database unavailable")
+    
+    with patch('app.api.routes.jobs.process_image_task') as mock_task:
+        with pytest.raises(RuntimeError):
+            client.post(
+                "/api/v1/submit",
+                files={"file": ("test.jpg", b"fake image content", "image/jpeg")}
+            )
+    
+    mock_image_processor.discard_upload.assert_called_once()
+    mock_image_processor.commit_upload.assert_not_called()
+    mock_task.apply_async.assert_not_called()
+
+def test_submit_job_deletes_row_when_image_cannot_be_stored(client: TestClient, mock_job_manager: AsyncMock, mock_image_processor: AsyncMock) -> None:
+    """Test that no queued row is left behind for a job whose image failed to store."""
+    mock_image_processor.get_file_extension.return_value = '.jpg'
+    mock_job_manager.create_job.return_value = Job(id="test-job-id", image_path="test-job-id.jpg", status=JobStatus.QUEUED)
+    mock_image_processor.commit_upload.side_effect = OSError("storage unavailable")
+    
+    with patch('app.api.routes.jobs.process_image_task') as mock_task:
+        with pytest.raises(OSError):
+            client.post(
+                "/api/v1/submit",
+                files={"file": ("test.jpg", b"fake image content", "image/jpeg")}
+            )
+    
+    mock_job_manager.delete_jobs.assert_called_once_with(["test-job-id"])
+    mock_image_processor.discard_upload.assert_called_once()
+    mock_task.apply_async.assert_not_called()
+
+def test_submit_batch_deletes_rows_when_images_cannot_be_stored(client: TestClient, mock_job_manager: AsyncMock, mock_image_processor: AsyncMock) -> None:
+    """Test that the rows of a batch are deleted when its images failed to store."""
+    mock_image_processor.get_file_extension.return_value = '.jpg'
+    mock_image_processor.stage_upload.side_effect = [MagicMock(sha256="hash-1"), MagicMock(sha256="hash-2")]
+    mock_job_manager.find_jobs_by_content_hashes.return_value = {}
+    mock_job_manager.build_job = MagicMock(side_effect=[
+        Job(id="job-1", image_path="job-1.jpg", file_extension=".jpg", status=JobStatus.QUEUED),
+        Job(id="job-2", image_path="job-2.jpg", file_extension=".jpg", status=JobStatus.QUEUED)
+    ])
+    mock_image_processor.commit_upload.side_effect = [None, OSError("storage unavailable")]
+    
+    with patch('app.api.routes.jobs.group') as mock_group:
+        with pytest.raises(OSError):
+            client.post(
+                "/api/v1/submit/batch",
+                files=[
+                    ("files", ("first.jpg", b"first image", "image/jpeg")),
+                    ("files", ("second.jpg", b"second image", "image/jpeg"))
+                ]
+            )
+    
+    mock_job_manager.delete_jobs.assert_called_once_with(["job-1", "job-2"])
+    mock_group.return_value.apply_async.assert_not_called()
+
+def test_submit_job_duplicate_of_completed_job(client: TestClient, mock_job_manager: AsyncMock, mock_image_processor: AsyncMock) -> None:
+    """Test that a duplicate of a described image completes at once from the cache."""
+    cached_job = Job(
+        id="cached-job-id",
+        image_path="cached_image.jpg",
+        file_extension=".jpg",
+        status=JobStatus.DONE,
+        image_description="A beautiful landscape",
+        generated_by="vision-node-gpt"
+    )
+    mock_job_manager.find_job_by_content_hash.return_value = cached_job
+    mock_job_manager.create_cached_job.return_value = Job(
+        id="new-job-id",
+        image_path="cached_image.jpg",
+        file_extension=".jpg",
+        status=JobStatus.DONE
+    )
+    
+    with patch('app.api.routes.jobs.process_image_task') as mock_task:
+        response = client.post(
+            "/api/v1/submit",
+            files={"file": ("test.jpg", b"fake image content", "image/jpeg")}
+        )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["job_id"] == "new-job-id"
+    assert data["status"] == "done"
+    
+    mock_job_manager.find_job_by_content_hash.assert_called_once_with(ANY, "anonymous", JobPriority.INTERACTIVE)
+    mock_job_manager.create_cached_job.assert_called_once_with(cached_job, "anonymous", JobPriority.INTERACTIVE, ANY, ANY)
+    mock_job_manager.create_job.assert_not_called()
+    mock_image_processor.discard_upload.assert_called_once()
+    mock_image_processor.commit_upload.assert_not_called()
+    mock_task.apply_async.assert_not_called()
+
+def test_submit_job_duplicate_of_in_flight_job(client: TestClient, mock_job_manager: AsyncMock, mock_image_processor: AsyncMock) -> None:
+    """Test that a duplicate of an image still being processed attaches to that job."""
+    mock_job_manager.find_job_by_content_hash.return_value = Job(
+        id="in-flight-job-id",
+        image_path="in_flight_image.jpg",
+        file_extension=".jpg",
+        status=JobStatus.PROCESSING
+    )
+    
+    with patch('app.api.routes.jobs.process_image_task') as mock_task:
+        response = client.post(
+            "/api/v1/submit",
+            files={"file": ("test.jpg", b"fake image content", "image/jpeg")}
+        )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["job_id"] == "in-flight-job-id"
+    assert data["status"] == "processing"
+    
+    mock_job_manager.create_job.assert_not_called()
+    mock_job_manager.create_cached_job.assert_not_called()
+    mock_image_processor.discard_upload.assert_called_once()
+    mock_task.apply_async.assert_not_called()
+
+def test_submit_duplicates_and_invalid_uploads_do_not_fill_backlog(client: TestClient, mock_job_manager: AsyncMock, mock_image_processor: AsyncMock, admission: AdmissionController, mocker) -> None:
+    """Test that submissions that queue no new job give back their admission."""
+    from fastapi import HTTPException
+    mocker.patch("app.services.admission.time.monotonic", return_value=100.0)
+    admission.max_outstanding = 1
+    mock_job_manager.count_outstanding_jobs.return_value = 0
+    mock_job_manager.find_job_by_content_hash.return_value = Job(
+        id="in-flight-job-id",
+        image_path="in_flight_image.jpg",
+        file_extension=".jpg",
+        status=JobStatus.PROCESSING
+    )
+    
+    def submit():
+        return client.post(
+            "/api/v1/submit",
+            files={"file": ("test.jpg", b"fake image content", "image/jpeg")}
+        )
+    
+    with patch('app.api.routes.jobs.process_image_task'):
+        assert submit().status_code == 200
+        assert submit().status_code == 200
+        mock_image_processor.validate_uploaded_file.side_effect = HTTPException(
+            status_code=400, detail="File must be an image"
+        )
+        assert submit().status_code == 400
+        assert submit().status_code == 400
+    mock_job_manager.count_outstanding_jobs.assert_called_once()
+
+def test_submit_batch_success(client: TestClient, mock_job_manager: AsyncMock, mock_image_processor: AsyncMock) -> None:
+    """Test submitting several images in one request."""
+    mock_image_processor.get_file_extension.return_value = '.jpg'
+    mock_image_processor.stage_upload.side_effect = [
+        MagicMock(sha256="hash-1"),
+        MagicMock(sha256="hash-2"),
+        MagicMock(sha256="hash-1")
+    ]
+    mock_job_manager.find_jobs_by_content_hashes.return_value = {}
+    mock_job_manager.build_job = MagicMock(side_effect=[
+        Job(id="job-1", image_path="job-1.jpg", file_extension=".jpg", status=JobStatus.QUEUED),
+        Job(id="job-2", image_path="job-2.jpg", file_extension=".jpg", status=JobStatus.QUEUED)
+    ])
+    
+    with patch('app.api.routes.jobs.process_image_task') as mock_task, \
+         patch('app.api.routes.jobs.group') as mock_group:
+        response = client.post(
+            "/api/v1/submit/batch",
+            files=[
+                ("files", ("first.jpg", b"first image", "image/jpeg")),
+                ("files", ("second.jpg", b"second image", "image/jpeg")),
+                ("files", ("first_again.jpg", b"first image", "image/jpeg"))
+            ]
+        )
+    
+    assert response.status_code == 200
+    jobs = response.json()["jobs"]
+    assert [job["job_id"] for job in jobs] == ["job-1", "job-2", "job-1"]
+    assert all(job["status"] == "queued" for job in jobs)
+    
+    mock_job_manager.find_jobs_by_content_hashes.assert_called_once_with(
+        ["hash-1", "hash-2", "hash-1"], "anonymous", JobPriority.BULK
+    )
+    # All rows are inserted together and all tasks published as one group
+    mock_job_manager.create_jobs.assert_called_once()
+    assert len(mock_job_manager.create_jobs.call_args.args[0]) == 2
+    mock_job_manager.create_job.assert_not_called()
+    assert mock_image_processor.commit_upload.call_count == 2
+    mock_group.return_value.apply_async.assert_called_once_with(queue="bulk")
+    mock_task.s.assert_any_call("job-1", "job-1.jpg", tenant_id="anonymous", priority="bulk", enqueued_at=ANY)
+    mock_task.apply_async.assert_not_called()
+
+def test_submit_batch_too_many_files(client: TestClient, mock_job_manager: AsyncMock, mock_image_processor: AsyncMock, mocker) -> None:
+    """Test that batches larger than the configured limit are rejected."""
+    mocker.patch('app.api.routes.jobs.settings.MAX_BATCH_FILES', 1)
+    
+    response = client.post(
+        "/api/v1/submit/batch",
+        files=[
+            ("files", ("first.jpg", b"first image", "image/jpeg")),
+            ("files", ("second.jpg", b"second image", "image/jpeg"))
+        ]
+    )
+    
+    assert response.status_code == 400
+    assert "Too many files" in response.json()["detail"]
+    mock_image_processor.stage_upload.assert_not_called()
+    mock_job_manager.create_jobs.assert_not_called()
+
+def test_submit_batch_invalid_file(client: TestClient, mock_job_manager: AsyncMock, mock_image_processor: AsyncMock) -> None:
+    """Test that one invalid file rejects the whole batch and discards staged uploads."""
+    from fastapi import HTTPException
+    mock_image_processor.validate_uploaded_file.side_effect = [
+        None,
+        HTTPException(status_code=400, detail="File must be an image")
+    ]
+    
+    response = client.post(
+        "/api/v1/submit/batch",
+        files=[
+            ("files", ("first.jpg", b"first image", "image/jpeg")),
+            ("files", ("notes.txt", b"not an image", "text/plain"))
+        ]
+    )
+    
+    assert response.status_code == 400
+    assert response.json()["detail"] == "notes.txt: File must be an image"
+    mock_image_processor.discard_upload.assert_called_once()
+    mock_job_manager.create_jobs.assert_not_called()
 
 def test_get_job_status_success(client: TestClient, mock_job_manager: AsyncMock) -> None:
     """Test successful job status retrieval."""
@@ -174,6 +534,57 @@ def test_get_job_result_success(client: TestClient, mock_job_manager: AsyncMock)
     
     mock_job_manager.get_job.assert_called_once_with("test-job-id")
 
+def test_get_job_result_with_timings(client: TestClient, mock_job_manager: AsyncMock, result_cache: ResultCache) -> None:
+    """Test that ?include=timings adds the job's stage timings, read from the database even when the result is cached."""
+    accepted_at = datetime(2024, 1, 1, 12, 0, 0)
+    mock_job_manager.get_job.return_value = Job(
+        id="test-job-id",
+        image_path="test_image.jpg",
+        file_extension=".jpg",
+        status=JobStatus.DONE,
+        image_description="A beautiful landscape",
+        generated_by="vision-node-gpt",
+        created_at=accepted_at,
+        updated_at=accepted_at,
+        accepted_at=accepted_at,
+        stored_at=accepted_at + timedelta(milliseconds=200),
+        enqueued_at=accepted_at + timedelta(milliseconds=210),
+        picked_up_at=accepted_at + timedelta(seconds=5),
+        describer_started_at=accepted_at + timedelta(seconds=5, milliseconds=10),
+        describer_finished_at=accepted_at + timedelta(seconds=6),
+        completed_at=accepted_at + timedelta(seconds=6, milliseconds=20),
+        attempts=1
+    )
+    client.get("/api/v1/result/test-job-id")
+    
+    response = client.get("/api/v1/result/test-job-id?include=timings")
+    
+    assert response.status_code == 200
+    timings = response.json()["timings"]
+    assert timings["attempts"] == 1
+    assert timings["upload_seconds"] == 0.2
+    assert timings["queue_seconds"] == 4.79
+    assert timings["describe_seconds"] == 0.99
+    assert timings["total_seconds"] == 6.02
+    assert mock_job_manager.get_job.call_count == 2
+
+def test_get_job_result_without_timings(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test that timings are left out unless asked for, and unknown extras are rejected."""
+    mock_job_manager.get_job.return_value = Job(
+        id="test-job-id",
+        image_path="test_image.jpg",
+        file_extension=".jpg",
+        status=JobStatus.DONE,
+        image_description="A beautiful landscape",
+        generated_by="vision-node-gpt",
+        created_at=datetime.now()
+    )
+    
+    assert client.get("/api/v1/result/test-job-id").json()["timings"] is None
+    response = client.get("/api/v1/result/test-job-id?include=timings,secrets")
+    assert response.status_code == 400
+    assert "secrets" in response.json()["detail"]
+
 def test_get_job_result_not_found(client: TestClient, mock_job_manager: AsyncMock) -> None:
     """Test job result retrieval for non-existent job."""
     mock_job_manager.get_job.return_value = None
@@ -202,4 +613,308 @@ def test_get_job_result_not_completed(client: TestClient, mock_job_manager: Asyn
     assert response.status_code == 400
     assert "Job not completed" in response.json()["detail"]
     
-    mock_job_manager.get_job.assert_called_once_with("test-job-id") 
\ No newline at end of file
+    mock_job_manager.get_job.assert_called_once_with("test-job-id")
+
+def test_get_job_result_served_from_cache(client: TestClient, mock_job_manager: AsyncMock, result_cache: ResultCache) -> None:
+    """Test that a done job's result is read from the database once, then from the cache."""
+    mock_job_manager.get_job.return_value = Job(
+        id="test-job-id",
+        image_path="test_image.jpg",
+        file_extension=".jpg",
+        status=JobStatus.DONE,
+        image_description="A beautiful landscape",
+        generated_by="vision-node-gpt",
+        created_at=datetime.now(),
+        updated_at=datetime.now()
+    )
+    
+    first_response = client.get("/api/v1/result/test-job-id")
+    second_response = client.get("/api/v1/result/test-job-id")
+    status_response = client.get("/api/v1/status/test-job-id")
+    
+    assert first_response.status_code == 200
+    assert second_response.json() == first_response.json()
+    assert status_response.json()["status"] == "done"
+    mock_job_manager.get_job.assert_called_once_with("test-job-id")
+    assert result_cache.stats()["local_hits"] == 2
+
+def test_get_job_result_not_completed_is_not_cached(client: TestClient, mock_job_manager: AsyncMock, result_cache: ResultCache) -> None:
+    """Test that results of unfinished jobs are never cached."""
+    mock_job_manager.get_job.return_value = Job(
+        id="test-job-id",
+        image_path="test_image.jpg",
+        file_extension=".jpg",
+        status=JobStatus.PROCESSING,
+        generated_by="vision-node-gpt",
+        created_at=datetime.now()
+    )
+    
+    client.get("/api/v1/result/test-job-id")
+    response = client.get("/api/v1/result/test-job-id")
+    
+    assert response.status_code == 400
+    assert mock_job_manager.get_job.call_count == 2
+    assert result_cache.stats()["size"] == 0
+
+def test_get_result_cache_stats(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test that the cache counters are exposed."""
+    mock_job_manager.get_job.return_value = None
+    client.get("/api/v1/status/missing-job")
+    
+    response = client.get("/api/v1/cache/stats")
+    
+    assert response.status_code == 200
+    assert response.json()["misses"] == 1
+    assert response.json()["max_entries"] == 100
+
+def test_get_job_statuses_bulk(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test bulk status lookup with a missing job reported inline."""
+    created_at = datetime.now()
+    mock_job_manager.get_job_statuses.return_value = {
+        "job-1": MagicMock(id="job-1", status=JobStatus.PROCESSING, created_at=created_at),
+        "job-2": MagicMock(id="job-2", status=JobStatus.DONE, created_at=created_at)
+    }
+    
+    response = client.post("/api/v1/status/bulk", json={"job_ids": ["job-1", "missing", "job-2"]})
+    
+    assert response.status_code == 200
+    jobs = response.json()["jobs"]
+    assert [job["job_id"] for job in jobs] == ["job-1", "missing", "job-2"]
+    assert jobs[0]["status"] == "processing"
+    assert jobs[1]["status"] is None
+    assert jobs[1]["error"] == "Job not found"
+    assert jobs[2]["status"] == "done"
+    
+    mock_job_manager.get_job_statuses.assert_called_once_with(["job-1", "missing", "job-2"])
+    mock_job_manager.get_job.assert_not_called()
+
+def test_get_job_statuses_bulk_too_many_ids(client: TestClient, mock_job_manager: AsyncMock, mocker) -> None:
+    """Test that bulk lookups above the configured limit are rejected."""
+    mocker.patch('app.api.routes.jobs.settings.BULK_LOOKUP_MAX_IDS', 2)
+    
+    response = client.post("/api/v1/status/bulk", json={"job_ids": ["job-1", "job-2", "job-3"]})
+    
+    assert response.status_code == 400
+    assert "Too many job ids" in response.json()["detail"]
+    mock_job_manager.get_job_statuses.assert_not_called()
+
+def test_get_job_results_bulk(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test bulk result lookup with missing and incomplete jobs reported inline."""
+    created_at = datetime.now()
+    mock_job_manager.get_job_results.return_value = {
+        "job-1": MagicMock(
+            id="job-1",
+            status=JobStatus.DONE,
+            image_description="A beautiful landscape",
+            generated_by="vision-node-gpt",
+            created_at=created_at,
+            updated_at=created_at
+        ),
+        "job-2": MagicMock(id="job-2", status=JobStatus.QUEUED, created_at=created_at)
+    }
+    
+    response = client.post("/api/v1/result/bulk", json={"job_ids": ["job-1", "job-2", "missing"]})
+    
+    assert response.status_code == 200
+    jobs = response.json()["jobs"]
+    assert jobs[0]["image_description"] == "A beautiful landscape"
+    assert jobs[0]["error"] is None
+    assert jobs[1]["status"] == "queued"
+    assert jobs[1]["error"] == "Job not completed"
+    assert jobs[1]["image_description"] is None
+    assert jobs[2]["error"] == "Job not found"
+
+def test_list_jobs_pages_with_cursor(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test that a full page returns a cursor that resumes after its last job."""
+    created_at = datetime(2024, 1, 1, 12, 0, 0)
+    mock_job_manager.list_jobs.return_value = [
+        MagicMock(id=f"job-{number}", status=JobStatus.FAILED, created_at=created_at, updated_at=None)
+        for number in (3, 2, 1)
+    ]
+    
+    response = client.get("/api/v1/jobs", params={"status": "failed", "limit": 2})
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [job["job_id"] for job in data["jobs"]] == ["job-3", "job-2"]
+    assert data["next_cursor"] is not None
+    mock_job_manager.list_jobs.assert_called_once_with(
+        3, status=JobStatus.FAILED, created_after=None, updated_before=None, after=None
+    )
+    
+    mock_job_manager.list_jobs.reset_mock()
+    mock_job_manager.list_jobs.return_value = []
+    response = client.get("/api/v1/jobs", params={"limit": 2, "cursor": data["next_cursor"]})
+    
+    assert response.json() == {"jobs": [], "next_cursor": None}
+    assert mock_job_manager.list_jobs.call_args.kwargs["after"] == (created_at, "job-2")
+
+def test_list_jobs_invalid_cursor(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test that a malformed cursor is rejected."""
+    response = client.get("/api/v1/jobs", params={"cursor": "not-a-cursor"})
+    
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+    mock_job_manager.list_jobs.assert_not_called()
+
+def test_get_jobs_summary(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test job counts by status."""
+    mock_job_manager.count_jobs_by_status.return_value = {
+        JobStatus.QUEUED: 4,
+        JobStatus.PROCESSING: 2,
+        JobStatus.DONE: 10,
+        JobStatus.FAILED: 0
+    }
+    
+    response = client.get("/api/v1/jobs/summary")
+    
+    assert response.status_code == 200
+    assert response.json() == {
+        "counts": {"queued": 4, "processing": 2, "done": 10, "failed": 0},
+        "total": 16
+    }
+
+def test_wait_for_job_already_done(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test that waiting on a finished job returns at once."""
+    mock_job_manager.get_job.return_value = Job(
+        id="test-job-id",
+        image_path="test_image.jpg",
+        file_extension=".jpg",
+        status=JobStatus.DONE,
+        created_at=datetime.now()
+    )
+    
+    response = client.get("/api/v1/jobs/test-job-id/wait", params={"timeout": 5})
+    
+    assert response.status_code == 200
+    assert response.json()["status"] == "done"
+    mock_job_manager.close.assert_called_once()
+
+def test_wait_for_job_woken_by_event(client: TestClient, mock_job_manager: AsyncMock, event_bus: JobEventBus) -> None:
+    """Test that a completion event ends the wait without reading the job again."""
+    queued_job = Job(
+        id="test-job-id",
+        image_path="test_image.jpg",
+        file_extension=".jpg",
+        status=JobStatus.QUEUED,
+        created_at=datetime.now()
+    )
+    
+    async def get_job_then_complete(job_id):
+        # The worker finishes the job right after it was read
+        await event_bus.publish(job_id, JobStatus.DONE)
+        return queued_job
+    
+    mock_job_manager.get_job.side_effect = get_job_then_complete
+    
+    response = client.get("/api/v1/jobs/test-job-id/wait", params={"timeout": 5})
+    
+    assert response.status_code == 200
+    assert response.json()["status"] == "done"
+    mock_job_manager.get_job.assert_called_once_with("test-job-id")
+
+def test_wait_for_job_timeout(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test that the current status is returned when the wait times out."""
+    mock_job_manager.get_job.return_value = Job(
+        id="test-job-id",
+        image_path="test_image.jpg",
+        file_extension=".jpg",
+        status=JobStatus.PROCESSING,
+        created_at=datetime.now()
+    )
+    
+    response = client.get("/api/v1/jobs/test-job-id/wait", params={"timeout": 0.05})
+    
+    assert response.status_code == 200
+    assert response.json()["status"] == "processing"
+
+def test_wait_for_job_not_found(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test waiting on a non-existent job."""
+    mock_job_manager.get_job.return_value = None
+    
+    response = client.get("/api/v1/jobs/non-existent-id/wait")
+    
+    assert response.status_code == 404
+    assert "Job not found" in response.json()["detail"]
+
+def test_stream_job_events(client: TestClient, mock_job_manager: AsyncMock, event_bus: JobEventBus) -> None:
+    """Test streaming the current status of each job followed by completion events."""
+    created_at = datetime.now()
+    
+    async def get_statuses_then_complete(job_ids):
+        await event_bus.publish("job-2", JobStatus.DONE)
+        return {
+            "job-1": MagicMock(id="job-1", status=JobStatus.DONE, created_at=created_at),
+            "job-2": MagicMock(id="job-2", status=JobStatus.PROCESSING, created_at=created_at)
+        }
+    
+    mock_job_manager.get_job_statuses.side_effect = get_statuses_then_complete
+    
+    response = client.get("/api/v1/jobs/events", params=[("job_ids", "job-1"), ("job_ids", "job-2"), ("job_ids", "missing")])
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [block for block in response.text.split("\n\n") if block]
+    assert events == [
+        'event: status\ndata: {"job_id": "job-1", "status": "done"}',
+        'event: status\ndata: {"job_id": "job-2", "status": "processing"}',
+        'event: error\ndata: {"job_id": "missing", "error": "Job not found"}',
+        'event: status\ndata: {"job_id": "job-2", "status": "done"}'
+    ]
+
+def test_stream_job_events_timeout(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test that the stream ends with a timeout event for unfinished jobs."""
+    mock_job_manager.get_job_statuses.return_value = {
+        "job-1": MagicMock(id="job-1", status=JobStatus.QUEUED, created_at=datetime.now())
+    }
+    
+    response = client.get("/api/v1/jobs/events", params={"job_ids": "job-1", "timeout": 0.05})
+    
+    assert response.status_code == 200
+    assert response.text.endswith('event: timeout\ndata: {"job_ids": ["job-1"]}\n\n')
+
+def test_list_dead_letters_pages_with_cursor(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test that dead-lettered jobs are listed with their last error and a cursor."""
+    dead_lettered_at = datetime(2024, 1, 1, 12, 0, 0)
+    mock_job_manager.list_dead_letters.return_value = [
+        MagicMock(
+            id=f"job-{number}",
+            attempts=4,
+            last_error="ConnectionError: Describer unavailable",
+            created_at=dead_lettered_at - timedelta(minutes=30),
+            dead_lettered_at=dead_lettered_at
+        )
+        for number in (2, 1)
+    ]
+    
+    response = client.get("/api/v1/jobs/dead-letters", params={"limit": 1})
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["jobs"][0]["job_id"] == "job-2"
+    assert data["jobs"][0]["last_error"] == "ConnectionError: Describer unavailable"
+    mock_job_manager.list_dead_letters.assert_called_once_with(2, after=None)
+    
+    mock_job_manager.list_dead_letters.return_value = []
+    client.get("/api/v1/jobs/dead-letters", params={"limit": 1, "cursor": data["next_cursor"]})
+    
+    assert mock_job_manager.list_dead_letters.call_args.kwargs["after"] == (dead_lettered_at, "job-2")
+
+def test_replay_dead_letters(client: TestClient, mock_job_manager: AsyncMock) -> None:
+    """Test that replayable jobs are queued again on their priority's queue in one publish."""
+    mock_job_manager.replay_jobs.return_value = [
+        MagicMock(id="job-1", image_path="ab/job-1.jpg", tenant_id="acme", priority=JobPriority.INTERACTIVE)
+    ]
+    
+    with patch('app.api.routes.jobs.process_image_task') as mock_task, \
+         patch('app.api.routes.jobs.group') as mock_group:
+        response = client.post("/api/v1/jobs/dead-letters/replay", json={"job_ids": ["job-1", "job-2"]})
+    
+    assert response.status_code == 200
+    assert response.json() == {"replayed": ["job-1"], "skipped": ["job-2"]}
+    mock_job_manager.replay_jobs.assert_called_once_with(["job-1", "job-2"])
+    mock_task.s.assert_called_once_with(
+        "job-1", "ab/job-1.jpg", tenant_id="acme", priority="interactive", enqueued_at=ANY
+    )
+    mock_task.s.return_value.set.assert_called_once_with(queue="interactive")
+    mock_group.return_value.apply_async.assert_called_once_with()
@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import AsyncMock
+from fastapi import HTTPException
+from app.services.admission import AdmissionController
+
+def _job_manager(outstanding: int) -> AsyncMock:
+    """Build a job manager reporting a number of outstanding jobs."""
+    job_manager = AsyncMock()
+    job_manager.count_outstanding_jobs.return_value = outstanding
+    return job_manager
+
+@pytest.mark.asyncio
+async def test_admits_below_high_water_mark() -> None:
+    """Test that submissions are admitted while the backlog is below its limit."""
+    controller = AdmissionController(max_outstanding=10)
+    
+    await controller.admit(_job_manager(9), "tenant")
+
+@pytest.mark.asyncio
+async def test_refuses_at_high_water_mark() -> None:
+    """Test that submissions past the backlog limit are refused with 503 and Retry-After."""
+    controller = AdmissionController(max_outstanding=10, retry_after_seconds=7)
+    
+    with pytest.raises(HTTPException) as exc_info:
+        await controller.admit(_job_manager(8), "tenant", jobs=3)
+    
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.headers == {"Retry-After": "7"}
+
+@pytest.mark.asyncio
+async def test_admitted_jobs_count_until_refresh(mocker) -> None:
+    """Test that the count is cached between refreshes and includes jobs admitted meanwhile."""
+    monotonic = mocker.patch("app.services.admission.time.monotonic", return_value=100.0)
+    controller = AdmissionController(max_outstanding=3, refresh_seconds=1.0)
+    job_manager = _job_manager(1)
+    
+    await controller.admit(job_manager, "tenant")
+    await controller.admit(job_manager, "tenant")
+    with pytest.raises(HTTPException):
+        await controller.admit(job_manager, "tenant")
+    job_manager.count_outstanding_jobs.assert_called_once()
+    
+    # The next refresh sees that the workers drained the backlog
+    monotonic.return_value = 101.0
+    job_manager.count_outstanding_jobs.return_value = 0
+    await controller.admit(job_manager, "tenant")
+    assert job_manager.count_outstanding_jobs.call_count == 2
+
+@pytest.mark.asyncio
+async def test_released_jobs_no_longer_count(mocker) -> None:
+    """Test that admitted jobs that were not queued after all leave room for others."""
+    mocker.patch("app.services.admission.time.monotonic", return_value=100.0)
+    controller = AdmissionController(max_outstanding=2, refresh_seconds=1.0)
+    job_manager = _job_manager(1)
+    
+    await controller.admit(job_manager, "tenant")
+    controller.release()
+    
+    await controller.admit(job_manager, "tenant")
+
+@pytest.mark.asyncio
+async def test_tenant_bucket_refills_over_time(mocker) -> None:
+    """Test that a tenant over its rate is refused with 429 until its bucket refills."""
+    monotonic = mocker.patch("app.services.admission.time.monotonic", return_value=100.0)
+    controller = AdmissionController(max_outstanding=0, tenant_rate=2.0, tenant_burst=2)
+    job_manager = _job_manager(0)
+    
+    await controller.admit(job_manager, "bulk-tenant", jobs=2)
+    with pytest.raises(HTTPException) as exc_info:
+        await controller.admit(job_manager, "bulk-tenant")
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "1"}
+    
+    # Other tenants have their own bucket
+    await controller.admit(job_manager, "interactive-tenant")
+    
+    monotonic.return_value = 100.5
+    await controller.admit(job_manager, "bulk-tenant")
+
+@pytest.mark.asyncio
+async def test_batch_larger_than_burst_leaves_bucket_in_debt(mocker) -> None:
+    """Test that a batch larger than the burst is admitted from a full bucket and delays the next one."""
+    monotonic = mocker.patch("app.services.admission.time.monotonic", return_value=100.0)
+    controller = AdmissionController(max_outstanding=0, tenant_rate=1.0, tenant_burst=5)
+    job_manager = _job_manager(0)
+    
+    await controller.admit(job_manager, "tenant", jobs=10)
+    
+    monotonic.return_value = 105.0
+    with pytest.raises(HTTPException) as exc_info:
+        await controller.admit(job_manager, "tenant")
+    assert exc_info.value.headers == {"Retry-After": "1"}
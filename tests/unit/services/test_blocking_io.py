@@ -0,0 +1,43 @@
+import pytest
+import threading
+from app.services.blocking_io import BlockingIOExecutor
+
+@pytest.mark.asyncio
+async def test_calls_run_off_the_event_loop_thread() -> None:
+    """Test that blocking calls run on a pool thread and return their result."""
+    executor = BlockingIOExecutor(max_workers=2)
+    try:
+        thread_name = await executor.run(lambda: threading.current_thread().name)
+        assert await executor.run(sum, [1, 2, 3]) == 6
+    finally:
+        executor.shutdown()
+    
+    assert thread_name.startswith("blocking-io")
+
+@pytest.mark.asyncio
+async def test_keyword_arguments_are_passed() -> None:
+    """Test that keyword arguments reach the blocking call."""
+    executor = BlockingIOExecutor(max_workers=1)
+    try:
+        assert await executor.run(int, "ff", base=16) == 255
+    finally:
+        executor.shutdown()
+
+@pytest.mark.asyncio
+async def test_zero_workers_run_inline() -> None:
+    """Test that without workers calls run on the event loop thread."""
+    executor = BlockingIOExecutor(max_workers=0)
+    
+    assert await executor.run(threading.get_ident) == threading.get_ident()
+
+@pytest.mark.asyncio
+async def test_pool_is_recreated_after_shutdown() -> None:
+    """Test that the executor can be used again after it was shut down."""
+    executor = BlockingIOExecutor(max_workers=1)
+    await executor.run(len, "abc")
+    executor.shutdown()
+    
+    try:
+        assert await executor.run(len, "abcd") == 4
+    finally:
+        executor.shutdown()
@@ -0,0 +1,79 @@
+import pytest
+import tempfile
+import os
+from app.services import describers
+from app.services.describers import (
+    DescriberBackend,
+    MockDescriber,
+    StubDescriber,
+    create_describer,
+    describer_name,
+    get_describer,
+    close_describer,
+    register_describer
+)
+
+@pytest.fixture
+def counting_backend(mocker):
+    """Register a backend that counts its lifecycle calls and select it."""
+    calls = []
+    
+    @register_describer("counting")
+    class CountingDescriber(DescriberBackend):
+        name = "counting"
+        
+        async def load(self) -> None:
+            calls.append("load")
+        
+        async def warmup(self) -> None:
+            calls.append("warmup")
+        
+        async def close(self) -> None:
+            calls.append("close")
+    
+    mocker.patch('app.services.describers.settings.DESCRIBER_BACKEND', "counting")
+    yield calls
+    del describers.DESCRIBER_BACKENDS["counting"]
+
+def test_create_describer() -> None:
+    """Test creating registered backends by key."""
+    assert isinstance(create_describer("mock"), MockDescriber)
+    assert isinstance(create_describer("stub"), StubDescriber)
+
+def test_create_describer_unknown() -> None:
+    """Test that an unknown backend key is rejected."""
+    with pytest.raises(ValueError, match="Unknown describer backend"):
+        create_describer("does-not-exist")
+
+def test_describer_name_follows_configured_backend(mocker) -> None:
+    """Test that the name of the configured backend is known without creating it."""
+    assert describer_name() == MockDescriber.name
+    
+    mocker.patch('app.services.describers.settings.DESCRIBER_BACKEND', "stub")
+    assert describer_name() == "stub"
+
+@pytest.mark.asyncio
+async def test_stub_describer() -> None:
+    """Test that the stub backend describes each image without a model."""
+    with tempfile.NamedTemporaryFile(suffix='.jpg') as f:
+        f.write(b'test image content')
+        f.flush()
+        
+        descriptions = await StubDescriber(latency_ms=0).describe([f.name])
+    
+    assert descriptions == [f"Image {os.path.basename(f.name)} of 18 bytes"]
+
+@pytest.mark.asyncio
+async def test_get_describer_loads_once(counting_backend) -> None:
+    """Test that the process-wide backend is loaded and warmed up once and reused."""
+    try:
+        first = await get_describer()
+        second = await get_describer()
+        
+        assert first is second
+        assert first.name == "counting"
+        assert counting_backend == ["load", "warmup"]
+    finally:
+        await close_describer()
+    
+    assert counting_backend == ["load", "warmup", "close"]
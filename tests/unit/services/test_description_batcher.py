@@ -0,0 +1,159 @@
+import pytest
+import asyncio
+import os
+import tempfile
+from unittest.mock import AsyncMock, MagicMock
+from app.enums import JobStatus
+from app.models import Job
+from app.services.description_batcher import DescriptionBatcher
+from app.services.image_processor import ImageProcessor
+from app.services.describers import StubDescriber
+from app.services.storage import LocalBlobStore
+
+@pytest.fixture
+def upload_dir():
+    """Create an upload directory holding two images."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for filename in ("first.jpg", "second.jpg"):
+            with open(os.path.join(temp_dir, filename), "wb") as f:
+                f.write(b"test image content")
+        yield temp_dir
+
+@pytest.fixture
+def image_processor(upload_dir) -> ImageProcessor:
+    """Create an ImageProcessor with a mocked batch describer."""
+    image_processor = ImageProcessor(StubDescriber(latency_ms=0), storage=LocalBlobStore(upload_dir))
+    image_processor.process_images = AsyncMock(
+        side_effect=lambda image_paths: [f"Description of {image_path}" for image_path in image_paths]
+    )
+    return image_processor
+
+@pytest.fixture
+def mock_job_manager(mocker):
+    """Patch the JobManager used by the batcher, completing every job it is given."""
+    job_manager = AsyncMock()
+    job_manager.update_job_results.side_effect = lambda image_descriptions, *args: [
+        Job(id=job_id, status=JobStatus.DONE, image_description=description)
+        for job_id, description in image_descriptions.items()
+    ]
+    mocker.patch('app.services.description_batcher.JobManager', return_value=job_manager)
+    return job_manager
+
+@pytest.fixture
+def session_factory():
+    """Create a mocked session factory."""
+    factory = MagicMock()
+    factory.return_value.__aenter__.return_value = MagicMock()
+    return factory
+
+@pytest.mark.asyncio
+async def test_full_batch_is_described_at_once(image_processor, mock_job_manager, session_factory) -> None:
+    """Test that a full batch is described with one call and stored in one transaction."""
+    batcher = DescriptionBatcher(image_processor, session_factory, max_batch_size=2, max_wait_ms=10_000)
+    
+    jobs = await asyncio.gather(
+        batcher.describe("job-1", "first.jpg"),
+        batcher.describe("job-2", "second.jpg")
+    )
+    
+    assert [job.image_description for job in jobs] == ["Description of first.jpg", "Description of second.jpg"]
+    image_processor.process_images.assert_called_once_with(["first.jpg", "second.jpg"])
+    mock_job_manager.update_job_results.assert_called_once()
+    args = mock_job_manager.update_job_results.call_args.args
+    assert args[:2] == ({"job-1": "Description of first.jpg", "job-2": "Description of second.jpg"}, "stub")
+    # The describer call is timed once for the whole batch
+    describer_started_at, describer_finished_at = args[2:]
+    assert describer_started_at <= describer_finished_at
+
+@pytest.mark.asyncio
+async def test_partial_batch_is_flushed_after_max_wait(image_processor, mock_job_manager, session_factory) -> None:
+    """Test that a batch smaller than the maximum is described once the linger time passes."""
+    batcher = DescriptionBatcher(image_processor, session_factory, max_batch_size=10, max_wait_ms=10)
+    
+    job = await asyncio.wait_for(batcher.describe("job-1", "first.jpg"), timeout=1)
+    
+    assert job.image_description == "Description of first.jpg"
+    image_processor.process_images.assert_called_once_with(["first.jpg"])
+
+@pytest.mark.asyncio
+async def test_missing_file_fails_only_its_job(image_processor, mock_job_manager, session_factory) -> None:
+    """Test that a missing image does not fail the other jobs of its batch."""
+    batcher = DescriptionBatcher(image_processor, session_factory, max_batch_size=2, max_wait_ms=10_000)
+    
+    results = await asyncio.gather(
+        batcher.describe("job-1", "first.jpg"),
+        batcher.describe("job-2", "missing.jpg"),
+        return_exceptions=True
+    )
+    
+    assert results[0].image_description == "Description of first.jpg"
+    assert isinstance(results[1], FileNotFoundError)
+    mock_job_manager.update_job_results.assert_called_once()
+    assert mock_job_manager.update_job_results.call_args.args[:2] == ({"job-1": "Description of first.jpg"}, "stub")
+
+@pytest.mark.asyncio
+async def test_describer_failure_fails_the_batch(image_processor, mock_job_manager, session_factory) -> None:
+    """Test that a describer error is raised for every job of the batch."""
+    image_processor.process_images.side_effect = RuntimeError("Describer unavailable")
+    batcher = DescriptionBatcher(image_processor, session_factory, max_batch_size=2, max_wait_ms=10_000)
+    
+    results = await asyncio.gather(
+        batcher.describe("job-1", "first.jpg"),
+        batcher.describe("job-2", "second.jpg"),
+        return_exceptions=True
+    )
+    
+    assert all(isinstance(result, RuntimeError) for result in results)
+    mock_job_manager.update_job_results.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_store_error_fails_its_job_instead_of_hanging(image_processor, mock_job_manager, session_factory) -> None:
+    """Test that a blob store error while fetching is raised for its job rather than leaving it waiting."""
+    fetch = image_processor.storage.fetch
+    
+    async def flaky_fetch(image_path: str) -> str:
+        if image_path == "second.jpg":
+            raise ConnectionError("Store unavailable")
+        return await fetch(image_path)
+    
+    image_processor.storage.fetch = flaky_fetch
+    batcher = DescriptionBatcher(image_processor, session_factory, max_batch_size=2, max_wait_ms=10_000)
+    
+    results = await asyncio.wait_for(asyncio.gather(
+        batcher.describe("job-1", "first.jpg"),
+        batcher.describe("job-2", "second.jpg"),
+        return_exceptions=True
+    ), timeout=1)
+    
+    assert results[0].image_description == "Description of first.jpg"
+    assert isinstance(results[1], ConnectionError)
+
+@pytest.mark.asyncio
+async def test_storing_failure_fails_the_batch(image_processor, mock_job_manager, session_factory) -> None:
+    """Test that a database error while storing the results is raised for every job of the batch."""
+    mock_job_manager.update_job_results.side_effect = RuntimeError("Database unavailable")
+    batcher = DescriptionBatcher(image_processor, session_factory, max_batch_size=2, max_wait_ms=10_000)
+    
+    results = await asyncio.wait_for(asyncio.gather(
+        batcher.describe("job-1", "first.jpg"),
+        batcher.describe("job-2", "second.jpg"),
+        return_exceptions=True
+    ), timeout=1)
+    
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+@pytest.mark.asyncio
+async def test_job_no_longer_processing_gets_no_result(image_processor, mock_job_manager, session_factory) -> None:
+    """Test that a job whose row was not updated is told its result was not stored."""
+    mock_job_manager.update_job_results.side_effect = lambda image_descriptions, *args: [
+        Job(id="job-1", status=JobStatus.DONE, image_description=image_descriptions["job-1"])
+    ]
+    batcher = DescriptionBatcher(image_processor, session_factory, max_batch_size=2, max_wait_ms=10_000)
+    
+    jobs = await asyncio.gather(
+        batcher.describe("job-1", "first.jpg"),
+        batcher.describe("job-2", "second.jpg")
+    )
+    
+    assert jobs[0].id == "job-1"
+    assert jobs[1] is None
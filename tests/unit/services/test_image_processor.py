@@ -1,7 +1,14 @@
 import pytest
 import tempfile
 import os
+from io import BytesIO
+from PIL import Image
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
 from app.services.image_processor import ImageProcessor
+from app.services.describers import StubDescriber
+from app.services.preprocessor import ImagePreprocessor
+from app.services.storage import LocalBlobStore
 
 @pytest.fixture
 def image_processor() -> ImageProcessor:
@@ -16,8 +23,8 @@ async def test_process_image(image_processor: ImageProcessor) -> None:
         f.write(b'test image content')
         f.flush()
         
-        # Mock the upload directory
-        image_processor.upload_dir = os.path.dirname(f.name)
+        # Store images in the temporary directory
+        image_processor.storage = LocalBlobStore(os.path.dirname(f.name))
         filename = os.path.basename(f.name)
         
         result = await image_processor.process_image(filename)
@@ -26,6 +33,20 @@ async def test_process_image(image_processor: ImageProcessor) -> None:
         
         os.unlink(f.name)
 
+@pytest.mark.asyncio
+async def test_process_images_with_describer_backend(image_processor: ImageProcessor) -> None:
+    """Test that a batch of images is described by the configured backend."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image_processor.storage = LocalBlobStore(temp_dir)
+        image_processor.describer = StubDescriber(latency_ms=0)
+        for filename in ('first.jpg', 'second.jpg'):
+            with open(os.path.join(temp_dir, filename), 'wb') as f:
+                f.write(b'test image content')
+        
+        descriptions = await image_processor.process_images(['first.jpg', 'second.jpg'])
+    
+    assert descriptions == ["Image first.jpg of 18 bytes", "Image second.jpg of 18 bytes"]
+
 @pytest.mark.asyncio
 async def test_process_image_file_not_found(image_processor: ImageProcessor) -> None:
     """Test processing a non-existent image file."""
@@ -37,6 +58,7 @@ async def test_save_uploaded_file(image_processor: ImageProcessor) -> None:
     """Test saving an uploaded file."""
     with tempfile.TemporaryDirectory() as temp_dir:
         image_processor.upload_dir = temp_dir
+        image_processor.storage = LocalBlobStore(temp_dir)
         
         file_content = b'test file content'
         filename = 'test_image.jpg'
@@ -52,17 +74,80 @@ async def test_save_uploaded_file(image_processor: ImageProcessor) -> None:
 
 @pytest.mark.asyncio
 async def test_save_uploaded_file_creates_directory(image_processor: ImageProcessor) -> None:
-    """Test that save_uploaded_file creates the upload directory if it doesn't exist."""
+    """Test that save_uploaded_file creates the upload and shard directories if they don't exist."""
     with tempfile.TemporaryDirectory() as temp_dir:
         # Use a subdirectory that doesn't exist
         sub_dir = os.path.join(temp_dir, "uploads", "images")
         image_processor.upload_dir = sub_dir
+        image_processor.storage = LocalBlobStore(sub_dir)
         
         file_content = b'test file content'
-        filename = 'test_image.jpg'
+        filename = 'ab/cd/test_image.jpg'
         
         saved_path = await image_processor.save_uploaded_file(file_content, filename)
         
         assert saved_path == filename
         assert os.path.exists(sub_dir)
-        assert os.path.exists(os.path.join(sub_dir, filename)) 
\ No newline at end of file
+        assert os.path.exists(os.path.join(sub_dir, filename))
+
+@pytest.mark.asyncio
+async def test_stage_and_commit_upload(image_processor: ImageProcessor, mocker) -> None:
+    """Test streaming an upload in chunks and moving it into place."""
+    mocker.patch('app.services.image_processor.settings.UPLOAD_CHUNK_SIZE', 4)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image_processor.upload_dir = temp_dir
+        image_processor.storage = LocalBlobStore(temp_dir)
+        
+        file_content = b'test file content'
+        upload = UploadFile(BytesIO(file_content[4:]), filename='test_image.jpg')
+        
+        staged = await image_processor.stage_upload(upload, file_content[:4])
+        assert staged.size == len(file_content)
+        assert os.path.exists(staged.temp_path)
+        
+        saved_path = await image_processor.commit_upload(staged, 'test_image.jpg')
+        
+        assert saved_path == 'test_image.jpg'
+        assert not os.path.exists(staged.temp_path)
+        with open(os.path.join(temp_dir, 'test_image.jpg'), 'rb') as f:
+            assert f.read() == file_content
+
+@pytest.mark.asyncio
+async def test_stage_upload_too_large(image_processor: ImageProcessor, mocker) -> None:
+    """Test that staging stops at the size limit and leaves no temporary file behind."""
+    mocker.patch('app.services.image_processor.settings.UPLOAD_CHUNK_SIZE', 4)
+    mocker.patch('app.services.image_processor.settings.MAX_FILE_SIZE', 8)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image_processor.upload_dir = temp_dir
+        
+        upload = UploadFile(BytesIO(b'x' * 16), filename='test_image.jpg')
+        
+        with pytest.raises(HTTPException) as exc_info:
+            await image_processor.stage_upload(upload, b'xxxx')
+        
+        assert exc_info.value.detail == "File too large"
+        assert os.listdir(temp_dir) == []
+
+@pytest.mark.asyncio
+async def test_validate_uploaded_file_rejects_non_image_content(image_processor: ImageProcessor) -> None:
+    """Test that content sniffed as something other than an image is rejected."""
+    upload = UploadFile(BytesIO(b''), filename='test_image.jpg', headers=Headers({'content-type': 'image/jpeg'}))
+    
+    with pytest.raises(HTTPException) as exc_info:
+        await image_processor.validate_uploaded_file(upload, b'just some text, not an image')
+    
+    assert exc_info.value.status_code == 400
+    assert "is not an image" in exc_info.value.detail
+
+@pytest.mark.asyncio
+async def test_process_images_describes_preprocessed_copy(image_processor: ImageProcessor) -> None:
+    """Test that the describer is given the normalized copy of a decodable image."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image_processor.storage = LocalBlobStore(temp_dir)
+        image_processor.describer = StubDescriber(latency_ms=0)
+        image_processor.preprocessor = ImagePreprocessor(max_side=64)
+        Image.new('RGB', (640, 480)).save(os.path.join(temp_dir, 'photo.png'))
+        
+        descriptions = await image_processor.process_images(['photo.png'])
+    
+    assert descriptions[0].startswith("Image photo.png.64.jpg of ")
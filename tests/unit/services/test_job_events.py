@@ -0,0 +1,65 @@
+import pytest
+import asyncio
+from app.services.job_events import JobEventBus, JobEvent
+from app.enums import JobStatus
+
+@pytest.fixture
+def event_bus() -> JobEventBus:
+    """Create an in-process JobEventBus for testing."""
+    return JobEventBus()
+
+@pytest.mark.asyncio
+async def test_subscriber_receives_event(event_bus: JobEventBus) -> None:
+    """Test that a subscriber receives events for its jobs."""
+    async with event_bus.subscribe(["job-1", "job-2"]) as subscription:
+        await event_bus.publish("job-2", JobStatus.DONE)
+        
+        event = await subscription.get(timeout=1)
+    
+    assert event == JobEvent(job_id="job-2", status=JobStatus.DONE)
+
+@pytest.mark.asyncio
+async def test_subscriber_ignores_other_jobs(event_bus: JobEventBus) -> None:
+    """Test that events for other jobs are not delivered and the wait times out."""
+    async with event_bus.subscribe(["job-1"]) as subscription:
+        await event_bus.publish("job-2", JobStatus.DONE)
+        
+        event = await subscription.get(timeout=0.05)
+    
+    assert event is None
+
+@pytest.mark.asyncio
+async def test_event_wakes_waiting_subscriber(event_bus: JobEventBus) -> None:
+    """Test that a subscriber already waiting is woken by a later event."""
+    async with event_bus.subscribe(["job-1"]) as subscription:
+        waiter = asyncio.create_task(subscription.get(timeout=1))
+        await asyncio.sleep(0)
+        await event_bus.publish("job-1", JobStatus.FAILED)
+        
+        event = await waiter
+    
+    assert event.status == JobStatus.FAILED
+
+@pytest.mark.asyncio
+async def test_unsubscribe_on_exit(event_bus: JobEventBus) -> None:
+    """Test that leaving the subscription context removes the subscriber."""
+    async with event_bus.subscribe(["job-1"]):
+        pass
+    
+    assert event_bus._subscriptions == {}
+    # Publishing with no subscribers is a no-op
+    await event_bus.publish("job-1", JobStatus.DONE)
+
+@pytest.mark.asyncio
+async def test_publish_from_another_thread(event_bus: JobEventBus) -> None:
+    """Test that an event published from another event loop thread reaches the subscriber."""
+    import threading
+    
+    async with event_bus.subscribe(["job-1"]) as subscription:
+        publisher = threading.Thread(target=asyncio.run, args=(event_bus.publish("job-1", JobStatus.DONE),))
+        publisher.start()
+        publisher.join()
+        
+        event = await subscription.get(timeout=1)
+    
+    assert event == JobEvent(job_id="job-1", status=JobStatus.DONE)
@@ -1,4 +1,5 @@
 import pytest
+from datetime import datetime, timezone
 from unittest.mock import AsyncMock, MagicMock
 from app.services.job_manager import JobManager
 from app.enums import JobStatus
@@ -21,7 +22,10 @@ def job_manager(mock_session):
 
 @pytest.mark.asyncio
 async def test_create_job(job_manager, mock_session):
-    """Test creating a new job with mocked database."""
+    """Test creating a new job with a single INSERT ... RETURNING."""
+    # Arrange
+    mock_session.scalars = AsyncMock(side_effect=lambda statement, rows: iter([Job(**row) for row in rows]))
+    
     # Act
     job = await job_manager.create_job("test_image.jpg", ".jpg")
     
@@ -31,12 +35,74 @@ async def test_create_job(job_manager, mock_session):
     assert job.image_path.endswith(".jpg")
     assert job.file_extension == ".jpg"
     assert job.generated_by == "vision-node-gpt"
-    assert job.image_path.startswith(job.id)
+    # The image is stored under a hash-prefix directory
+    assert job.image_path.endswith(f"/{job.id}.jpg")
     
     # Verify database operations were called
-    mock_session.add.assert_called_once_with(job)
+    mock_session.scalars.assert_called_once()
+    mock_session.commit.assert_called_once()
+    mock_session.add.assert_not_called()
+    mock_session.refresh.assert_not_called()
+
+def test_build_job_records_configured_describer(job_manager, mocker):
+    """Test that a new job names the configured describer rather than a fixed one."""
+    mocker.patch('app.services.describers.settings.DESCRIBER_BACKEND', "stub")
+    
+    job = job_manager.build_job(".jpg")
+    
+    assert job.generated_by == "stub"
+
+@pytest.mark.asyncio
+async def test_create_cached_job(job_manager, mock_session):
+    """Test creating a completed job from a previously described one."""
+    # Arrange
+    source_job = Job(
+        id="source-job-id",
+        image_path="source-job-id.jpg",
+        file_extension=".jpg",
+        content_hash="abc123",
+        status=JobStatus.DONE,
+        image_description="A beautiful landscape",
+        generated_by="vision-node-gpt"
+    )
+    mock_session.scalars = AsyncMock(side_effect=lambda statement, rows: iter([Job(**row) for row in rows]))
+    
+    # Act
+    job = await job_manager.create_cached_job(source_job)
+    
+    # Assert
+    assert job.id != source_job.id
+    assert job.status == JobStatus.DONE
+    assert job.image_path == source_job.image_path
+    assert job.image_description == source_job.image_description
+    assert job.content_hash == source_job.content_hash
+    mock_session.scalars.assert_called_once()
+    mock_session.commit.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_create_jobs(job_manager, mock_session):
+    """Test inserting several built jobs in one statement and transaction."""
+    # Arrange
+    jobs = [job_manager.build_job(".jpg", "abc123"), job_manager.build_job(".png")]
+    mock_session.scalars = AsyncMock(return_value=iter(jobs))
+    
+    # Act
+    created_jobs = await job_manager.create_jobs(jobs)
+    
+    # Assert
+    assert created_jobs == jobs
+    mock_session.scalars.assert_called_once()
+    rows = mock_session.scalars.call_args.args[1]
+    assert [row["id"] for row in rows] == [job.id for job in jobs]
+    assert rows[0]["content_hash"] == "abc123"
     mock_session.commit.assert_called_once()
-    mock_session.refresh.assert_called_once_with(job)
+    mock_session.add.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_create_jobs_empty(job_manager, mock_session):
+    """Test that creating no jobs does not touch the database."""
+    assert await job_manager.create_jobs([]) == []
+    mock_session.commit.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_get_job_found(job_manager, mock_session):
@@ -71,39 +137,40 @@ async def test_get_job_not_found(job_manager, mock_session):
     assert result is None
     mock_session.execute.assert_called_once()
 
+def _returning(mock_session, columns):
+    """Make the next UPDATE ... RETURNING on the mocked session return a row with the given columns."""
+    result = MagicMock()
+    result.one_or_none.return_value = MagicMock(_mapping=columns) if columns is not None else None
+    mock_session.execute.return_value = result
+
 @pytest.mark.asyncio
 async def test_update_job_status_success(job_manager, mock_session):
-    """Test updating job status successfully."""
+    """Test updating job status with a single statement."""
     # Arrange
     job_id = "test-job-id"
-    existing_job = Job(id=job_id, image_path="test.jpg", file_extension=".jpg", status=JobStatus.QUEUED)
-    mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = existing_job
-    mock_session.execute.return_value = mock_result
+    _returning(mock_session, {"id": job_id, "image_path": "test.jpg", "file_extension": ".jpg", "status": JobStatus.PROCESSING})
     
     # Act
     result = await job_manager.update_job_status(job_id, JobStatus.PROCESSING)
     
     # Assert
+    assert result.id == job_id
     assert result.status == JobStatus.PROCESSING
+    mock_session.execute.assert_called_once()
     mock_session.commit.assert_called_once()
-    mock_session.refresh.assert_called_once_with(existing_job)
+    mock_session.refresh.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_update_job_status_not_found(job_manager, mock_session):
     """Test updating status of non-existent job."""
     # Arrange
-    job_id = "non-existent-id"
-    mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = None
-    mock_session.execute.return_value = mock_result
+    _returning(mock_session, None)
     
     # Act
-    result = await job_manager.update_job_status(job_id, JobStatus.PROCESSING)
+    result = await job_manager.update_job_status("non-existent-id", JobStatus.PROCESSING)
     
     # Assert
     assert result is None
-    mock_session.commit.assert_not_called()
     mock_session.refresh.assert_not_called()
 
 @pytest.mark.asyncio
@@ -112,34 +179,76 @@ async def test_update_job_result_success(job_manager, mock_session):
     # Arrange
     job_id = "test-job-id"
     image_description = "A beautiful landscape"
-    existing_job = Job(id=job_id, image_path="test.jpg", file_extension=".jpg", status=JobStatus.PROCESSING)
-    mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = existing_job
-    mock_session.execute.return_value = mock_result
+    _returning(mock_session, {"id": job_id, "image_path": "test.jpg", "file_extension": ".jpg", "status": JobStatus.DONE})
     
     # Act
-    result = await job_manager.update_job_result(job_id, image_description)
+    result = await job_manager.update_job_result(job_id, image_description, "stub")
     
     # Assert
     assert result.status == JobStatus.DONE
-    assert result.image_description == image_description
+    statement = mock_session.execute.call_args.args[0]
+    params = statement.compile().params
+    assert params["status"] == JobStatus.DONE
+    assert params["image_description"] == image_description
+    assert params["generated_by"] == "stub"
     mock_session.commit.assert_called_once()
-    mock_session.refresh.assert_called_once_with(existing_job)
+    mock_session.refresh.assert_not_called()
 
 @pytest.mark.asyncio
 async def test_update_job_result_not_found(job_manager, mock_session):
     """Test updating result of non-existent job."""
     # Arrange
-    job_id = "non-existent-id"
-    image_description = "A beautiful landscape"
+    _returning(mock_session, None)
+    
+    # Act
+    result = await job_manager.update_job_result("non-existent-id", "A beautiful landscape")
+    
+    # Assert
+    assert result is None
+    mock_session.refresh.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_claim_job_compares_status(job_manager, mock_session):
+    """Test that claiming a job only matches it while it is queued or failed."""
+    # Arrange
+    _returning(mock_session, None)
+    
+    # Act
+    result = await job_manager.claim_job("test-job-id")
+    
+    # Assert
+    assert result is None
+    statement = mock_session.execute.call_args.args[0]
+    assert "jobs.status IN" in str(statement)
+    params = statement.compile().params
+    assert params["status"] == JobStatus.PROCESSING
+    assert set(params["status_1"]) == {JobStatus.QUEUED, JobStatus.RETRYING}
+
+@pytest.mark.asyncio
+async def test_update_job_results(job_manager, mock_session):
+    """Test storing the results of several processing jobs with one compare-and-set UPDATE."""
+    # Arrange
+    returned_row = MagicMock(_mapping={"id": "job-1", "status": JobStatus.DONE, "image_description": "A landscape"})
     mock_result = MagicMock()
-    mock_result.scalar_one_or_none.return_value = None
+    mock_result.all.return_value = [returned_row]
     mock_session.execute.return_value = mock_result
     
     # Act
-    result = await job_manager.update_job_result(job_id, image_description)
+    started_at = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+    finished_at = datetime(2024, 1, 1, 12, 0, 1, tzinfo=timezone.utc)
+    jobs = await job_manager.update_job_results({"job-1": "A landscape", "job-2": "A portrait"}, "stub", started_at, finished_at)
     
     # Assert
-    assert result is None
-    mock_session.commit.assert_not_called()
-    mock_session.refresh.assert_not_called() 
\ No newline at end of file
+    mock_session.execute.assert_called_once()
+    statement = mock_session.execute.call_args.args[0]
+    assert "jobs.id IN" in str(statement)
+    assert "RETURNING" in str(statement)
+    params = statement.compile().params
+    assert params["status_1"] == JobStatus.PROCESSING
+    assert params["status"] == JobStatus.DONE
+    assert params["generated_by"] == "stub"
+    assert params["describer_started_at"] == started_at
+    assert params["lease_expires_at"] is None
+    # Only the rows that matched are returned as completed
+    assert [job.id for job in jobs] == ["job-1"]
+    mock_session.commit.assert_called_once()
@@ -0,0 +1,102 @@
+import pytest
+import os
+import tempfile
+from PIL import Image
+from app.services.preprocessor import ImagePreprocessor, normalize_image
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary upload directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+def _save_image(path: str, size, color=(200, 100, 50), exif=None) -> None:
+    """Write a solid RGB image, or RGBA if the color has an alpha channel, to a file."""
+    image = Image.new("RGBA" if len(color) == 4 else "RGB", size, color)
+    image.save(path, **({"exif": exif} if exif is not None else {}))
+
+@pytest.mark.asyncio
+async def test_large_image_is_downscaled_and_normalized(temp_dir) -> None:
+    """Test that a large transparent PNG becomes a small RGB JPEG cached next to it."""
+    source = os.path.join(temp_dir, "large.png")
+    _save_image(source, (3000, 1500), color=(200, 100, 50, 0))
+    preprocessor = ImagePreprocessor(max_side=512)
+    
+    prepared = await preprocessor.prepare(source)
+    
+    assert prepared == os.path.join(temp_dir, "large.png.512.jpg")
+    with Image.open(prepared) as image:
+        assert image.format == "JPEG"
+        assert image.mode == "RGB"
+        assert image.size == (512, 256)
+        # Transparent pixels are flattened onto white
+        assert image.getpixel((10, 10)) == (255, 255, 255)
+    assert os.path.getsize(prepared) < os.path.getsize(source)
+
+def test_exif_orientation_is_applied(temp_dir) -> None:
+    """Test that an image stored sideways with an EXIF orientation comes out upright."""
+    source = os.path.join(temp_dir, "rotated.jpg")
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Rotated 90 degrees clockwise
+    _save_image(source, (400, 200), exif=exif)
+    target = os.path.join(temp_dir, "rotated.jpg.1024.jpg")
+    
+    normalize_image(source, target, 1024, "JPEG", 85)
+    
+    with Image.open(target) as image:
+        assert image.size == (200, 400)
+
+@pytest.mark.asyncio
+async def test_cached_artifact_is_reused(temp_dir, mocker) -> None:
+    """Test that an image is normalized once and the cached result is used afterwards."""
+    source = os.path.join(temp_dir, "image.png")
+    _save_image(source, (100, 100))
+    preprocessor = ImagePreprocessor(max_side=64)
+    normalize = mocker.patch("app.services.preprocessor.normalize_image", wraps=normalize_image)
+    
+    first = await preprocessor.prepare(source)
+    second = await preprocessor.prepare(source)
+    
+    assert first == second == preprocessor.artifact_path(source)
+    normalize.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_undecodable_image_is_passed_on_as_uploaded(temp_dir) -> None:
+    """Test that an image Pillow cannot decode is described as stored."""
+    source = os.path.join(temp_dir, "broken.jpg")
+    with open(source, "wb") as f:
+        f.write(b"not really an image")
+    preprocessor = ImagePreprocessor()
+    
+    assert await preprocessor.prepare(source) == source
+    assert os.listdir(temp_dir) == ["broken.jpg"]
+
+@pytest.mark.asyncio
+async def test_disabled_preprocessor_returns_original(temp_dir) -> None:
+    """Test that nothing is written when preprocessing is disabled."""
+    source = os.path.join(temp_dir, "image.png")
+    _save_image(source, (100, 100))
+    preprocessor = ImagePreprocessor(enabled=False)
+    
+    assert await preprocessor.prepare(source) == source
+    assert os.listdir(temp_dir) == ["image.png"]
+
+@pytest.mark.asyncio
+async def test_process_pool_normalizes_images(temp_dir) -> None:
+    """Test that images are normalized in pool processes when workers are configured."""
+    source = os.path.join(temp_dir, "image.webp")
+    _save_image(source, (800, 600))
+    preprocessor = ImagePreprocessor(max_side=400, image_format="WEBP", max_workers=1)
+    try:
+        prepared = await preprocessor.prepare(source)
+    finally:
+        preprocessor.shutdown()
+    
+    with Image.open(prepared) as image:
+        assert image.format == "WEBP"
+        assert image.size == (400, 300)
+
+def test_unknown_format_is_rejected() -> None:
+    """Test that an output format without a known extension is refused."""
+    with pytest.raises(ValueError, match="Unknown preprocess format"):
+        ImagePreprocessor(image_format="TIFF")
@@ -0,0 +1,125 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+from app.services.result_cache import ResultCache, CachedResult
+from app.enums import JobStatus
+
+def _result(job_id: str, status: JobStatus = JobStatus.DONE) -> CachedResult:
+    """Build a cached result for a job."""
+    return CachedResult(
+        job_id=job_id,
+        status=status,
+        image_description="A beautiful landscape",
+        generated_by="stub",
+        created_at=datetime(2024, 1, 1, 12, 0, 0),
+        updated_at=datetime(2024, 1, 1, 12, 0, 2)
+    )
+
+@pytest.mark.asyncio
+async def test_get_counts_hits_and_misses() -> None:
+    """Test that reads are served from the cache once a result is stored."""
+    cache = ResultCache(max_entries=10, ttl_seconds=60)
+    
+    assert await cache.get("job-1") is None
+    await cache.put(_result("job-1"))
+    
+    assert await cache.get("job-1") == _result("job-1")
+    stats = cache.stats()
+    assert stats["local_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+@pytest.mark.asyncio
+async def test_unfinished_results_are_not_cached() -> None:
+    """Test that only done jobs are cached."""
+    cache = ResultCache(max_entries=10, ttl_seconds=60)
+    
+    for status in (JobStatus.QUEUED, JobStatus.PROCESSING, JobStatus.FAILED):
+        await cache.put(_result(f"job-{status.value}", status))
+    
+    assert cache.stats()["size"] == 0
+
+@pytest.mark.asyncio
+async def test_least_recently_used_result_is_evicted() -> None:
+    """Test that the cache stays within its size by evicting the least recently read result."""
+    cache = ResultCache(max_entries=2, ttl_seconds=60)
+    await cache.put(_result("job-1"))
+    await cache.put(_result("job-2"))
+    await cache.get("job-1")
+    
+    await cache.put(_result("job-3"))
+    
+    assert await cache.get("job-2") is None
+    assert await cache.get("job-1") is not None
+    assert await cache.get("job-3") is not None
+    assert cache.stats()["evictions"] == 1
+
+@pytest.mark.asyncio
+async def test_expired_result_is_dropped(mocker) -> None:
+    """Test that results are not served after their TTL."""
+    monotonic = mocker.patch("app.services.result_cache.time.monotonic", return_value=100.0)
+    cache = ResultCache(max_entries=10, ttl_seconds=60)
+    await cache.put(_result("job-1"))
+    
+    monotonic.return_value = 161.0
+    
+    assert await cache.get("job-1") is None
+    assert cache.stats()["size"] == 0
+
+@pytest.mark.asyncio
+async def test_redis_tier_fills_local_tier(mocker) -> None:
+    """Test that a result found in Redis is kept locally for the next read."""
+    cache = ResultCache(max_entries=10, ttl_seconds=60, redis_url="redis://localhost:6379")
+    client = AsyncMock()
+    client.get.return_value = _result("job-1").to_json()
+    mocker.patch.object(cache, "_client", return_value=client)
+    
+    assert await cache.get("job-1") == _result("job-1")
+    assert await cache.get("job-1") == _result("job-1")
+    
+    client.get.assert_called_once_with("job-result:job-1")
+    stats = cache.stats()
+    assert stats["redis_hits"] == 1
+    assert stats["local_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_redis_errors_are_misses(mocker) -> None:
+    """Test that an unavailable Redis tier degrades to a miss instead of an error."""
+    cache = ResultCache(max_entries=10, ttl_seconds=60, redis_url="redis://localhost:6379")
+    client = AsyncMock()
+    client.get.side_effect = ConnectionError("Redis unavailable")
+    client.set.side_effect = ConnectionError("Redis unavailable")
+    mocker.patch.object(cache, "_client", return_value=client)
+    
+    await cache.put(_result("job-1"))
+    
+    assert await cache.get("job-2") is None
+    assert cache.stats()["misses"] == 1
+    assert await cache.get("job-1") == _result("job-1")
+
+@pytest.mark.asyncio
+async def test_result_is_not_cached_past_its_row_ttl(mocker) -> None:
+    """Test that a result expires by the time retention may delete its job's row."""
+    monotonic = mocker.patch("app.services.result_cache.time.monotonic", return_value=100.0)
+    cache = ResultCache(max_entries=10, ttl_seconds=3600, row_ttl_seconds=7200)
+    updated_at = datetime.now(timezone.utc) - timedelta(seconds=7170)
+    result = CachedResult("job-1", JobStatus.DONE, "A beautiful landscape", "stub", updated_at, updated_at)
+    
+    await cache.put(result)
+    assert await cache.get("job-1") == result
+    
+    # Well within the cache TTL, but the row may be gone
+    monotonic.return_value = 131.0
+    assert await cache.get("job-1") is None
+
+@pytest.mark.asyncio
+async def test_result_of_expired_row_is_not_cached(mocker) -> None:
+    """Test that a result read after its row's TTL is not cached in any tier."""
+    cache = ResultCache(max_entries=10, ttl_seconds=60, redis_url="redis://localhost:6379", row_ttl_seconds=3600)
+    client = AsyncMock()
+    mocker.patch.object(cache, "_client", return_value=client)
+    
+    await cache.put(_result("job-1"))
+    
+    assert cache.stats()["size"] == 0
+    client.set.assert_not_called()
@@ -0,0 +1,116 @@
+import pytest
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from app.enums import JobStatus
+from app.models import Job
+from app.services.preprocessor import ImagePreprocessor
+from app.services.retention import RetentionService
+from app.services.storage import LocalBlobStore
+
+NOW = datetime(2024, 1, 8, tzinfo=timezone.utc)
+
+@pytest.fixture
+def upload_dir():
+    """Create an upload directory holding an image and its preprocessed copy."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.makedirs(os.path.join(temp_dir, "ab"))
+        with open(os.path.join(temp_dir, "ab", "old.jpg"), "wb") as f:
+            f.write(b"x" * 100)
+        with open(os.path.join(temp_dir, "ab", "old.jpg.1024.jpg"), "wb") as f:
+            f.write(b"x" * 10)
+        yield temp_dir
+
+@pytest.fixture
+def mock_job_manager(mocker):
+    """Patch the JobManager used by the retention service."""
+    job_manager = AsyncMock()
+    job_manager.find_expired_images.side_effect = [["ab/old.jpg", "ab/missing.jpg"], []]
+    job_manager.find_expired_jobs.return_value = []
+    job_manager.delete_jobs.side_effect = lambda job_ids: len(job_ids)
+    mocker.patch('app.services.retention.JobManager', return_value=job_manager)
+    return job_manager
+
+def create_service(upload_dir: str, **kwargs) -> RetentionService:
+    """Create a RetentionService on a local store with a mocked session factory and cache."""
+    session_factory = MagicMock()
+    session_factory.return_value.__aenter__.return_value = MagicMock()
+    options = {
+        "batch_size": 2,
+        "batch_pause_seconds": 0,
+        "storage": LocalBlobStore(upload_dir),
+        "preprocessor": ImagePreprocessor(max_side=1024),
+        "cache": AsyncMock(),
+        **kwargs
+    }
+    return RetentionService(
+        session_factory,
+        {JobStatus.DONE: 24, JobStatus.FAILED: 0},
+        {JobStatus.DONE: 48, JobStatus.FAILED: 48},
+        **options
+    )
+
+@pytest.mark.asyncio
+async def test_run_deletes_expired_images(upload_dir, mock_job_manager) -> None:
+    """Test that expired images and their preprocessed copies are deleted and counted."""
+    service = create_service(upload_dir)
+    
+    stats = await service.run(NOW)
+    
+    assert stats.images_deleted == 2
+    assert stats.bytes_reclaimed == 110
+    assert not os.path.exists(os.path.join(upload_dir, "ab", "old.jpg"))
+    assert not os.path.exists(os.path.join(upload_dir, "ab", "old.jpg.1024.jpg"))
+    done_before, failed_before, limit = mock_job_manager.find_expired_images.call_args_list[0].args
+    assert done_before == datetime(2024, 1, 7, tzinfo=timezone.utc)
+    assert failed_before is None
+    assert limit == 2
+    mock_job_manager.mark_images_deleted.assert_awaited_once_with(["ab/old.jpg", "ab/missing.jpg"], NOW)
+
+@pytest.mark.asyncio
+async def test_run_keeps_images_it_could_not_delete_unmarked(upload_dir, mock_job_manager) -> None:
+    """Test that an image the store failed to delete is left for the next run."""
+    storage = LocalBlobStore(upload_dir)
+    storage.delete = AsyncMock(side_effect=[OSError("disk error"), 0])
+    service = create_service(upload_dir, storage=storage)
+    
+    stats = await service.run(NOW)
+    
+    assert stats.images_deleted == 1
+    mock_job_manager.mark_images_deleted.assert_awaited_once_with(["ab/missing.jpg"], NOW)
+
+@pytest.mark.asyncio
+async def test_run_archives_and_deletes_expired_jobs_in_batches(upload_dir, mock_job_manager) -> None:
+    """Test that expired rows are archived before being deleted, batch by batch."""
+    mock_job_manager.find_expired_images.side_effect = None
+    mock_job_manager.find_expired_images.return_value = []
+    jobs = [Job(id=f"job-{number}", status=JobStatus.DONE, image_path="ab/old.jpg") for number in range(3)]
+    mock_job_manager.find_expired_jobs.side_effect = [jobs[:2], jobs[2:]]
+    with tempfile.TemporaryDirectory() as archive_dir:
+        service = create_service(upload_dir, archive_dir=archive_dir)
+        
+        stats = await service.run(NOW)
+        
+        with open(os.path.join(archive_dir, "jobs-20240108.jsonl")) as archive:
+            records = [json.loads(line) for line in archive]
+    
+    assert stats.jobs_archived == 3
+    assert stats.jobs_deleted == 3
+    assert [record["id"] for record in records] == ["job-0", "job-1", "job-2"]
+    assert records[0]["status"] == "done"
+    assert mock_job_manager.find_expired_jobs.await_count == 2
+    assert service.cache.discard.await_count == 3
+
+@pytest.mark.asyncio
+async def test_run_stops_after_max_batches(upload_dir, mock_job_manager) -> None:
+    """Test that a run deletes at most max_batches batches."""
+    mock_job_manager.find_expired_images.side_effect = None
+    mock_job_manager.find_expired_images.return_value = ["ab/missing.jpg"]
+    service = create_service(upload_dir, max_batches=3)
+    
+    stats = await service.run(NOW)
+    
+    assert stats.images_deleted == 3
+    assert mock_job_manager.find_expired_images.await_count == 3
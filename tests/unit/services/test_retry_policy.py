@@ -0,0 +1,43 @@
+import httpx
+from PIL import UnidentifiedImageError
+from app.services.retry_policy import PermanentJobError, RetryPolicy
+from app.services.storage import InvalidStorageKey
+
+def _status_error(status_code: int) -> httpx.HTTPStatusError:
+    """Build the error raised for an HTTP response with a status code."""
+    request = httpx.Request("GET", "http://blobstore/blobs/ab/job.jpg")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status_code, request=request))
+
+def test_transient_errors_are_retriable() -> None:
+    """Test that outages and server errors are retried."""
+    policy = RetryPolicy(60, 900)
+    
+    assert policy.is_retriable(ConnectionError("Describer unavailable"))
+    assert policy.is_retriable(TimeoutError())
+    assert policy.is_retriable(httpx.ConnectError("refused"))
+    assert policy.is_retriable(_status_error(503))
+    assert policy.is_retriable(_status_error(429))
+    # A bug or misconfiguration is fixed by a deploy the retries can wait for
+    assert policy.is_retriable(ValueError("Unknown preprocess format: GIF"))
+
+def test_permanent_errors_are_not_retriable() -> None:
+    """Test that errors retrying cannot fix fail the job at once."""
+    policy = RetryPolicy(60, 900)
+    
+    assert not policy.is_retriable(FileNotFoundError("Image file not found: ab/job.jpg"))
+    assert not policy.is_retriable(InvalidStorageKey("Invalid storage key: ../job.jpg"))
+    assert not policy.is_retriable(UnidentifiedImageError("cannot identify image file 'ab/job.jpg'"))
+    assert not policy.is_retriable(PermanentJobError("Image refused by the describer"))
+    assert not policy.is_retriable(_status_error(404))
+
+def test_delay_backs_off_exponentially_up_to_the_cap() -> None:
+    """Test that the backoff bound doubles per retry and stops at the cap."""
+    policy = RetryPolicy(60, 900, rng=lambda: 1.0)
+    
+    assert [policy.delay(retries) for retries in range(6)] == [60, 120, 240, 480, 900, 900]
+    assert policy.delay(1000) == 900
+
+def test_delay_is_jittered_over_the_whole_bound() -> None:
+    """Test that full jitter picks a delay anywhere from 0 to the bound."""
+    assert RetryPolicy(60, 900, rng=lambda: 0.0).delay(3) == 0
+    assert RetryPolicy(60, 900, rng=lambda: 0.25).delay(3) == 120
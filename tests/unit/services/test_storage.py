@@ -0,0 +1,99 @@
+import pytest
+import os
+import tempfile
+import httpx
+from app.blobstore import create_blobstore_app
+from app.services.storage import HttpBlobStore, LocalBlobStore, storage_key
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield temp_dir
+
+def _write(path: str, content: bytes) -> str:
+    """Write a file and return its path."""
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+def test_storage_key_fans_out_into_hash_prefix_directories() -> None:
+    """Test that keys spread files over two-digit hash-prefix directories."""
+    key = storage_key("job-1.jpg", shard_depth=2)
+    
+    first, second, filename = key.split("/")
+    assert len(first) == len(second) == 2
+    assert filename == "job-1.jpg"
+    assert storage_key("job-1.jpg", shard_depth=2) == key
+    assert storage_key("job-1.jpg", shard_depth=0) == "job-1.jpg"
+
+@pytest.mark.asyncio
+async def test_local_store_round_trip(temp_dir) -> None:
+    """Test storing, fetching and deleting a blob in a local directory."""
+    store = LocalBlobStore(os.path.join(temp_dir, "images"))
+    source = _write(os.path.join(temp_dir, "upload.part"), b"image content")
+    
+    await store.put_file(source, "ab/cd/job-1.jpg")
+    
+    assert not os.path.exists(source)
+    assert await store.exists("ab/cd/job-1.jpg")
+    path = await store.fetch("ab/cd/job-1.jpg")
+    assert path == os.path.join(temp_dir, "images", "ab", "cd", "job-1.jpg")
+    with open(path, "rb") as f:
+        assert f.read() == b"image content"
+    
+    await store.delete("ab/cd/job-1.jpg")
+    assert not await store.exists("ab/cd/job-1.jpg")
+    with pytest.raises(FileNotFoundError, match="Image file not found"):
+        await store.fetch("ab/cd/job-1.jpg")
+
+def test_local_store_refuses_keys_outside_its_root(temp_dir) -> None:
+    """Test that a key cannot point outside the store's directory."""
+    store = LocalBlobStore(temp_dir)
+    
+    with pytest.raises(ValueError, match="Invalid storage key"):
+        store.path("../outside.jpg")
+
+@pytest.fixture
+def http_store(temp_dir):
+    """Create an HTTP blob store talking to the stand-in object store in-process."""
+    blobstore = create_blobstore_app(os.path.join(temp_dir, "blobs"))
+    return HttpBlobStore(
+        "http://blobstore/blobs",
+        os.path.join(temp_dir, "cache"),
+        chunk_size=4,
+        transport=httpx.ASGITransport(app=blobstore)
+    )
+
+@pytest.mark.asyncio
+async def test_http_store_round_trip(http_store, temp_dir) -> None:
+    """Test that blobs are streamed to the object store and fetched into the local cache."""
+    source = _write(os.path.join(temp_dir, "upload.part"), b"image content")
+    try:
+        await http_store.put_file(source, "ab/cd/job-1.jpg")
+        
+        assert not os.path.exists(source)
+        assert os.path.exists(os.path.join(temp_dir, "blobs", "ab", "cd", "job-1.jpg"))
+        assert await http_store.exists("ab/cd/job-1.jpg")
+        
+        path = await http_store.fetch("ab/cd/job-1.jpg")
+        assert path == os.path.join(temp_dir, "cache", "ab", "cd", "job-1.jpg")
+        with open(path, "rb") as f:
+            assert f.read() == b"image content"
+        
+        await http_store.delete("ab/cd/job-1.jpg")
+        assert not await http_store.exists("ab/cd/job-1.jpg")
+        assert not os.path.exists(path)
+    finally:
+        await http_store.close()
+
+@pytest.mark.asyncio
+async def test_http_store_fetch_of_missing_blob(http_store, temp_dir) -> None:
+    """Test that fetching a missing blob raises FileNotFoundError and caches nothing."""
+    try:
+        with pytest.raises(FileNotFoundError, match="Image file not found"):
+            await http_store.fetch("ab/cd/missing.jpg")
+    finally:
+        await http_store.close()
+    
+    assert os.listdir(os.path.join(temp_dir, "cache", "ab", "cd")) == []
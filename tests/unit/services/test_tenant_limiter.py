@@ -0,0 +1,128 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.services.tenant_limiter import ACQUIRE_SCRIPT, SlotGrant, TenantConcurrencyLimiter, RedisTenantConcurrencyLimiter
+
+@pytest.mark.asyncio
+async def test_tenant_is_capped_independently() -> None:
+    """Test that a tenant at its cap does not block other tenants."""
+    limiter = TenantConcurrencyLimiter(max_concurrent=2)
+    
+    assert await limiter.acquire("bulk-tenant", "job-1") == SlotGrant.TAKEN
+    assert await limiter.acquire("bulk-tenant", "job-2") == SlotGrant.TAKEN
+    assert await limiter.acquire("bulk-tenant", "job-3") == SlotGrant.REFUSED
+    assert await limiter.acquire("interactive-tenant", "job-4") == SlotGrant.TAKEN
+
+@pytest.mark.asyncio
+async def test_released_slot_is_reused() -> None:
+    """Test that a slot given back can be taken again."""
+    limiter = TenantConcurrencyLimiter(max_concurrent=1)
+    await limiter.acquire("tenant", "job-1")
+    
+    await limiter.release("tenant", "job-1")
+    
+    assert await limiter.acquire("tenant", "job-2") == SlotGrant.TAKEN
+
+@pytest.mark.asyncio
+async def test_release_of_job_without_slot_frees_nothing() -> None:
+    """Test that a job refused a slot cannot give back the slot of another job."""
+    limiter = TenantConcurrencyLimiter(max_concurrent=1)
+    await limiter.acquire("tenant", "job-1")
+    assert await limiter.acquire("tenant", "job-2") == SlotGrant.REFUSED
+    
+    await limiter.release("tenant", "job-2")
+    
+    assert await limiter.acquire("tenant", "job-3") == SlotGrant.REFUSED
+
+@pytest.mark.asyncio
+async def test_second_delivery_cannot_free_slot_of_running_job() -> None:
+    """Test that a redelivered job is told its slot is held, and leaves it to the running delivery."""
+    limiter = TenantConcurrencyLimiter(max_concurrent=1)
+    await limiter.acquire("tenant", "job-1")
+    
+    grant = await limiter.acquire("tenant", "job-1")
+    # Only a delivery that took the slot itself gives it back
+    if grant == SlotGrant.TAKEN:
+        await limiter.release("tenant", "job-1")
+    
+    assert grant == SlotGrant.HELD
+    assert await limiter.acquire("tenant", "job-2") == SlotGrant.REFUSED
+
+@pytest.mark.asyncio
+async def test_zero_cap_admits_every_job() -> None:
+    """Test that a cap of 0 disables the limiter."""
+    limiter = TenantConcurrencyLimiter(max_concurrent=0)
+    
+    assert all([await limiter.acquire("tenant", f"job-{number}") == SlotGrant.UNCOUNTED for number in range(100)])
+
+def _redis_client(answer: int) -> MagicMock:
+    """Build a Redis client whose acquire script returns `answer`."""
+    client = MagicMock()
+    client.eval = AsyncMock(return_value=answer)
+    client.zrem = AsyncMock()
+    return client
+
+@pytest.mark.asyncio
+async def test_redis_limiter_takes_expiring_slot_per_job(mocker) -> None:
+    """Test that a slot is a member of the tenant's set scored by its lease expiry."""
+    limiter = RedisTenantConcurrencyLimiter(max_concurrent=2, redis_url="redis://localhost:6379", lease_seconds=60)
+    client = _redis_client(answer=1)
+    mocker.patch.object(limiter, "_client", return_value=client)
+    mocker.patch("app.services.tenant_limiter.time.time", return_value=1000.0)
+    
+    assert await limiter.acquire("tenant", "job-1") == SlotGrant.TAKEN
+    client.eval.assert_awaited_once_with(ACQUIRE_SCRIPT, 1, "tenant-jobs:tenant", 1000.0, 1060.0, "job-1", 2, 60)
+
+@pytest.mark.asyncio
+async def test_redis_limiter_refuses_job_over_cap(mocker) -> None:
+    """Test that a job is refused when the script finds the tenant at its cap."""
+    limiter = RedisTenantConcurrencyLimiter(max_concurrent=2, redis_url="redis://localhost:6379")
+    mocker.patch.object(limiter, "_client", return_value=_redis_client(answer=0))
+    
+    assert await limiter.acquire("tenant", "job-3") == SlotGrant.REFUSED
+
+@pytest.mark.asyncio
+async def test_redis_limiter_reports_slot_already_held(mocker) -> None:
+    """Test that a job already holding a slot is told so rather than granted a new one."""
+    limiter = RedisTenantConcurrencyLimiter(max_concurrent=2, redis_url="redis://localhost:6379")
+    mocker.patch.object(limiter, "_client", return_value=_redis_client(answer=2))
+    
+    assert await limiter.acquire("tenant", "job-1") == SlotGrant.HELD
+
+@pytest.mark.asyncio
+async def test_redis_limiter_renews_only_held_slot(mocker) -> None:
+    """Test that renewing pushes back the expiry of an existing member without adding one."""
+    limiter = RedisTenantConcurrencyLimiter(max_concurrent=2, redis_url="redis://localhost:6379", lease_seconds=60)
+    pipe = MagicMock()
+    pipe.execute = AsyncMock()
+    client = _redis_client(answer=1)
+    client.pipeline.return_value.__aenter__ = AsyncMock(return_value=pipe)
+    client.pipeline.return_value.__aexit__ = AsyncMock(return_value=False)
+    mocker.patch.object(limiter, "_client", return_value=client)
+    mocker.patch("app.services.tenant_limiter.time.time", return_value=1000.0)
+    
+    await limiter.renew("tenant", "job-1")
+    
+    pipe.zadd.assert_called_once_with("tenant-jobs:tenant", {"job-1": 1060.0}, xx=True)
+    pipe.expire.assert_called_once_with("tenant-jobs:tenant", 60)
+    pipe.execute.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_redis_limiter_release_removes_only_own_slot(mocker) -> None:
+    """Test that releasing removes the job's own member, never decrementing a count."""
+    limiter = RedisTenantConcurrencyLimiter(max_concurrent=2, redis_url="redis://localhost:6379")
+    client = _redis_client(answer=1)
+    mocker.patch.object(limiter, "_client", return_value=client)
+    
+    await limiter.release("tenant", "job-1")
+    
+    client.zrem.assert_awaited_once_with("tenant-jobs:tenant", "job-1")
+
+@pytest.mark.asyncio
+async def test_redis_limiter_admits_when_redis_is_unavailable(mocker) -> None:
+    """Test that the cap is not enforced rather than failing jobs when Redis is down."""
+    limiter = RedisTenantConcurrencyLimiter(max_concurrent=2, redis_url="redis://localhost:6379")
+    client = _redis_client(answer=1)
+    client.eval.side_effect = ConnectionError("Redis unavailable")
+    mocker.patch.object(limiter, "_client", return_value=client)
+    
+    assert await limiter.acquire("tenant", "job-1") == SlotGrant.UNCOUNTED
@@ -0,0 +1,81 @@
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from app.main import app
+from app.api.dependencies import get_job_manager
+from app.enums import JobPriority
+from app.metrics import observe_queue_wait, start_worker_exporter
+from app.models import Job
+
+def _sample(name: str, labels: dict) -> float:
+    """Read a sample from the default registry, 0 if it was never recorded."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def test_request_latency_is_labeled_by_route_template() -> None:
+    """Test that requests are timed per route template rather than per path."""
+    labels = {"method": "GET", "route": "/api/v1/status/{job_id}", "status": "404"}
+    before = _sample("http_request_duration_seconds_count", labels)
+    
+    job_manager = AsyncMock()
+    job_manager.get_job.return_value = None
+    app.dependency_overrides[get_job_manager] = lambda: job_manager
+    try:
+        client = TestClient(app)
+        with_ids = [client.get(f"/api/v1/status/{job_id}") for job_id in ("missing-1", "missing-2")]
+    finally:
+        app.dependency_overrides.clear()
+    
+    assert all(response.status_code == 404 for response in with_ids)
+    assert _sample("http_request_duration_seconds_count", labels) == before + 2
+
+def test_metrics_endpoint_exposes_prometheus_text() -> None:
+    """Test that /metrics serves the registry in the Prometheus text format."""
+    client = TestClient(app)
+    client.get("/health")
+    
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+    assert "job_queue_wait_seconds" in response.text
+
+def test_queue_wait_of_naive_utc_timestamp() -> None:
+    """Test that queue wait is measured from a creation time stored without a time zone."""
+    labels = {"priority": "bulk", "le": "5.0"}
+    now = datetime(2024, 1, 1, 12, 0, 3, tzinfo=timezone.utc)
+    job = Job(priority=JobPriority.BULK, created_at=datetime(2024, 1, 1, 12, 0, 0))
+    before_fast = _sample("job_queue_wait_seconds_bucket", {"priority": "bulk", "le": "2.5"})
+    before = _sample("job_queue_wait_seconds_bucket", labels)
+    
+    observe_queue_wait(job, now)
+    
+    assert _sample("job_queue_wait_seconds_bucket", labels) == before + 1
+    assert _sample("job_queue_wait_seconds_bucket", {"priority": "bulk", "le": "2.5"}) == before_fast
+
+
+def test_queue_wait_is_measured_from_enqueue_time() -> None:
+    """Test that queue wait is measured from the precise publish time rather than the creation second."""
+    now = datetime(2024, 1, 1, 12, 0, 3, tzinfo=timezone.utc)
+    job = Job(
+        priority=JobPriority.INTERACTIVE,
+        created_at=datetime(2024, 1, 1, 12, 0, 0),
+        enqueued_at=datetime(2024, 1, 1, 12, 0, 2, 950000, tzinfo=timezone.utc)
+    )
+    before = _sample("job_queue_wait_seconds_bucket", {"priority": "interactive", "le": "0.05"})
+    
+    observe_queue_wait(job, now)
+    
+    assert _sample("job_queue_wait_seconds_bucket", {"priority": "interactive", "le": "0.05"}) == before + 1
+
+def test_worker_exporter_refused_for_pool_processes_without_multiproc_dir(mocker, monkeypatch) -> None:
+    """Test that a prefork worker does not serve the empty metrics of its main process."""
+    monkeypatch.delenv("PROMETHEUS_MULTIPROC_DIR", raising=False)
+    mock_start_http_server = mocker.patch("app.metrics.start_http_server")
+    
+    assert not start_worker_exporter(9100, pool_processes=True)
+    mock_start_http_server.assert_not_called()
+    
+    assert start_worker_exporter(9100)
+    mock_start_http_server.assert_called_once_with(9100, registry=REGISTRY)
\ No newline at end of file
@@ -0,0 +1,73 @@
+import os
+import pstats
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.profiling import start_task_profile, finish_task_profile
+from app.worker_runtime import WorkerRuntime
+
+@pytest.fixture
+def profiling_dir(tmp_path, mocker):
+    """Enable profiling into a temporary directory, with no sampling."""
+    mocker.patch('app.profiling.settings.PROFILING_ENABLED', True)
+    mocker.patch('app.profiling.settings.PROFILING_SAMPLE_RATE', 0.0)
+    mocker.patch('app.profiling.settings.PROFILING_DIR', str(tmp_path))
+    return tmp_path
+
+def test_request_with_header_is_profiled(profiling_dir) -> None:
+    """Test that a request asking for a profile gets one written and named in the response."""
+    response = TestClient(app).get("/health", headers={"X-Profile": "1"})
+    
+    assert response.status_code == 200
+    profile_name = response.headers["X-Profile"]
+    assert profile_name.startswith("request-GET_health-")
+    assert os.listdir(profiling_dir) == [profile_name]
+    assert pstats.Stats(str(profiling_dir / profile_name)).total_calls > 0
+
+def test_request_without_header_is_not_profiled(profiling_dir) -> None:
+    """Test that requests are not profiled unless asked for or sampled."""
+    response = TestClient(app).get("/health")
+    
+    assert "X-Profile" not in response.headers
+    assert os.listdir(profiling_dir) == []
+
+def test_header_is_ignored_when_profiling_is_disabled(tmp_path, mocker) -> None:
+    """Test that the header cannot turn profiling on when it is disabled."""
+    mocker.patch('app.profiling.settings.PROFILING_DIR', str(tmp_path))
+    
+    response = TestClient(app).get("/health", headers={"X-Profile": "1"})
+    
+    assert "X-Profile" not in response.headers
+    assert os.listdir(tmp_path) == []
+
+def test_sampled_task_is_profiled(profiling_dir, mocker) -> None:
+    """Test that a sampled task's profile is written under its task name."""
+    mocker.patch('app.profiling.settings.PROFILING_SAMPLE_RATE', 1.0)
+    
+    start_task_profile("task-1")
+    sum(range(1000))
+    path = finish_task_profile("task-1", "app.tasks.process_image_task")
+    
+    assert os.path.basename(path).startswith("task-app.tasks.process_image_task-")
+    assert pstats.Stats(path).total_calls > 0
+    # Only one profile runs at a time, and it was released
+    start_task_profile("task-2")
+    assert finish_task_profile("task-2", "app.tasks.process_image_task") is not None
+
+def test_task_on_async_worker_loop_is_profiled(profiling_dir, mocker) -> None:
+    """Test that with the loop in its own thread, the profile covers the task's coroutines rather than the waiting thread."""
+    mocker.patch('app.profiling.settings.PROFILING_SAMPLE_RATE', 1.0)
+    worker_runtime = WorkerRuntime(mode="async", concurrency=1)
+    
+    async def describe_on_loop() -> int:
+        return sum(range(1000))
+    
+    try:
+        start_task_profile("task-1", worker_runtime.call_in_loop_thread)
+        worker_runtime.run(describe_on_loop())
+        path = finish_task_profile("task-1", "app.tasks.process_image_task", worker_runtime.call_in_loop_thread)
+    finally:
+        worker_runtime.stop()
+    
+    profiled_functions = {function for _, _, function in pstats.Stats(path).stats}
+    assert "describe_on_loop" in profiled_functions
@@ -1,92 +1,446 @@
+import asyncio
 import pytest
-from app.tasks import _process_image_async, _update_job_failed
-from app.enums import JobStatus
+from unittest.mock import MagicMock
+from datetime import datetime, timedelta, timezone
+from app.tasks import (
+    celery_app,
+    process_image_task,
+    run_retention_task,
+    _process_image_async,
+    _update_job_failed,
+    _update_job_retrying,
+    _publish_job_event,
+    _reap_stale_jobs,
+    _renew_lease
+)
+from app.config import settings
+from app.enums import JobStatus, JobPriority
+from app.models import Job
+from app.services.retention import RetentionStats
+from app.services.tenant_limiter import SlotGrant
+
+def _claimed_job(queued_for: float = 2.0) -> Job:
+    """Build the job returned by a successful claim, created some seconds ago."""
+    return Job(
+        id="test-job-id",
+        status=JobStatus.PROCESSING,
+        priority=JobPriority.INTERACTIVE,
+        created_at=datetime.now(timezone.utc) - timedelta(seconds=queued_for)
+    )
 
 @pytest.mark.asyncio
 async def test_process_image_async(mocker) -> None:
     """Test async image processing workflow."""
-    mock_session = mocker.patch('app.tasks.AsyncSessionLocal')
+    mock_runtime = mocker.patch('app.tasks.runtime')
     mock_job_manager_class = mocker.patch('app.tasks.JobManager')
     mock_image_processor_class = mocker.patch('app.tasks.ImageProcessor')
+    mock_event_bus = mocker.patch('app.tasks.job_event_bus')
+    mock_event_bus.publish = mocker.AsyncMock()
+    mock_result_cache = mocker.patch('app.tasks.result_cache')
+    mock_result_cache.put = mocker.AsyncMock()
+    mock_observe_queue_wait = mocker.patch('app.tasks.observe_queue_wait')
     
     # Mock dependencies
-    mock_session.return_value.__aenter__.return_value = mocker.AsyncMock()
+    mock_runtime.session.return_value.__aenter__.return_value = mocker.AsyncMock()
     mock_job_manager = mocker.AsyncMock()
+    mock_job_manager.claim_job.return_value = _claimed_job()
     mock_job_manager_class.return_value = mock_job_manager
     mock_image_processor = mocker.AsyncMock()
     mock_image_processor_class.return_value = mock_image_processor
     
     # Mock processing result
     mock_image_processor.process_image.return_value = "Test description"
+    mock_job_manager.complete_job.return_value = Job(
+        id="test-job-id", status=JobStatus.DONE, image_description="Test description"
+    )
+    mock_describer = mocker.MagicMock()
+    mock_describer.name = "stub"
+    mock_image_processor.get_describer.return_value = mock_describer
     
     result = await _process_image_async("test-job-id", "test-image.jpg")
     
-    # Verify job status updates
-    mock_job_manager.update_job_status.assert_called_with("test-job-id", JobStatus.PROCESSING)
-    mock_job_manager.update_job_result.assert_called_with("test-job-id", "Test description")
+    # Verify job status transitions
+    mock_job_manager.claim_job.assert_called_once_with("test-job-id", None, settings.JOB_LEASE_SECONDS)
+    mock_job_manager.complete_job.assert_called_once()
+    job_id, description, generated_by, describer_started_at, describer_finished_at = mock_job_manager.complete_job.call_args.args
+    assert (job_id, description, generated_by) == ("test-job-id", "Test description", "stub")
+    assert describer_started_at <= describer_finished_at
+    mock_event_bus.publish.assert_called_once_with("test-job-id", JobStatus.DONE)
+    # The completed result is pushed to the result cache
+    mock_result_cache.put.assert_called_once()
+    # The time the job waited in the queue is recorded once it is claimed
+    mock_observe_queue_wait.assert_called_once_with(mock_job_manager.claim_job.return_value)
     
     assert result["job_id"] == "test-job-id"
     assert result["status"] == "completed"
     assert result["description"] == "Test description"
 
+@pytest.mark.asyncio
+async def test_process_image_async_stops_heartbeat_before_returning(mocker) -> None:
+    """Test that the lease heartbeat has stopped by the time the job is finished."""
+    mocker.patch.object(settings, 'JOB_LEASE_SECONDS', 60)
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_job_manager_class = mocker.patch('app.tasks.JobManager')
+    mock_image_processor_class = mocker.patch('app.tasks.ImageProcessor')
+    mocker.patch('app.tasks.observe_queue_wait')
+    mock_finish = mocker.patch('app.tasks._finish_completed_job', new_callable=mocker.AsyncMock)
+    heartbeat_stopped = []
+    
+    async def renew_lease(job_id: str, tenant_id: str) -> None:
+        try:
+            await asyncio.sleep(3600)
+        finally:
+            heartbeat_stopped.append(job_id)
+    
+    mocker.patch('app.tasks._renew_lease', renew_lease)
+    mock_runtime.session.return_value.__aenter__.return_value = mocker.AsyncMock()
+    mock_job_manager = mocker.AsyncMock()
+    mock_job_manager.claim_job.return_value = _claimed_job()
+    mock_job_manager_class.return_value = mock_job_manager
+    mock_image_processor = mocker.AsyncMock()
+    mock_image_processor_class.return_value = mock_image_processor
+    
+    async def process_image(image_path: str) -> str:
+        # Let the heartbeat start while the image is processed
+        await asyncio.sleep(0)
+        return "Test description"
+    
+    mock_image_processor.process_image.side_effect = process_image
+    
+    async def finish(job_id: str, completed_job: Job) -> dict:
+        # The heartbeat must be gone before the result is published
+        assert heartbeat_stopped == [job_id]
+        return {"job_id": job_id, "status": "completed"}
+    
+    mock_finish.side_effect = finish
+    
+    result = await _process_image_async("test-job-id", "test-image.jpg")
+    
+    assert result == {"job_id": "test-job-id", "status": "completed"}
+
+@pytest.mark.asyncio
+async def test_process_image_async_batched(mocker) -> None:
+    """Test that with batching enabled the description comes from the batcher."""
+    mocker.patch('app.tasks.settings.DESCRIBE_BATCH_MAX_SIZE', 8)
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_job_manager_class = mocker.patch('app.tasks.JobManager')
+    mock_batcher = mocker.patch('app.tasks.description_batcher')
+    mock_event_bus = mocker.patch('app.tasks.job_event_bus')
+    mock_event_bus.publish = mocker.AsyncMock()
+    mock_result_cache = mocker.patch('app.tasks.result_cache')
+    mock_result_cache.put = mocker.AsyncMock()
+    
+    mock_runtime.session.return_value.__aenter__.return_value = mocker.AsyncMock()
+    mock_job_manager = mocker.AsyncMock()
+    mock_job_manager.claim_job.return_value = _claimed_job()
+    mock_job_manager_class.return_value = mock_job_manager
+    mock_batcher.describe = mocker.AsyncMock(
+        return_value=Job(id="test-job-id", status=JobStatus.DONE, image_description="Batched description")
+    )
+    
+    result = await _process_image_async("test-job-id", "test-image.jpg")
+    
+    mock_batcher.describe.assert_called_once_with("test-job-id", "test-image.jpg")
+    # The batcher already stored the result
+    mock_job_manager.complete_job.assert_not_called()
+    mock_event_bus.publish.assert_called_once_with("test-job-id", JobStatus.DONE)
+    # A batched result is cached like any other
+    mock_result_cache.put.assert_called_once()
+    assert result["description"] == "Batched description"
+
+@pytest.mark.asyncio
+async def test_process_image_async_batched_job_no_longer_processing(mocker) -> None:
+    """Test that a batched job that stopped processing is neither cached nor announced as done."""
+    mocker.patch('app.tasks.settings.DESCRIBE_BATCH_MAX_SIZE', 8)
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_job_manager_class = mocker.patch('app.tasks.JobManager')
+    mock_batcher = mocker.patch('app.tasks.description_batcher')
+    mock_event_bus = mocker.patch('app.tasks.job_event_bus')
+    mock_event_bus.publish = mocker.AsyncMock()
+    mock_result_cache = mocker.patch('app.tasks.result_cache')
+    mock_result_cache.put = mocker.AsyncMock()
+    
+    mock_runtime.session.return_value.__aenter__.return_value = mocker.AsyncMock()
+    mock_job_manager = mocker.AsyncMock()
+    mock_job_manager.claim_job.return_value = _claimed_job()
+    mock_job_manager_class.return_value = mock_job_manager
+    mock_batcher.describe = mocker.AsyncMock(return_value=None)
+    
+    result = await _process_image_async("test-job-id", "test-image.jpg")
+    
+    assert result == {"job_id": "test-job-id", "status": "skipped"}
+    mock_result_cache.put.assert_not_called()
+    mock_event_bus.publish.assert_not_called()
+
 @pytest.mark.asyncio
 async def test_update_job_failed(mocker) -> None:
     """Test updating job status to failed."""
-    mock_session = mocker.patch('app.tasks.AsyncSessionLocal')
+    mock_runtime = mocker.patch('app.tasks.runtime')
     mock_job_manager_class = mocker.patch('app.tasks.JobManager')
+    mock_event_bus = mocker.patch('app.tasks.job_event_bus')
+    mock_event_bus.publish = mocker.AsyncMock()
     
-    mock_session.return_value.__aenter__.return_value = mocker.AsyncMock()
+    mock_runtime.session.return_value.__aenter__.return_value = mocker.AsyncMock()
     mock_job_manager = mocker.AsyncMock()
     mock_job_manager_class.return_value = mock_job_manager
     
     await _update_job_failed("test-job-id", "Processing failed")
     
-    mock_job_manager.update_job_status.assert_called_with("test-job-id", JobStatus.FAILED)
+    mock_job_manager.fail_job.assert_called_once_with("test-job-id", "Processing failed")
+    mock_event_bus.publish.assert_called_once_with("test-job-id", JobStatus.FAILED)
 
-def test_celery_task_success_integration(mocker) -> None:
-    """Test Celery task success scenario by testing the core logic."""
-    mock_asyncio_run = mocker.patch('app.tasks.asyncio.run')
+@pytest.mark.asyncio
+async def test_update_job_retrying_leases_job_until_after_its_retry(mocker) -> None:
+    """Test that a retrying job is leased for its countdown plus a processing lease."""
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_job_manager_class = mocker.patch('app.tasks.JobManager')
+    
+    mock_runtime.session.return_value.__aenter__.return_value = mocker.AsyncMock()
+    mock_job_manager = mocker.AsyncMock()
+    mock_job_manager_class.return_value = mock_job_manager
+    
+    await _update_job_retrying("test-job-id", "ConnectionError: Describer unavailable", 30.0)
+    
+    mock_job_manager.retry_job.assert_called_once_with(
+        "test-job-id", "ConnectionError: Describer unavailable", 30.0 + settings.JOB_LEASE_SECONDS
+    )
+
+@pytest.mark.asyncio
+async def test_process_image_async_skips_unclaimable_job(mocker) -> None:
+    """Test that a duplicate delivery of a claimed job does no work."""
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_job_manager_class = mocker.patch('app.tasks.JobManager')
+    mock_image_processor_class = mocker.patch('app.tasks.ImageProcessor')
+    mock_event_bus = mocker.patch('app.tasks.job_event_bus')
+    mock_event_bus.publish = mocker.AsyncMock()
+    
+    mock_runtime.session.return_value.__aenter__.return_value = mocker.AsyncMock()
+    mock_job_manager = mocker.AsyncMock()
+    mock_job_manager.claim_job.return_value = None
+    mock_job_manager_class.return_value = mock_job_manager
+    mock_image_processor = mocker.AsyncMock()
+    mock_image_processor_class.return_value = mock_image_processor
+    
+    result = await _process_image_async("test-job-id", "test-image.jpg")
     
-    # Mock the async function result
-    mock_asyncio_run.return_value = {
-        "job_id": "test-job-id",
-        "status": "completed",
-        "description": "Test description"
-    }
+    assert result == {"job_id": "test-job-id", "status": "skipped"}
+    mock_image_processor.process_image.assert_not_called()
+    mock_job_manager.complete_job.assert_not_called()
+    mock_event_bus.publish.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_process_image_async_duplicate_leaves_slot_of_running_job(mocker) -> None:
+    """Test that a duplicate delivery does not give back the tenant slot the running job holds."""
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_job_manager_class = mocker.patch('app.tasks.JobManager')
+    mock_limiter = mocker.patch('app.tasks.tenant_limiter')
+    mock_limiter.acquire = mocker.AsyncMock(return_value=SlotGrant.HELD)
+    mock_limiter.release = mocker.AsyncMock()
+    
+    mock_runtime.session.return_value.__aenter__.return_value = mocker.AsyncMock()
+    mock_job_manager = mocker.AsyncMock()
+    mock_job_manager.claim_job.return_value = None
+    mock_job_manager_class.return_value = mock_job_manager
+    
+    result = await _process_image_async("test-job-id", "test-image.jpg", tenant_id="acme")
+    
+    assert result == {"job_id": "test-job-id", "status": "skipped"}
+    mock_limiter.acquire.assert_called_once_with("acme", "test-job-id")
+    mock_limiter.release.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_process_image_async_deferred_when_tenant_at_cap(mocker) -> None:
+    """Test that a job is not claimed while its tenant is at its concurrency cap."""
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_job_manager_class = mocker.patch('app.tasks.JobManager')
+    mock_limiter = mocker.patch('app.tasks.tenant_limiter')
+    mock_limiter.acquire = mocker.AsyncMock(return_value=SlotGrant.REFUSED)
+    mock_limiter.release = mocker.AsyncMock()
+    
+    mock_runtime.session.return_value.__aenter__.return_value = mocker.AsyncMock()
+    mock_job_manager = mocker.AsyncMock()
+    mock_job_manager_class.return_value = mock_job_manager
     
-    # Test that the task logic works correctly
-    # We're testing the core functionality without the Celery wrapper complexity
-    # Actually call the mocked function to simulate task execution
-    result = mock_asyncio_run("test-job-id", "test-image.jpg")
+    result = await _process_image_async("test-job-id", "test-image.jpg", tenant_id="acme")
+    
+    assert result == {"job_id": "test-job-id", "status": "deferred"}
+    mock_job_manager.claim_job.assert_not_called()
+    mock_limiter.release.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_update_job_failed_keeps_finished_job(mocker) -> None:
+    """Test that no failure is announced for a job that already finished."""
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_job_manager_class = mocker.patch('app.tasks.JobManager')
+    mock_event_bus = mocker.patch('app.tasks.job_event_bus')
+    mock_event_bus.publish = mocker.AsyncMock()
+    
+    mock_runtime.session.return_value.__aenter__.return_value = mocker.AsyncMock()
+    mock_job_manager = mocker.AsyncMock()
+    mock_job_manager.fail_job.return_value = None
+    mock_job_manager_class.return_value = mock_job_manager
+    
+    await _update_job_failed("test-job-id", "Processing failed")
+    
+    mock_event_bus.publish.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_publish_job_event_failure_is_ignored(mocker) -> None:
+    """Test that a failure to publish a job event does not fail the task."""
+    mock_event_bus = mocker.patch('app.tasks.job_event_bus')
+    mock_event_bus.publish = mocker.AsyncMock(side_effect=ConnectionError("Redis unavailable"))
+    
+    await _publish_job_event("test-job-id", JobStatus.DONE)
+    
+    mock_event_bus.publish.assert_called_once_with("test-job-id", JobStatus.DONE)
+
+def _run_coroutine(results: dict):
+    """Build a stand-in for WorkerRuntime.run that answers by coroutine name."""
+    def run(coro):
+        name = coro.cr_code.co_name
+        coro.close()
+        # Keep the name for assertions on the call order
+        run.names.append(name)
+        result = results[name]
+        if isinstance(result, Exception):
+            raise result
+        return result
+    run.names = []
+    return run
+
+def test_celery_task_success_integration(mocker) -> None:
+    """Test that the Celery task runs the async workflow on the worker runtime."""
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_runtime.run.side_effect = _run_coroutine({
+        "_process_image_async": {
+            "job_id": "test-job-id",
+            "status": "completed",
+            "description": "Test description"
+        }
+    })
+    
+    result = process_image_task.apply(args=("test-job-id", "test-image.jpg")).get()
     
     assert result["job_id"] == "test-job-id"
     assert result["status"] == "completed"
     assert result["description"] == "Test description"
     
-    # Verify asyncio.run was called (simulating the task execution)
-    mock_asyncio_run.assert_called_once()
+    # The workflow ran once on the persistent loop
+    assert mock_runtime.run.side_effect.names == ["_process_image_async"]
 
 def test_celery_task_failure_integration(mocker) -> None:
-    """Test Celery task failure scenario by testing the core logic."""
-    mock_asyncio_run = mocker.patch('app.tasks.asyncio.run')
-    
-    # Mock the async function to raise an exception on first call
-    # and succeed on second call (for _update_job_failed)
-    mock_asyncio_run.side_effect = [
-        Exception("Processing failed"),  # First call to _process_image_async fails
-        None  # Second call to _update_job_failed succeeds
+    """Test that a failing task marks the job retrying on the worker runtime, retries and then fails it."""
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_runtime.run.side_effect = _run_coroutine({
+        "_process_image_async": ConnectionError("Describer unavailable"),
+        "_update_job_retrying": None,
+        "_update_job_failed": None
+    })
+    
+    result = process_image_task.apply(args=("test-job-id", "test-image.jpg"))
+    
+    assert result.failed()
+    # Every attempt, including the retries, runs the workflow and a status
+    # update; only the last one fails the job
+    attempts = settings.TASK_MAX_RETRIES + 1
+    names = mock_runtime.run.side_effect.names
+    assert mock_runtime.run.call_count == 2 * attempts
+    assert names.count("_update_job_retrying") == settings.TASK_MAX_RETRIES
+    assert names.count("_update_job_failed") == 1
+
+def test_celery_task_permanent_failure_is_not_retried(mocker) -> None:
+    """Test that a permanent error fails the job on the first attempt."""
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_runtime.run.side_effect = _run_coroutine({
+        "_process_image_async": FileNotFoundError("Image file not found: test-image.jpg"),
+        "_update_job_failed": None
+    })
+    
+    result = process_image_task.apply(args=("test-job-id", "test-image.jpg"))
+    
+    assert result.failed()
+    assert mock_runtime.run.side_effect.names == ["_process_image_async", "_update_job_failed"]
+
+def test_celery_task_deferred_when_tenant_at_cap(mocker) -> None:
+    """Test that a job of a tenant at its concurrency cap goes back to its queue, deferred longer each time."""
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_runtime.run.side_effect = _run_coroutine({
+        "_process_image_async": {"job_id": "test-job-id", "status": "deferred"}
+    })
+    mock_apply_async = mocker.patch.object(process_image_task, 'apply_async')
+    mock_policy = mocker.patch('app.tasks.tenant_deferral_policy')
+    mock_policy.delay.return_value = 7.5
+    
+    result = process_image_task.apply(
+        args=("test-job-id", "test-image.jpg"),
+        kwargs={"tenant_id": "acme", "priority": "bulk", "enqueued_at": "2024-01-01T12:00:00+00:00", "deferrals": 2}
+    ).get()
+    
+    assert result == {"job_id": "test-job-id", "status": "deferred"}
+    mock_policy.delay.assert_called_once_with(2)
+    mock_apply_async.assert_called_once_with(
+        args=("test-job-id", "test-image.jpg"),
+        kwargs={"tenant_id": "acme", "priority": "bulk", "enqueued_at": "2024-01-01T12:00:00+00:00", "deferrals": 3},
+        queue=settings.CELERY_BULK_QUEUE,
+        countdown=7.5
+    )
+
+def test_run_retention_task(mocker) -> None:
+    """Test that the retention task runs a retention pass and returns its stats."""
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_runtime.run.return_value = RetentionStats(images_deleted=2, bytes_reclaimed=2048)
+    mocker.patch('app.tasks.retention_service')
+    
+    result = run_retention_task()
+    
+    assert result == {"images_deleted": 2, "bytes_reclaimed": 2048, "jobs_archived": 0, "jobs_deleted": 0}
+    schedule = celery_app.conf.beat_schedule["run-retention"]
+    assert schedule["task"] == run_retention_task.name
+    assert schedule["options"]["queue"] == settings.CELERY_INTERACTIVE_QUEUE
+
+@pytest.mark.asyncio
+async def test_reap_stale_jobs(mocker) -> None:
+    """Test that stale jobs are requeued on their priority's queue in one publish, or failed."""
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_job_manager_class = mocker.patch('app.tasks.JobManager')
+    mock_task = mocker.patch('app.tasks.process_image_task')
+    mock_group = mocker.patch('app.tasks.group')
+    mock_event_bus = mocker.patch('app.tasks.job_event_bus')
+    mock_event_bus.publish = mocker.AsyncMock()
+    
+    mock_runtime.session.return_value.__aenter__.return_value = mocker.AsyncMock()
+    mock_job_manager = mocker.AsyncMock()
+    mock_job_manager.requeue_stale_jobs.return_value = [
+        MagicMock(id="job-1", image_path="ab/job-1.jpg", tenant_id="acme", priority=JobPriority.BULK)
     ]
+    mock_job_manager.fail_stale_jobs.return_value = ["job-2"]
+    mock_job_manager_class.return_value = mock_job_manager
+    now = datetime(2024, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
     
-    # Test that the task handles exceptions correctly
-    # We're testing the core functionality without the Celery wrapper complexity
+    result = await _reap_stale_jobs(now)
+    
+    assert result == {"requeued": 1, "failed": 1}
+    mock_job_manager.requeue_stale_jobs.assert_called_once_with(now, settings.REAPER_MAX_ATTEMPTS, settings.REAPER_BATCH_SIZE)
+    mock_task.s.assert_called_once_with(
+        "job-1", "ab/job-1.jpg", tenant_id="acme", priority="bulk", enqueued_at=now.isoformat()
+    )
+    mock_task.s.return_value.set.assert_called_once_with(queue=settings.CELERY_BULK_QUEUE)
+    mock_group.return_value.apply_async.assert_called_once_with()
+    mock_event_bus.publish.assert_called_once_with("job-2", JobStatus.FAILED)
+    assert "reap-stale-jobs" in celery_app.conf.beat_schedule
+
+@pytest.mark.asyncio
+async def test_renew_lease_stops_once_job_stops_processing(mocker) -> None:
+    """Test that the heartbeat renews the lease until the job is no longer processing."""
+    mocker.patch.object(settings, 'JOB_LEASE_HEARTBEAT_SECONDS', 0)
+    mock_runtime = mocker.patch('app.tasks.runtime')
+    mock_job_manager_class = mocker.patch('app.tasks.JobManager')
+    mock_runtime.session.return_value.__aenter__.return_value = mocker.AsyncMock()
+    mock_job_manager = mocker.AsyncMock()
+    mock_job_manager.renew_lease.side_effect = [True, ConnectionError("Database unavailable"), False]
+    mock_job_manager_class.return_value = mock_job_manager
     
-    # Simulate the task execution flow
-    try:
-        # This would be the first call in the actual task
-        result = mock_asyncio_run("test-job-id", "test-image.jpg")
-    except Exception:
-        # This would be the second call in the actual task
-        mock_asyncio_run("test-job-id", "error message")
+    await _renew_lease("test-job-id")
     
-    # Verify asyncio.run was called twice (once for processing, once for failure update)
-    assert mock_asyncio_run.call_count == 2 
\ No newline at end of file
+    assert mock_job_manager.renew_lease.call_count == 3
+    mock_job_manager.renew_lease.assert_called_with("test-job-id", settings.JOB_LEASE_SECONDS)
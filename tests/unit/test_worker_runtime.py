@@ -0,0 +1,68 @@
+import pytest
+import asyncio
+from app.worker_runtime import WorkerRuntime
+
+@pytest.fixture
+def worker_runtime():
+    """Create a WorkerRuntime and stop it after the test."""
+    worker_runtime = WorkerRuntime()
+    yield worker_runtime
+    worker_runtime.stop()
+
+async def _current_loop() -> asyncio.AbstractEventLoop:
+    """Return the running event loop."""
+    return asyncio.get_running_loop()
+
+def test_run_reuses_event_loop(worker_runtime: WorkerRuntime) -> None:
+    """Test that every coroutine runs on the same long-lived event loop."""
+    first_loop = worker_runtime.run(_current_loop())
+    second_loop = worker_runtime.run(_current_loop())
+    
+    assert first_loop is second_loop
+    assert not first_loop.is_closed()
+
+def test_session_reuses_engine(worker_runtime: WorkerRuntime) -> None:
+    """Test that sessions share one engine for the life of the runtime."""
+    first_session = worker_runtime.session()
+    second_session = worker_runtime.session()
+    
+    assert first_session is not second_session
+    assert first_session.bind is second_session.bind
+
+def test_stop_closes_event_loop(worker_runtime: WorkerRuntime) -> None:
+    """Test that stopping the runtime closes its loop and a later run starts a new one."""
+    first_loop = worker_runtime.run(_current_loop())
+    worker_runtime.stop()
+    
+    assert first_loop.is_closed()
+    assert worker_runtime.run(_current_loop()) is not first_loop
+
+def test_async_mode_runs_tasks_concurrently_on_one_loop() -> None:
+    """Test that task threads share one loop and are bounded by the concurrency setting."""
+    from concurrent.futures import ThreadPoolExecutor
+    
+    worker_runtime = WorkerRuntime(mode="async", concurrency=3)
+    in_flight = 0
+    max_in_flight = 0
+    
+    async def describe() -> asyncio.AbstractEventLoop:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        return asyncio.get_running_loop()
+    
+    try:
+        with ThreadPoolExecutor(max_workers=6) as task_threads:
+            loops = list(task_threads.map(lambda _: worker_runtime.run(describe()), range(6)))
+    finally:
+        worker_runtime.stop()
+    
+    assert len(set(loops)) == 1
+    assert max_in_flight == 3
+
+def test_unknown_mode() -> None:
+    """Test that an unknown worker mode is rejected."""
+    with pytest.raises(ValueError, match="Unknown worker mode"):
+        WorkerRuntime(mode="gevent")